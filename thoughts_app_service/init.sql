@@ -78,10 +78,16 @@ BEGIN
 
     IF NOT EXISTS (SELECT 1 FROM thoughts_core_chat) THEN
         -- Insert sample data into Chat table
-        INSERT INTO thoughts_core_chat (id, user_id, chat_messages, created_at, updated_at)
+        INSERT INTO thoughts_core_chat (id, user_id, created_at, updated_at)
         VALUES
-        (uuid_generate_v4(), (SELECT id FROM auth_user WHERE username='john_doe'), '[{"text":"Hello", "timestamp":"2023-05-09 09:15:00"}]', '2023-05-09 09:15:00', '2023-05-09 09:15:00'),
-        (uuid_generate_v4(), (SELECT id FROM auth_user WHERE username='admin'), '[{"text":"Welcome to the Admin Session", "timestamp":"2024-04-30 12:00:00"}]', '2024-04-30 12:00:00', '2024-04-30 12:00:00');
+        (uuid_generate_v4(), (SELECT id FROM auth_user WHERE username='john_doe'), '2023-05-09 09:15:00', '2023-05-09 09:15:00'),
+        (uuid_generate_v4(), (SELECT id FROM auth_user WHERE username='admin'), '2024-04-30 12:00:00', '2024-04-30 12:00:00');
+
+        -- Insert sample data into ChatMessage table
+        INSERT INTO thoughts_core_chatmessage (chat_id, sequence, role, content, created_at)
+        VALUES
+        ((SELECT id FROM thoughts_core_chat WHERE created_at='2023-05-09 09:15:00'), 1, 'user', 'Hello', '2023-05-09 09:15:00'),
+        ((SELECT id FROM thoughts_core_chat WHERE created_at='2024-04-30 12:00:00'), 1, 'user', 'Welcome to the Admin Session', '2024-04-30 12:00:00');
 
     END IF;
 
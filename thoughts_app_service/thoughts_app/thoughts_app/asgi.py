@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "thoughts_app.settings")
 
 application = get_asgi_application()
+
+# Imported after the application so that apps are loaded
+from thoughts_core.views import warm_meditation_search_index  # noqa: E402
+
+warm_meditation_search_index()
@@ -74,6 +74,10 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+SPECTACULAR_SETTINGS = {
+    "GET_LIB_DOC_EXCLUDES": "thoughts_core.viewsets.get_lib_doc_excludes",
+}
+
 MIDDLEWARE = [
     "django_prometheus.middleware.PrometheusBeforeMiddleware",
     "django.middleware.security.SecurityMiddleware",
@@ -205,5 +209,136 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Any OpenAI-compatible endpoint, the official API when unset
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+CHAT_COMPLETION_MODEL = os.getenv("CHAT_COMPLETION_MODEL", "gpt-3.5-turbo")
+
+# OpenAI calls running at once per process, further calls wait in a queue
+# of OPENAI_MAX_QUEUED_REQUESTS and are refused with 503 beyond that
+OPENAI_MAX_CONCURRENT_REQUESTS = int(
+    os.getenv("OPENAI_MAX_CONCURRENT_REQUESTS", "8")
+)
+OPENAI_MAX_QUEUED_REQUESTS = int(os.getenv("OPENAI_MAX_QUEUED_REQUESTS", "16"))
+# Seconds an OpenAI call may take, including queueing and retries
+OPENAI_REQUEST_DEADLINE = float(os.getenv("OPENAI_REQUEST_DEADLINE", "30"))
+# Retries on rate limits, server errors and connection failures
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+# Base of the exponential backoff between retries, in seconds
+OPENAI_RETRY_BACKOFF = float(os.getenv("OPENAI_RETRY_BACKOFF", "0.5"))
+
+# Seconds a run_chat_completion_worker process holds a claimed chatbot job,
+# after that the job is presumed abandoned and claimed again
+CHAT_COMPLETION_JOB_LEASE = float(
+    os.getenv("CHAT_COMPLETION_JOB_LEASE", "120")
+)
+CHAT_COMPLETION_JOB_MAX_ATTEMPTS = int(
+    os.getenv("CHAT_COMPLETION_JOB_MAX_ATTEMPTS", "3")
+)
+# Seconds between queue checks of idle workers and of long-polling clients
+CHAT_COMPLETION_JOB_POLL_INTERVAL = float(
+    os.getenv("CHAT_COMPLETION_JOB_POLL_INTERVAL", "0.5")
+)
+# Longest long-poll wait for a job result, in seconds
+CHAT_COMPLETION_JOB_MAX_WAIT = int(
+    os.getenv("CHAT_COMPLETION_JOB_MAX_WAIT", "30")
+)
+
+# Tokens of recent chat history sent with each chatbot request, older
+# turns are folded into the chat's running summary
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1500"))
+
+# Upper bound on the length of a chat's running summary, in tokens
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "300"))
+
+# Meditations offered to the chatbot per request, picked from the catalogue
+# by relevance to the user's messages
+CHATBOT_MEDITATION_CANDIDATES = int(
+    os.getenv("CHATBOT_MEDITATION_CANDIDATES", "20")
+)
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # LocMemCache evicts least recently used entries above MAX_ENTRIES
+    "recommendations": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "recommendations",
+        "TIMEOUT": int(os.getenv("RECOMMENDATION_CACHE_TIMEOUT", "300")),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(
+                os.getenv("RECOMMENDATION_CACHE_MAX_ENTRIES", "10000")
+            ),
+        },
+    },
+    # Validated chatbot replies, shared by identical conversations
+    "chat_completions": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "chat_completions",
+        "TIMEOUT": int(os.getenv("CHAT_COMPLETION_CACHE_TIMEOUT", "3600")),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(
+                os.getenv("CHAT_COMPLETION_CACHE_MAX_ENTRIES", "1000")
+            ),
+        },
+    },
+}
+
+# Seconds a worker may keep using a memoised catalogue version
+CATALOGUE_VERSION_CACHE_TIMEOUT = int(
+    os.getenv("CATALOGUE_VERSION_CACHE_TIMEOUT", "5")
+)
+
+# Seconds a precomputed recommendation snapshot is served for
+RECOMMENDATION_SNAPSHOT_MAX_AGE = int(
+    os.getenv("RECOMMENDATION_SNAPSHOT_MAX_AGE", str(6 * 60 * 60))
+)
+
+# Default recommendation strategy: "theme" or "item_cf"
+RECOMMENDATION_STRATEGY = os.getenv("RECOMMENDATION_STRATEGY", "theme")
+
+# Leave meditations the user already had sessions with out of the
+# theme-based recommendations
+RECOMMENDATION_EXCLUDE_SEEN = (
+    os.getenv("RECOMMENDATION_EXCLUDE_SEEN", "False") == "True"
+)
+
+# Artifact written by the build_item_similarity_model command
+ITEM_CF_MODEL_PATH = os.getenv(
+    "ITEM_CF_MODEL_PATH", str(BASE_DIR / "item_cf_model.npz")
+)
+
+# Days of activity that count towards meditation popularity
+MEDITATION_POPULARITY_WINDOW_DAYS = int(
+    os.getenv("MEDITATION_POPULARITY_WINDOW_DAYS", "30")
+)
+
+# Most grades accepted by one bulk grade request
+MEDITATION_GRADES_BULK_MAX_SIZE = int(
+    os.getenv("MEDITATION_GRADES_BULK_MAX_SIZE", "500")
+)
+
+# Seconds the per-theme popular meditation lists are reused for
+POPULAR_MEDITATIONS_CACHE_TIMEOUT = int(
+    os.getenv("POPULAR_MEDITATIONS_CACHE_TIMEOUT", "600")
+)
+
+# Seconds a worker may keep using its progress level ladder after another
+# worker changed the levels
+PROGRESS_LEVEL_LADDER_MAX_AGE = int(
+    os.getenv("PROGRESS_LEVEL_LADDER_MAX_AGE", "60")
+)
+
+# Months of MeditationSession partitions created ahead of the current one,
+# once the table is partitioned (see maintain_session_partitions)
+MEDITATION_SESSION_PARTITIONS_AHEAD = int(
+    os.getenv("MEDITATION_SESSION_PARTITIONS_AHEAD", "3")
+)
+
+# Months of sessions kept as rows, older partitions are rolled up into
+# MeditationSessionRollup and dropped
+MEDITATION_SESSION_RETENTION_MONTHS = int(
+    os.getenv("MEDITATION_SESSION_RETENTION_MONTHS", "24")
+)
 
 TEST_RUNNER = "django.test.runner.DiscoverRunner"
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "thoughts_app.settings")
 
 application = get_wsgi_application()
+
+# Imported after the application so that apps are loaded
+from thoughts_core.views import warm_meditation_search_index  # noqa: E402
+
+warm_meditation_search_index()
@@ -3,21 +3,35 @@ from django.contrib import admin
 from .models import (
     Achievement,
     Chat,
+    ChatCompletionJob,
+    ChatMessage,
     Meditation,
     MeditationGrade,
     MeditationNarrator,
+    MeditationNeighbour,
+    MeditationPopularityBucket,
     MeditationSession,
+    MeditationSessionRollup,
     MeditationTheme,
     ProgressLevel,
     UserInfo,
+    UserSessionStats,
+    UserThemeAffinity,
 )
 
 admin.site.register(UserInfo)
 admin.site.register(Achievement)
 admin.site.register(MeditationTheme)
 admin.site.register(MeditationSession)
+admin.site.register(MeditationSessionRollup)
 admin.site.register(Meditation)
 admin.site.register(Chat)
+admin.site.register(ChatMessage)
+admin.site.register(ChatCompletionJob)
 admin.site.register(MeditationNarrator)
 admin.site.register(MeditationGrade)
 admin.site.register(ProgressLevel)
+admin.site.register(UserThemeAffinity)
+admin.site.register(UserSessionStats)
+admin.site.register(MeditationPopularityBucket)
+admin.site.register(MeditationNeighbour)
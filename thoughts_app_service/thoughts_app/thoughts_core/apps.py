@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ThoughtsCoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "thoughts_core"
+
+    def ready(self):
+        from . import signals  # noqa: F401
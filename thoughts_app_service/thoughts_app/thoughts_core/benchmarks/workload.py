@@ -0,0 +1,165 @@
+import random
+import time
+from statistics import mean, quantiles
+from typing import Callable, List
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models import (
+    Meditation,
+    MeditationGrade,
+    MeditationNarrator,
+    MeditationSession,
+    MeditationTheme,
+)
+from ..repositories.UserThemeAffinityRepository import (
+    UserThemeAffinityRepository,
+)
+from ..services.MeditationPopularityService import (
+    MeditationPopularityService,
+)
+
+BATCH_SIZE = 5000
+
+
+class SyntheticWorkload:
+    """Seeds a catalogue and user activity with bulk inserts.
+
+    Bulk inserts bypass model signals, call finalize() once seeding is done
+    to rebuild the tables that signals normally maintain.
+    """
+
+    def __init__(self, themes: int, meditations: int, seed: int | None = None):
+        self.random = random.Random(seed)
+        self.themes_amount = themes
+        self.meditations_amount = meditations
+        self.run_id = time.time_ns()
+        self.meditations: List[Meditation] = []
+        self.user_ids: List[int] = []
+
+    def seed_catalogue(self) -> List[Meditation]:
+        themes = MeditationTheme.objects.bulk_create(
+            [
+                MeditationTheme(name=f"Theme {i}")
+                for i in range(self.themes_amount)
+            ]
+        )
+        narrator = MeditationNarrator.objects.create(name="Narrator")
+        self.meditations = Meditation.objects.bulk_create(
+            [
+                Meditation(
+                    name=f"Meditation {i}",
+                    meditation_theme=themes[i % self.themes_amount],
+                    meditation_narrator=narrator,
+                )
+                for i in range(self.meditations_amount)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        return self.meditations
+
+    def seed_users(self, amount: int, cohort: str) -> List[User]:
+        users = User.objects.bulk_create(
+            [
+                User(
+                    username=f"{cohort}-{self.run_id}-{i}",
+                    password="!",
+                )
+                for i in range(amount)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        self.user_ids += [user.id for user in users]
+        return users
+
+    def seed_activity(
+        self, users: List[User], sessions: int, grades: int
+    ) -> None:
+        for user in users:
+            # Users favour a few themes so that theme preferences emerge
+            favourite_meditations = self.random.sample(
+                self.meditations, min(len(self.meditations), 50)
+            )
+            MeditationSession.objects.bulk_create(
+                (
+                    MeditationSession(
+                        user=user,
+                        meditation=self.random.choice(favourite_meditations),
+                    )
+                    for _ in range(sessions)
+                ),
+                batch_size=BATCH_SIZE,
+            )
+            MeditationGrade.objects.bulk_create(
+                (
+                    MeditationGrade(
+                        user=user,
+                        meditation=meditation,
+                        grade=self.random.randint(1, 5),
+                    )
+                    for meditation in self.get_graded_meditations(
+                        favourite_meditations, grades
+                    )
+                ),
+                batch_size=BATCH_SIZE,
+            )
+
+    def get_graded_meditations(
+        self, favourite_meditations: List[Meditation], amount: int
+    ) -> List[Meditation]:
+        """Distinct meditations, favourites first, as a user grades each
+        meditation once. At most the whole catalogue."""
+        graded_meditations = self.random.sample(
+            favourite_meditations, min(len(favourite_meditations), amount)
+        )
+        if len(graded_meditations) < amount:
+            favourite_ids = {
+                meditation.id for meditation in graded_meditations
+            }
+            other_meditations = [
+                meditation
+                for meditation in self.meditations
+                if meditation.id not in favourite_ids
+            ]
+            graded_meditations += self.random.sample(
+                other_meditations,
+                min(len(other_meditations), amount - len(graded_meditations)),
+            )
+        return graded_meditations
+
+    def finalize(self) -> None:
+        UserThemeAffinityRepository.rebuild(user_ids=self.user_ids)
+        MeditationPopularityService.refresh(rebuild=True)
+
+
+def measure(call: Callable, arguments: list, iterations: int) -> dict:
+    """Latency percentiles and query counts of `call` over `arguments`."""
+    latencies, query_counts = [], []
+    for _ in range(iterations):
+        for argument in arguments:
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                call(argument)
+                latencies.append(time.perf_counter() - started)
+            query_counts.append(len(queries))
+
+    return {
+        "calls": len(query_counts),
+        "latency_ms": get_latency_percentiles(latencies),
+        "queries": {"mean": mean(query_counts), "max": max(query_counts)},
+    }
+
+
+def get_latency_percentiles(latencies: List[float]) -> dict:
+    """p50/p95/p99/max in milliseconds of latencies in seconds."""
+    if len(latencies) < 2:
+        latencies = latencies * 2
+    percentiles = quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50": percentiles[49] * 1000,
+        "p95": percentiles[94] * 1000,
+        "p99": percentiles[98] * 1000,
+        "max": max(latencies) * 1000,
+    }
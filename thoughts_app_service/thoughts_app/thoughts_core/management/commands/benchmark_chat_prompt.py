@@ -0,0 +1,178 @@
+import json
+from datetime import datetime, timezone
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ...benchmarks.workload import SyntheticWorkload
+from ...models import Chat
+from ...services.ChatService import ChatService
+from ...views import (
+    MeditationSearchIndexCache,
+    get_all_meditations,
+    get_search_query,
+    get_system_message,
+    prepare_system_message,
+)
+from .benchmark_recommendations import get_git_commit
+
+USER_MESSAGE = (
+    "Мне тревожно перед рабочей неделей, я плохо сплю и не могу "
+    "сосредоточиться. Что можно послушать вечером? (реплика {turn})"
+)
+SUMMARY_SENTENCE = "Пользователь тревожится, плохо спит и просит медитации. "
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure chatbot prompt size against conversation length, sending the "
+        "whole catalogue and history versus the searched meditations and the "
+        "token-budgeted window with a running summary. Seeded rows are "
+        "rolled back and no model is called."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--meditations", type=int, default=100)
+        parser.add_argument(
+            "--turns",
+            type=int,
+            nargs="+",
+            default=[1, 5, 10, 25, 50, 100, 200],
+            help="Conversation lengths, in user/assistant turns, to report",
+        )
+        parser.add_argument(
+            "--output", help="Write the JSON report to this file"
+        )
+
+    def handle(self, *args, **options):
+        token_counter = ChatService.get_token_counter(
+            settings.CHAT_COMPLETION_MODEL
+        )
+        with transaction.atomic():
+            workload = SyntheticWorkload(
+                themes=10, meditations=options["meditations"], seed=0
+            )
+            meditations = workload.seed_catalogue()
+            # Bulk inserts do not bump the catalogue version
+            MeditationSearchIndexCache.search_index = None
+            full_system_message = prepare_system_message(
+                async_to_sync(get_all_meditations)()
+            )
+            user = User.objects.create(
+                username=f"benchmark_chat_{workload.run_id}"
+            )
+            chat = Chat.objects.create(user=user)
+
+            report = {
+                "commit": get_git_commit(),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "parameters": {
+                    "model": settings.CHAT_COMPLETION_MODEL,
+                    "token_counter": (
+                        "tiktoken"
+                        if token_counter.encoding is not None
+                        else "heuristic"
+                    ),
+                    "meditations": options["meditations"],
+                    "meditation_candidates": (
+                        settings.CHATBOT_MEDITATION_CANDIDATES
+                    ),
+                    "history_token_budget": (
+                        settings.CHAT_HISTORY_TOKEN_BUDGET
+                    ),
+                    "summary_max_tokens": settings.CHAT_SUMMARY_MAX_TOKENS,
+                },
+                "full_system_message_tokens": token_counter.count_message(
+                    full_system_message
+                ),
+                "turns": self.run_conversation(
+                    chat,
+                    meditations,
+                    full_system_message,
+                    sorted(options["turns"]),
+                    token_counter,
+                ),
+            }
+            transaction.set_rollback(True)
+        MeditationSearchIndexCache.search_index = None
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as report_file:
+                report_file.write(output + "\n")
+        self.stdout.write(output)
+
+    @staticmethod
+    def run_conversation(
+        chat, meditations, full_system_message, report_turns, token_counter
+    ) -> list:
+        summary_calls = 0
+
+        async def summarize(summary, messages):
+            # Stands in for the model with a summary of the maximum size
+            nonlocal summary_calls
+            summary_calls += 1
+            text = ""
+            while (
+                token_counter.count_text(text + SUMMARY_SENTENCE)
+                <= settings.CHAT_SUMMARY_MAX_TOKENS
+            ):
+                text += SUMMARY_SENTENCE
+            return text
+
+        history = []
+        results = []
+        for turn in range(1, report_turns[-1] + 1):
+            user_message = {
+                "role": "user",
+                "content": USER_MESSAGE.format(turn=turn),
+            }
+            windowed = async_to_sync(ChatService.aget_conversation)(
+                chat, summarize=summarize
+            )
+            system_message = async_to_sync(get_system_message)(
+                get_search_query(windowed, user_message["content"])
+            )
+            if turn in report_turns:
+                results.append(
+                    {
+                        "turns": turn,
+                        "history_messages": len(history),
+                        "full_prompt_tokens": token_counter.count_messages(
+                            [full_system_message, *history, user_message]
+                        ),
+                        "windowed_prompt_tokens": (
+                            token_counter.count_messages(
+                                [system_message, *windowed, user_message]
+                            )
+                        ),
+                        "windowed_messages": len(windowed),
+                        "summary_calls": summary_calls,
+                    }
+                )
+
+            suggested = meditations[turn % len(meditations) :][:3]
+            reply = {
+                "role": "assistant",
+                "content": json.dumps(
+                    {
+                        "message": (
+                            "Понимаю вас. Попробуйте одну из этих медитаций "
+                            "перед сном, они помогают расслабиться."
+                        ),
+                        "suggested_meditations": [
+                            {"id": meditation.id, "name": meditation.name}
+                            for meditation in suggested
+                        ],
+                    },
+                    ensure_ascii=False,
+                ),
+            }
+            async_to_sync(ChatService.aappend_messages)(
+                chat, [user_message, reply]
+            )
+            history.extend([user_message, reply])
+        return results
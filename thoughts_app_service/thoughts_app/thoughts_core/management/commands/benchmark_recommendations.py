@@ -0,0 +1,135 @@
+import json
+import subprocess
+import tracemalloc
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ...benchmarks.workload import SyntheticWorkload, measure
+from ...services.MeditationService import MeditationService
+from ...services.RecommendationService import (
+    RECOMMENDATION_STRATEGIES,
+    RecommendationService,
+)
+
+
+def get_git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic workload and measure "
+        "RecommendationService.recommend_meditations_for_user for cold-start, "
+        "warm and heavy users. Seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--themes", type=int, default=10)
+        parser.add_argument("--meditations", type=int, default=1000)
+        parser.add_argument("--cold-users", type=int, default=50)
+        parser.add_argument("--warm-users", type=int, default=50)
+        parser.add_argument("--warm-sessions", type=int, default=30)
+        parser.add_argument("--warm-grades", type=int, default=15)
+        parser.add_argument("--heavy-users", type=int, default=5)
+        parser.add_argument("--heavy-sessions", type=int, default=5000)
+        parser.add_argument("--heavy-grades", type=int, default=2000)
+        parser.add_argument("--iterations", type=int, default=3)
+        parser.add_argument(
+            "--strategy",
+            choices=RECOMMENDATION_STRATEGIES,
+            default=settings.RECOMMENDATION_STRATEGY,
+        )
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument(
+            "--output", help="Write the JSON report to this file"
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            workload = SyntheticWorkload(
+                themes=options["themes"],
+                meditations=options["meditations"],
+                seed=options["seed"],
+            )
+            workload.seed_catalogue()
+            cohorts = {
+                # Fewer than 5 sessions takes the cold-start path
+                "cold_start": (options["cold_users"], 2, 0),
+                "warm": (
+                    options["warm_users"],
+                    options["warm_sessions"],
+                    options["warm_grades"],
+                ),
+                "heavy": (
+                    options["heavy_users"],
+                    options["heavy_sessions"],
+                    options["heavy_grades"],
+                ),
+            }
+            cohort_users = {}
+            for cohort, (users, sessions, grades) in cohorts.items():
+                cohort_users[cohort] = workload.seed_users(users, cohort)
+                workload.seed_activity(
+                    cohort_users[cohort], sessions=sessions, grades=grades
+                )
+            workload.finalize()
+            MeditationService._meditation_id_index = None
+
+            report = {
+                "commit": get_git_commit(),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "parameters": {
+                    key: options[key]
+                    for key in (
+                        "themes",
+                        "meditations",
+                        "strategy",
+                        "iterations",
+                        "seed",
+                    )
+                },
+                "cohorts": {},
+            }
+            for cohort, users in cohort_users.items():
+                report["cohorts"][cohort] = self.run_cohort(
+                    users, cohorts[cohort], options
+                )
+            transaction.set_rollback(True)
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as report_file:
+                report_file.write(output + "\n")
+        self.stdout.write(output)
+
+    @staticmethod
+    def run_cohort(users: list, cohort: tuple, options: dict) -> dict:
+        def recommend(user):
+            return list(
+                RecommendationService.recommend_meditations_for_user(
+                    user=user, strategy=options["strategy"]
+                )
+            )
+
+        tracemalloc.start()
+        try:
+            result = measure(recommend, users, options["iterations"])
+            result["peak_memory_kb"] = (
+                tracemalloc.get_traced_memory()[1] / 1024
+            )
+        finally:
+            tracemalloc.stop()
+        result["users"], result["sessions"], result["grades"] = cohort
+        return result
@@ -0,0 +1,280 @@
+import asyncio
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connections
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ...benchmarks.workload import SyntheticWorkload, get_latency_percentiles
+from ...models import (
+    Meditation,
+    MeditationNarrator,
+    MeditationTheme,
+    ProgressLevel,
+    UserInfo,
+)
+from .benchmark_recommendations import get_git_commit
+
+ENDPOINTS = {
+    "meditation": "/api/meditation/{meditation_id}/",
+    "meditation_sessions": "/api/meditation_session/",
+    "meditation_grades": "/api/meditation_grade/",
+    "recommendations": "/api/meditation/recommend_meditations/",
+    "progress": "/api/meditation_progress/",
+    "user_info": "/api/user_info/",
+}
+SERVERS = ["wsgi", "asgi"]
+
+
+def get_host() -> str:
+    hosts = [host for host in settings.ALLOWED_HOSTS if host != "*"]
+    return hosts[0].lstrip(".") if hosts else "localhost"
+
+
+def call_wsgi(application, path: str, token: str) -> int:
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SCRIPT_NAME": "",
+        "SERVER_NAME": get_host(),
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": get_host(),
+        "HTTP_AUTHORIZATION": f"Bearer {token}",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": io.StringIO(),
+        "wsgi.url_scheme": "http",
+        "wsgi.version": (1, 0),
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    statuses = []
+    response = application(
+        environ, lambda status, headers: statuses.append(status)
+    )
+    try:
+        b"".join(response)
+    finally:
+        response.close()
+    return int(statuses[0].split()[0])
+
+
+async def call_asgi(application, path: str, token: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", get_host().encode()),
+            (b"authorization", f"Bearer {token}".encode()),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": (get_host(), 80),
+    }
+    request_sent = False
+    disconnected = asyncio.Event()
+    messages = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Django listens for a disconnect until the response is sent
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    return messages[0]["status"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure throughput and latency of the hot REST endpoints served "
+        "in-process through Django's WSGI handler from a thread pool and "
+        "through its ASGI handler from one event loop. Seeded rows are "
+        "committed, since requests use several connections, and deleted "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--meditations", type=int, default=200)
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--sessions", type=int, default=30)
+        parser.add_argument("--grades", type=int, default=15)
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Requests per endpoint and server",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=16,
+            help="WSGI threads and concurrent ASGI requests",
+        )
+        parser.add_argument(
+            "--endpoints",
+            nargs="+",
+            choices=list(ENDPOINTS),
+            default=list(ENDPOINTS),
+        )
+        parser.add_argument(
+            "--servers", nargs="+", choices=SERVERS, default=SERVERS
+        )
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument(
+            "--output", help="Write the JSON report to this file"
+        )
+
+    def handle(self, *args, **options):
+        workload = SyntheticWorkload(
+            themes=10, meditations=options["meditations"], seed=options["seed"]
+        )
+        progress_level_ids = []
+        try:
+            meditations = workload.seed_catalogue()
+            users = workload.seed_users(options["users"], "benchmark_request")
+            workload.seed_activity(
+                users, sessions=options["sessions"], grades=options["grades"]
+            )
+            workload.finalize()
+            UserInfo.objects.bulk_create(
+                [UserInfo(user=user, name=user.username) for user in users]
+            )
+            if not ProgressLevel.objects.exists():
+                progress_level_ids = [
+                    ProgressLevel.objects.create(level=level, name=name).id
+                    for level, name in [(10, "Beginner"), (100, "Advanced")]
+                ]
+
+            tokens = [
+                str(RefreshToken.for_user(user).access_token) for user in users
+            ]
+            endpoint_requests = {
+                endpoint: [
+                    (
+                        ENDPOINTS[endpoint].format(
+                            meditation_id=meditations[i % len(meditations)].id
+                        ),
+                        tokens[i % len(tokens)],
+                    )
+                    for i in range(options["requests"])
+                ]
+                for endpoint in options["endpoints"]
+            }
+            report = {
+                "commit": get_git_commit(),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "parameters": {
+                    key: options[key]
+                    for key in [
+                        "meditations",
+                        "users",
+                        "sessions",
+                        "grades",
+                        "requests",
+                        "concurrency",
+                    ]
+                },
+                "servers": {
+                    server: {
+                        endpoint: self.run_requests(
+                            server, requests, options["concurrency"]
+                        )
+                        for endpoint, requests in endpoint_requests.items()
+                    }
+                    for server in options["servers"]
+                },
+            }
+        finally:
+            self.delete_seeded_rows(workload, progress_level_ids)
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as report_file:
+                report_file.write(output + "\n")
+        self.stdout.write(output)
+
+    @staticmethod
+    def run_requests(server: str, requests: list, concurrency: int) -> dict:
+        results = []
+
+        if server == "wsgi":
+            application = WSGIHandler()
+
+            def call(request):
+                started = time.perf_counter()
+                status = call_wsgi(application, *request)
+                results.append((status, time.perf_counter() - started))
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as executor:
+                list(executor.map(call, requests))
+            elapsed = time.perf_counter() - started
+        else:
+            application = ASGIHandler()
+
+            async def run():
+                pending = iter(requests)
+
+                async def worker():
+                    for request in pending:
+                        started = time.perf_counter()
+                        status = await call_asgi(application, *request)
+                        results.append((status, time.perf_counter() - started))
+
+                await asyncio.gather(*[worker() for _ in range(concurrency)])
+
+            started = time.perf_counter()
+            asyncio.run(run())
+            elapsed = time.perf_counter() - started
+        connections.close_all()
+
+        return {
+            "requests": len(results),
+            "errors": sum(1 for status, _ in results if status != 200),
+            "requests_per_second": len(results) / elapsed,
+            "latency_ms": get_latency_percentiles(
+                [latency for _, latency in results]
+            ),
+        }
+
+    @staticmethod
+    def delete_seeded_rows(
+        workload: SyntheticWorkload, progress_level_ids: list
+    ) -> None:
+        meditation_ids = [meditation.id for meditation in workload.meditations]
+        meditations = Meditation.objects.filter(id__in=meditation_ids)
+        theme_ids = set(
+            meditations.values_list("meditation_theme_id", flat=True)
+        )
+        narrator_ids = set(
+            meditations.values_list("meditation_narrator_id", flat=True)
+        )
+        # Users first, so their activity goes before the catalogue
+        User.objects.filter(id__in=workload.user_ids).delete()
+        meditations.delete()
+        MeditationTheme.objects.filter(id__in=theme_ids).delete()
+        MeditationNarrator.objects.filter(id__in=narrator_ids).delete()
+        ProgressLevel.objects.filter(id__in=progress_level_ids).delete()
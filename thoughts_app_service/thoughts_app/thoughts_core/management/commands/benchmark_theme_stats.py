@@ -0,0 +1,96 @@
+import time
+from statistics import median
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from ...benchmarks.workload import SyntheticWorkload
+from ...models import MeditationGrade
+from ...repositories.UserThemeAffinityRepository import (
+    UserThemeAffinityRepository,
+)
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+
+
+def legacy_theme_grade_stats(user: User) -> list:
+    """Per-grade Python fold with a lazy meditation lookup per row."""
+    theme_to_grades = {}
+    for grade in MeditationGrade.objects.filter(user=user):
+        meditation_theme = grade.meditation.meditation_theme_id
+        theme_to_grades.setdefault(meditation_theme, []).append(grade.grade)
+    return [
+        (theme, sum(grades) / len(grades), len(grades))
+        for theme, grades in theme_to_grades.items()
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure query count and latency of the per-user theme grade "
+        "analysis as the number of grades grows. All seeded rows are "
+        "rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=DEFAULT_SIZES
+        )
+        parser.add_argument("--themes", type=int, default=10)
+        parser.add_argument("--meditations", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--legacy-max",
+            type=int,
+            default=1000,
+            help="Skip the N+1 legacy path above this many grades",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'grades':>8} {'path':<10} {'queries':>8} {'median ms':>10}"
+        )
+        for size in options["sizes"]:
+            with transaction.atomic():
+                user = self.seed(
+                    size, options["themes"], options["meditations"]
+                )
+                paths = {
+                    "affinity": UserThemeAffinityRepository.get_theme_grade_stats_of_user,
+                }
+                if size <= options["legacy_max"]:
+                    paths["legacy"] = legacy_theme_grade_stats
+
+                for name, get_stats in paths.items():
+                    queries, latency = self.measure(
+                        get_stats, user, options["repeat"]
+                    )
+                    self.stdout.write(
+                        f"{size:>8} {name:<10} {queries:>8} "
+                        f"{latency * 1000:>10.2f}"
+                    )
+                transaction.set_rollback(True)
+
+    @staticmethod
+    def seed(size: int, themes: int, meditations: int) -> User:
+        # Grades are unique per meditation, the catalogue must hold them all
+        workload = SyntheticWorkload(
+            themes=themes, meditations=max(meditations, size)
+        )
+        workload.seed_catalogue()
+        [user] = workload.seed_users(1, "benchmark")
+        workload.seed_activity([user], sessions=0, grades=size)
+        workload.finalize()
+        return user
+
+    @staticmethod
+    def measure(get_stats, user: User, repeat: int) -> tuple:
+        latencies = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                get_stats(user)
+                latencies.append(time.perf_counter() - started)
+        return len(queries), median(latencies)
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...services.CollaborativeFilteringService import (
+    CollaborativeFilteringService,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the item_cf recommendation model. By default only users with "
+        "grades or sessions added since the last build are refreshed; run "
+        "with --full periodically to pick up edited and deleted grades."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rebuild from scratch instead of updating the artifact",
+        )
+
+    def handle(self, *args, **options):
+        model = CollaborativeFilteringService.build_model(
+            incremental=not options["full"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Saved {settings.ITEM_CF_MODEL_PATH}: "
+                f"{len(model.user_ids)} users, "
+                f"{len(model.meditation_ids)} meditations"
+            )
+        )
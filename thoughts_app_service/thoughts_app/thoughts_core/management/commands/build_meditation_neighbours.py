@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from ...services.MeditationNeighbourService import (
+    BLOCK_SIZE,
+    NEIGHBOURS_PER_MEDITATION,
+    MeditationNeighbourService,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute the most related meditations of every meditation from "
+        "session co-occurrence, grade correlation and theme/narrator overlap"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top-k", type=int, default=NEIGHBOURS_PER_MEDITATION
+        )
+        parser.add_argument(
+            "--block-size",
+            type=int,
+            default=BLOCK_SIZE,
+            help="Meditations scored at once, bounds memory use",
+        )
+
+    def handle(self, *args, **options):
+        saved = MeditationNeighbourService.build_neighbours(
+            top_k=options["top_k"], block_size=options["block_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Saved {saved} meditation neighbours")
+        )
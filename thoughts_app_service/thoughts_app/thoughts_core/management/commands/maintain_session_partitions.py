@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from ...services.MeditationSessionPartitionService import (
+    MeditationSessionPartitionService,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the MeditationSession partitions of the coming months and "
+        "roll the ones older than MEDITATION_SESSION_RETENTION_MONTHS up "
+        "into MeditationSessionRollup before dropping them"
+    )
+
+    def handle(self, *args, **options):
+        created, dropped, session_count = (
+            MeditationSessionPartitionService.maintain()
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {created} and dropped {dropped} partitions, "
+                f"rolled up {session_count} sessions"
+            )
+        )
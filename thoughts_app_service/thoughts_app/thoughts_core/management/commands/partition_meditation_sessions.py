@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from ...services.MeditationSessionPartitionService import (
+    MeditationSessionPartitionService,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Convert MeditationSession into a table partitioned by month on "
+        "session_start_time. The table is locked while its rows are copied, "
+        "run it in a maintenance window"
+    )
+
+    def handle(self, *args, **options):
+        created = MeditationSessionPartitionService.partition()
+        if not created:
+            self.stdout.write("MeditationSession is already partitioned")
+            return
+        self.stdout.write(
+            self.style.SUCCESS(f"Created {created} monthly partitions")
+        )
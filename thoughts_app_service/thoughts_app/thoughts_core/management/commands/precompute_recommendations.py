@@ -0,0 +1,84 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Max, Min
+
+from ...services.CatalogueService import CatalogueService
+from ...services.RecommendationSnapshotService import (
+    RecommendationSnapshotService,
+)
+
+
+def close_inherited_connections():
+    # Forked workers must open their own database connections
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute recommendation snapshots for every user in parallel "
+        "worker processes, chunked by user id range"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=multiprocessing.cpu_count(),
+            help="Worker processes, 0 computes in the current process",
+        )
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        user_ids = User.objects.aggregate(first=Min("id"), last=Max("id"))
+        if user_ids["first"] is None:
+            self.stdout.write("No users to precompute recommendations for")
+            return
+
+        chunk_size = options["chunk_size"]
+        catalogue_version = CatalogueService.get_version()
+        user_id_ranges = [
+            (first_user_id, first_user_id + chunk_size - 1, catalogue_version)
+            for first_user_id in range(
+                user_ids["first"], user_ids["last"] + 1, chunk_size
+            )
+        ]
+
+        if options["workers"] == 0:
+            computed = sum(
+                RecommendationSnapshotService.precompute_user_range(*args)
+                for args in user_id_ranges
+            )
+        else:
+            computed = self.precompute_in_pool(
+                user_id_ranges, options["workers"]
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Precomputed recommendations for {computed} users"
+            )
+        )
+
+    def precompute_in_pool(self, user_id_ranges: list, workers: int) -> int:
+        connections.close_all()
+        computed = 0
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=close_inherited_connections,
+        ) as executor:
+            futures = [
+                executor.submit(
+                    RecommendationSnapshotService.precompute_user_range,
+                    *args,
+                )
+                for args in user_id_ranges
+            ]
+            for future in as_completed(futures):
+                computed += future.result()
+                self.stdout.write(f"Precomputed {computed} users so far")
+        return computed
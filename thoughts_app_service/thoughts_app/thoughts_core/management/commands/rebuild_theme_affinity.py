@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from ...repositories.UserThemeAffinityRepository import (
+    UserThemeAffinityRepository,
+)
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-user theme affinity totals from MeditationGrade rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user-id",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Rebuild only the given user (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        created = UserThemeAffinityRepository.rebuild(
+            user_ids=options["user_ids"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {created} theme affinity rows")
+        )
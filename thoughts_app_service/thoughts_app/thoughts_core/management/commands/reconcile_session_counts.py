@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from ...repositories.UserSessionStatsRepository import (
+    UserSessionStatsRepository,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount per-user session counters from MeditationSession rows, "
+        "repairing drift left by bulk writes or raw SQL"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user-id",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Reconcile only the given user (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        repaired = UserSessionStatsRepository.reconcile(
+            user_ids=options["user_ids"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Repaired {repaired} session counters")
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from ...services.MeditationPopularityService import (
+    MeditationPopularityService,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Drop meditation popularity buckets older than "
+        "MEDITATION_POPULARITY_WINDOW_DAYS and refresh the cached popular "
+        "meditations"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recount the window from MeditationSession and "
+            "MeditationGrade rows first",
+        )
+
+    def handle(self, *args, **options):
+        written, deleted = MeditationPopularityService.refresh(
+            rebuild=options["rebuild"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {written} and deleted {deleted} popularity buckets"
+            )
+        )
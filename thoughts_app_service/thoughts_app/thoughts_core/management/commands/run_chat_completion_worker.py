@@ -0,0 +1,122 @@
+import multiprocessing
+import signal
+import time
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from ...services.ChatCompletionJobService import ChatCompletionJobService
+from ...services.logger import logger
+from ...views import run_chat_completion_job
+
+
+class Worker:
+    """Claims and answers chatbot jobs one at a time until stopped."""
+
+    def __init__(self, burst: bool = False, max_jobs: int | None = None):
+        self.burst = burst
+        self.max_jobs = max_jobs
+        self.stopping = False
+
+    def stop(self, *args) -> None:
+        # The job in progress is finished first
+        self.stopping = True
+
+    def run(self) -> int:
+        jobs_done = 0
+        while not self.stopping and (
+            self.max_jobs is None or jobs_done < self.max_jobs
+        ):
+            close_old_connections()
+            job = ChatCompletionJobService.claim_next_job()
+            if job is None:
+                if self.burst:
+                    break
+                time.sleep(settings.CHAT_COMPLETION_JOB_POLL_INTERVAL)
+                continue
+            try:
+                async_to_sync(run_chat_completion_job)(job)
+            except Exception as e:
+                logger.exception(f"Chat completion job {job.id} crashed")
+                ChatCompletionJobService.retry(
+                    job,
+                    delay=settings.CHAT_COMPLETION_JOB_POLL_INTERVAL,
+                    error=repr(e),
+                )
+            jobs_done += 1
+        return jobs_done
+
+
+def run_worker_process(burst: bool, max_jobs: int | None) -> None:
+    worker = Worker(burst=burst, max_jobs=max_jobs)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Answer chatbot messages posted in job mode. Each worker process "
+        "claims one queued job at a time from the database, so workers "
+        "can run on any number of hosts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Worker processes, each answering one job at a time",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue is empty instead of polling it",
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            default=None,
+            help="Exit after this many jobs per process",
+        )
+
+    def handle(self, *args, **options):
+        if options["processes"] == 1:
+            worker = Worker(
+                burst=options["burst"], max_jobs=options["max_jobs"]
+            )
+            previous_handler = signal.signal(signal.SIGTERM, worker.stop)
+            try:
+                jobs_done = worker.run()
+            finally:
+                signal.signal(signal.SIGTERM, previous_handler)
+            self.stdout.write(f"Answered {jobs_done} chat completion jobs")
+            return
+
+        # Children must not share the parent's database connections
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(
+                target=run_worker_process,
+                args=(options["burst"], options["max_jobs"]),
+            )
+            for _ in range(options["processes"])
+        ]
+        for process in processes:
+            process.start()
+
+        def stop(*args):
+            for process in processes:
+                process.terminate()
+
+        signal.signal(signal.SIGTERM, stop)
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            # Ctrl+C reaches the children too, wait for their jobs
+            for process in processes:
+                process.join()
@@ -0,0 +1,89 @@
+# Generated by Django 5.0.3 on 2026-10-18 13:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+BATCH_SIZE = 500
+
+
+def fill_theme_affinities(apps, schema_editor):
+    """Sum up the grades given so far, a batch of users at a time."""
+    MeditationGrade = apps.get_model("thoughts_core", "MeditationGrade")
+    UserThemeAffinity = apps.get_model("thoughts_core", "UserThemeAffinity")
+    grades = MeditationGrade.objects.filter(
+        meditation__meditation_theme__isnull=False
+    )
+
+    last_user_id = 0
+    while True:
+        user_ids = list(
+            grades.filter(user_id__gt=last_user_id)
+            .order_by("user_id")
+            .values_list("user_id", flat=True)
+            .distinct()[:BATCH_SIZE]
+        )
+        if not user_ids:
+            return
+        last_user_id = user_ids[-1]
+
+        UserThemeAffinity.objects.bulk_create(
+            [
+                UserThemeAffinity(
+                    user_id=row["user_id"],
+                    meditation_theme_id=row["meditation__meditation_theme_id"],
+                    grade_sum=row["grade_sum"],
+                    grade_count=row["grade_count"],
+                )
+                for row in grades.filter(user_id__in=user_ids)
+                .values("user_id", "meditation__meditation_theme_id")
+                .annotate(grade_sum=Sum("grade"), grade_count=Count("id"))
+                .order_by()
+            ]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("thoughts_core", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserThemeAffinity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("grade_sum", models.BigIntegerField(default=0)),
+                ("grade_count", models.IntegerField(default=0)),
+                (
+                    "meditation_theme",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="thoughts_core.meditationtheme",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("user", "meditation_theme")},
+            },
+        ),
+        migrations.RunPython(fill_theme_affinities, migrations.RunPython.noop),
+    ]
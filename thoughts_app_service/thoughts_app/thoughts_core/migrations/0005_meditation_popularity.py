@@ -0,0 +1,42 @@
+# Generated by Django 5.0.3 on 2026-10-18 13:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("thoughts_core", "0004_recommendation_snapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MeditationPopularityBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("session_count", models.IntegerField(default=0)),
+                ("grade_sum", models.BigIntegerField(default=0)),
+                ("grade_count", models.IntegerField(default=0)),
+                (
+                    "meditation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="thoughts_core.meditation",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("meditation", "day")},
+            },
+        ),
+    ]
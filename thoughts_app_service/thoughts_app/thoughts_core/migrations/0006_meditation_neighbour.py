@@ -0,0 +1,49 @@
+# Generated by Django 5.0.3 on 2026-10-18 14:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("thoughts_core", "0005_meditation_popularity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MeditationNeighbour",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField()),
+                ("rank", models.PositiveSmallIntegerField()),
+                (
+                    "meditation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="neighbours",
+                        to="thoughts_core.meditation",
+                    ),
+                ),
+                (
+                    "neighbour",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="thoughts_core.meditation",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("meditation", "rank")},
+            },
+        ),
+    ]
@@ -0,0 +1,77 @@
+import json
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+
+def get_message_content(message):
+    # The seed data and older clients wrote {"text": ..., "timestamp": ...}
+    content = message.get("content")
+    if content is None:
+        content = message.get("text") or ""
+    if isinstance(content, str):
+        return content
+    return json.dumps(content, ensure_ascii=False)
+
+
+def copy_chat_messages(apps, schema_editor):
+    Chat = apps.get_model("thoughts_core", "Chat")
+    ChatMessage = apps.get_model("thoughts_core", "ChatMessage")
+
+    batch = []
+    for chat_id, chat_messages in (
+        Chat.objects.exclude(chat_messages=[])
+        .values_list("id", "chat_messages")
+        .iterator(chunk_size=BATCH_SIZE)
+    ):
+        sequence = 0
+        for message in chat_messages:
+            if not isinstance(message, dict):
+                message = {"content": message}
+            content = get_message_content(message)
+            if not content.strip():
+                # OpenAI rejects messages without content
+                continue
+            sequence += 1
+            batch.append(
+                ChatMessage(
+                    chat_id=chat_id,
+                    sequence=sequence,
+                    role=message.get("role") or "user",
+                    content=content,
+                )
+            )
+        if len(batch) >= BATCH_SIZE:
+            ChatMessage.objects.bulk_create(batch)
+            batch = []
+    ChatMessage.objects.bulk_create(batch)
+
+
+def restore_chat_messages(apps, schema_editor):
+    Chat = apps.get_model("thoughts_core", "Chat")
+    ChatMessage = apps.get_model("thoughts_core", "ChatMessage")
+
+    chat_messages = {}
+    for chat_id, role, content in (
+        ChatMessage.objects.order_by("chat_id", "sequence")
+        .values_list("chat_id", "role", "content")
+        .iterator(chunk_size=BATCH_SIZE)
+    ):
+        chat_messages.setdefault(chat_id, []).append(
+            {"role": role, "content": content}
+        )
+    for chat_id, messages in chat_messages.items():
+        Chat.objects.filter(pk=chat_id).update(chat_messages=messages)
+    ChatMessage.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("thoughts_core", "0007_chat_message"),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_chat_messages, restore_chat_messages),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.3 on 2026-10-18 14:11
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("thoughts_core", "0008_copy_chat_messages"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="chat",
+            name="chat_messages",
+        ),
+    ]
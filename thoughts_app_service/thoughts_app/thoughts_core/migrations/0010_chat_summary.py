@@ -0,0 +1,23 @@
+# Generated by Django 5.0.3 on 2026-10-18 14:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("thoughts_core", "0009_remove_chat_chat_messages"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chat",
+            name="summarized_until",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="chat",
+            name="summary",
+            field=models.TextField(blank=True, default=""),
+        ),
+    ]
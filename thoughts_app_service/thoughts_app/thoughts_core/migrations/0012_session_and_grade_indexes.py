@@ -0,0 +1,85 @@
+# Generated by Django 5.0.3 on 2026-10-18 14:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("thoughts_core", "0011_chat_completion_job"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="meditationgrade",
+            index=models.Index(
+                fields=["user", "meditation"],
+                name="thoughts_co_user_id_d07836_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="meditationsession",
+            index=models.Index(
+                fields=["user", "session_start_time"],
+                name="thoughts_co_user_id_42be31_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="meditationsession",
+            index=models.Index(
+                fields=["user", "meditation"],
+                name="thoughts_co_user_id_4da3f5_idx",
+            ),
+        ),
+        # AlterField would drop and re-validate the foreign keys as well,
+        # only the single-column user indexes have to go
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name="meditationgrade",
+                    name="user",
+                    field=models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="meditationsession",
+                    name="user",
+                    field=models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql=(
+                        "DROP INDEX IF EXISTS "
+                        '"thoughts_core_meditationgrade_user_id_86790609"'
+                    ),
+                    reverse_sql=(
+                        "CREATE INDEX "
+                        '"thoughts_core_meditationgrade_user_id_86790609" '
+                        'ON "thoughts_core_meditationgrade" ("user_id")'
+                    ),
+                ),
+                migrations.RunSQL(
+                    sql=(
+                        "DROP INDEX IF EXISTS "
+                        '"thoughts_core_meditationsession_user_id_eec65081"'
+                    ),
+                    reverse_sql=(
+                        "CREATE INDEX "
+                        '"thoughts_core_meditationsession_user_id_eec65081" '
+                        'ON "thoughts_core_meditationsession" ("user_id")'
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.0.3 on 2026-10-18 14:56
+
+from django.conf import settings
+from django.db import migrations, models, transaction
+from django.db.models import Count, Sum
+
+BATCH_SIZE = 500
+
+
+def rebuild_theme_affinities(apps, user_ids):
+    MeditationGrade = apps.get_model("thoughts_core", "MeditationGrade")
+    UserThemeAffinity = apps.get_model("thoughts_core", "UserThemeAffinity")
+
+    UserThemeAffinity.objects.filter(user_id__in=user_ids).delete()
+    UserThemeAffinity.objects.bulk_create(
+        [
+            UserThemeAffinity(
+                user_id=row["user_id"],
+                meditation_theme_id=row["meditation__meditation_theme_id"],
+                grade_sum=row["grade_sum"],
+                grade_count=row["grade_count"],
+            )
+            for row in MeditationGrade.objects.filter(
+                user_id__in=user_ids,
+                meditation__meditation_theme__isnull=False,
+            )
+            .values("user_id", "meditation__meditation_theme_id")
+            .annotate(grade_sum=Sum("grade"), grade_count=Count("id"))
+            .order_by()
+        ]
+    )
+
+
+def remove_duplicate_grades(apps, schema_editor):
+    """Keep the latest grade of every user and meditation.
+
+    Users are walked in batches, each in its own transaction, and the theme
+    affinities of users that had duplicates are recounted.
+    """
+    MeditationGrade = apps.get_model("thoughts_core", "MeditationGrade")
+
+    last_user_id = 0
+    while True:
+        user_ids = list(
+            MeditationGrade.objects.filter(user_id__gt=last_user_id)
+            .order_by("user_id")
+            .values_list("user_id", flat=True)
+            .distinct()[:BATCH_SIZE]
+        )
+        if not user_ids:
+            return
+        last_user_id = user_ids[-1]
+
+        with transaction.atomic():
+            kept_pairs, duplicate_ids, affected_user_ids = set(), [], set()
+            for grade_id, user_id, meditation_id in (
+                MeditationGrade.objects.filter(user_id__in=user_ids)
+                .order_by("user_id", "meditation_id", "-id")
+                .values_list("id", "user_id", "meditation_id")
+                .iterator()
+            ):
+                if (user_id, meditation_id) in kept_pairs:
+                    duplicate_ids.append(grade_id)
+                    affected_user_ids.add(user_id)
+                else:
+                    kept_pairs.add((user_id, meditation_id))
+            if duplicate_ids:
+                MeditationGrade.objects.filter(id__in=duplicate_ids).delete()
+                rebuild_theme_affinities(apps, affected_user_ids)
+
+
+class Migration(migrations.Migration):
+    # Batches commit one by one instead of locking the table throughout
+    atomic = False
+
+    dependencies = [
+        ("thoughts_core", "0012_session_and_grade_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_grades, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="meditationgrade",
+            constraint=models.UniqueConstraint(
+                fields=("user", "meditation"), name="unique_meditation_grade"
+            ),
+        ),
+        # The unique constraint serves the same lookups
+        migrations.RemoveIndex(
+            model_name="meditationgrade",
+            name="thoughts_co_user_id_d07836_idx",
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("thoughts_core", "0013_unique_meditation_grade"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserSessionStats",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("session_count", models.IntegerField(default=0)),
+            ],
+        ),
+    ]
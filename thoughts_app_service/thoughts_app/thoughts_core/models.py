@@ -1,7 +1,8 @@
 import uuid
 
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
 
 class Achievement(models.Model):
@@ -62,36 +63,237 @@ class Meditation(models.Model):
     audio_file_url = models.URLField()
     cover_file_url = models.URLField()
 
+    def save(self, *args, **kwargs):
+        # post_save receivers (UserThemeAffinity upkeep on theme changes)
+        # must share the transaction of the meditation write itself
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Meditation: {self.name}"
 
 
+class CatalogueVersion(models.Model):
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"CatalogueVersion: {self.version}"
+
+
 class MeditationSession(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Covered by the composite indexes, which all start with the user
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     meditation = models.ForeignKey(Meditation, on_delete=models.CASCADE)
     session_start_time = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "session_start_time"]),
+            models.Index(fields=["user", "meditation"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        # post_save receivers (UserSessionStats upkeep) must share the
+        # transaction of the session write itself
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"MeditationSession from {self.user} for {self.meditation}"
 
 
+class MeditationSessionRollup(models.Model):
+    # Sessions of a month whose MeditationSession partition was dropped by
+    # the retention job
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    meditation = models.ForeignKey(Meditation, on_delete=models.CASCADE)
+    month = models.DateField()
+    session_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "meditation", "month"],
+                name="unique_meditation_session_rollup",
+            )
+        ]
+
+    def __str__(self):
+        return (
+            f"MeditationSessionRollup of {self.user} for {self.meditation} "
+            f"in {self.month:%Y-%m}: {self.session_count}"
+        )
+
+
 class MeditationGrade(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Covered by the unique constraint, which starts with the user
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     meditation = models.ForeignKey(Meditation, on_delete=models.CASCADE)
     grade = models.IntegerField()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "meditation"], name="unique_meditation_grade"
+            )
+        ]
+
+    def save(self, *args, **kwargs):
+        # post_save receivers (UserThemeAffinity upkeep) must share the
+        # transaction of the grade write itself
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"MeditationGrade from {self.user} for {self.meditation} = {self.grade}"
 
 
+class UserThemeAffinity(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    meditation_theme = models.ForeignKey(
+        MeditationTheme, on_delete=models.CASCADE
+    )
+    grade_sum = models.BigIntegerField(default=0)
+    grade_count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user", "meditation_theme")
+
+    def __str__(self):
+        return (
+            f"UserThemeAffinity of {self.user} for {self.meditation_theme}: "
+            f"{self.grade_sum}/{self.grade_count}"
+        )
+
+
+class UserSessionStats(models.Model):
+    # Kept by MeditationSession signals, created from a COUNT of the
+    # sessions the first time it is needed
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True
+    )
+    session_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"UserSessionStats of {self.user}: {self.session_count}"
+
+
+class RecommendationSnapshot(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE)
+    meditation_ids = models.JSONField(default=list)
+    catalogue_version = models.BigIntegerField()
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"RecommendationSnapshot for {self.user} at {self.computed_at}"
+
+
+class MeditationPopularityBucket(models.Model):
+    meditation = models.ForeignKey(Meditation, on_delete=models.CASCADE)
+    day = models.DateField()
+    session_count = models.IntegerField(default=0)
+    grade_sum = models.BigIntegerField(default=0)
+    grade_count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("meditation", "day")
+
+    def __str__(self):
+        return (
+            f"MeditationPopularityBucket of {self.meditation} on {self.day}: "
+            f"{self.session_count} sessions, "
+            f"{self.grade_sum}/{self.grade_count}"
+        )
+
+
+class MeditationNeighbour(models.Model):
+    meditation = models.ForeignKey(
+        Meditation, on_delete=models.CASCADE, related_name="neighbours"
+    )
+    neighbour = models.ForeignKey(
+        Meditation, on_delete=models.CASCADE, related_name="+"
+    )
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        # Also the index the "similar" endpoint reads neighbours by
+        unique_together = ("meditation", "rank")
+
+    def __str__(self):
+        return (
+            f"MeditationNeighbour #{self.rank} of {self.meditation}: "
+            f"{self.neighbour} ({self.score:.3f})"
+        )
+
+
 class Chat(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    chat_messages = models.JSONField(default=list)
+    # Running summary of the messages up to and including sequence
+    # summarized_until, sent to the model instead of those messages
+    summary = models.TextField(blank=True, default="")
+    summarized_until = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True, editable=False)
     updated_at = models.DateTimeField(auto_now=True, editable=False)
 
 
+class ChatMessage(models.Model):
+    chat = models.ForeignKey(
+        Chat, on_delete=models.CASCADE, related_name="messages"
+    )
+    sequence = models.PositiveIntegerField()
+    role = models.CharField(max_length=16)
+    content = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True, editable=False)
+
+    class Meta:
+        unique_together = ("chat", "sequence")
+
+    def __str__(self):
+        return f"ChatMessage #{self.sequence} of {self.chat_id} ({self.role})"
+
+
+class ChatCompletionJob(models.Model):
+    """Chatbot turn queued for the run_chat_completion_worker command."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    chat = models.ForeignKey(
+        Chat, on_delete=models.CASCADE, related_name="completion_jobs"
+    )
+    message = models.TextField()
+    use_cache = models.BooleanField(default=True)
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=QUEUED
+    )
+    # Validated chatbot reply once the job succeeded
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Queued jobs are not claimed before this time, running jobs are
+    # reclaimed after it, as their worker is presumed dead
+    available_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True, editable=False)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "available_at"])]
+
+    def __str__(self):
+        return f"ChatCompletionJob {self.id} of {self.chat_id} ({self.status})"
+
+
 class ProgressLevel(models.Model):
     level = models.IntegerField()
     name = models.CharField(max_length=255)
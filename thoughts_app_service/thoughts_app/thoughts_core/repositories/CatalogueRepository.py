@@ -0,0 +1,35 @@
+from django.db.models import F
+
+from ..models import CatalogueVersion
+
+CATALOGUE_VERSION_ID = 1
+
+
+class CatalogueRepository:
+    @staticmethod
+    def get_version() -> int:
+        version = (
+            CatalogueVersion.objects.filter(pk=CATALOGUE_VERSION_ID)
+            .values_list("version", flat=True)
+            .first()
+        )
+        return version or 0
+
+    @staticmethod
+    async def aget_version() -> int:
+        version = (
+            await CatalogueVersion.objects.filter(pk=CATALOGUE_VERSION_ID)
+            .values_list("version", flat=True)
+            .afirst()
+        )
+        return version or 0
+
+    @staticmethod
+    def bump_version() -> None:
+        updated = CatalogueVersion.objects.filter(
+            pk=CATALOGUE_VERSION_ID
+        ).update(version=F("version") + 1)
+        if not updated:
+            CatalogueVersion.objects.get_or_create(
+                pk=CATALOGUE_VERSION_ID, defaults={"version": 1}
+            )
@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Chat, ChatCompletionJob
+
+
+class ChatCompletionJobRepository:
+    @staticmethod
+    async def acreate_job(
+        chat: Chat, message: str, use_cache: bool
+    ) -> ChatCompletionJob:
+        return await ChatCompletionJob.objects.acreate(
+            chat=chat, message=message, use_cache=use_cache
+        )
+
+    @staticmethod
+    async def aget_job_of_user(job_id, user) -> ChatCompletionJob | None:
+        return await ChatCompletionJob.objects.filter(
+            pk=job_id, chat__user=user
+        ).afirst()
+
+    @staticmethod
+    def claim_next_job(lease: float) -> ChatCompletionJob | None:
+        """Oldest available job, marked running until `lease` seconds from
+        now. Jobs locked by other workers are skipped, not waited for."""
+        now = timezone.now()
+        with transaction.atomic():
+            job = (
+                ChatCompletionJob.objects.select_for_update(
+                    skip_locked=True, of=("self",)
+                )
+                .select_related("chat")
+                .filter(
+                    status__in=[
+                        ChatCompletionJob.QUEUED,
+                        ChatCompletionJob.RUNNING,
+                    ],
+                    available_at__lte=now,
+                )
+                .order_by("available_at")
+                .first()
+            )
+            if job is None:
+                return None
+            job.status = ChatCompletionJob.RUNNING
+            job.attempts += 1
+            job.available_at = now + timedelta(seconds=lease)
+            job.save(update_fields=["status", "attempts", "available_at"])
+        return job
+
+    @staticmethod
+    def get_claimed_job(job: ChatCompletionJob):
+        # Nothing changes once the lease expired and another worker claimed
+        # the job again
+        return ChatCompletionJob.objects.filter(
+            pk=job.pk,
+            status=ChatCompletionJob.RUNNING,
+            attempts=job.attempts,
+        )
+
+    @staticmethod
+    def finish_job(
+        job: ChatCompletionJob,
+        status: str,
+        result: dict | None = None,
+        error: str = "",
+    ) -> bool:
+        """Finish the job if it is still claimed, returns whether it was.
+        The updated row stays locked until the transaction commits."""
+        return bool(
+            ChatCompletionJobRepository.get_claimed_job(job).update(
+                status=status,
+                result=result,
+                error=error,
+                finished_at=timezone.now(),
+            )
+        )
+
+    @staticmethod
+    def requeue_job(
+        job: ChatCompletionJob, delay: float, error: str = ""
+    ) -> None:
+        ChatCompletionJobRepository.get_claimed_job(job).update(
+            status=ChatCompletionJob.QUEUED,
+            error=error,
+            available_at=timezone.now() + timedelta(seconds=delay),
+        )
@@ -0,0 +1,64 @@
+from typing import List
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from ..models import Chat, ChatMessage
+
+
+class ChatRepository:
+    @staticmethod
+    async def aget_messages_of_chat(
+        chat_id, after_sequence: int = 0
+    ) -> List[dict]:
+        return [
+            message
+            async for message in ChatMessage.objects.filter(
+                chat_id=chat_id, sequence__gt=after_sequence
+            )
+            .order_by("sequence")
+            .values("sequence", "role", "content")
+        ]
+
+    @staticmethod
+    async def asave_summary(chat_id, summary: str, summarized_until: int):
+        # A concurrent request may have folded further already
+        await Chat.objects.filter(
+            pk=chat_id, summarized_until__lt=summarized_until
+        ).aupdate(summary=summary, summarized_until=summarized_until)
+
+    @staticmethod
+    def append_messages(chat_id, messages: List[dict]) -> List[ChatMessage]:
+        with transaction.atomic():
+            # The UPDATE locks the chat row until commit, so concurrent
+            # appends to the same chat take their sequence numbers in turn
+            Chat.objects.filter(pk=chat_id).update(updated_at=timezone.now())
+            last_sequence = (
+                ChatMessage.objects.filter(chat_id=chat_id).aggregate(
+                    last=Max("sequence")
+                )["last"]
+                or 0
+            )
+            return ChatMessage.objects.bulk_create(
+                [
+                    ChatMessage(
+                        chat_id=chat_id,
+                        sequence=sequence,
+                        role=message["role"],
+                        content=message["content"],
+                    )
+                    for sequence, message in enumerate(
+                        messages, start=last_sequence + 1
+                    )
+                ]
+            )
+
+    @staticmethod
+    async def aappend_messages(
+        chat_id, messages: List[dict]
+    ) -> List[ChatMessage]:
+        return await sync_to_async(ChatRepository.append_messages)(
+            chat_id, messages
+        )
@@ -0,0 +1,75 @@
+from typing import List
+
+from django.db import transaction
+from django.db.models import Avg
+
+from ..models import (
+    Meditation,
+    MeditationGrade,
+    MeditationNeighbour,
+    MeditationSession,
+)
+
+SAVE_BATCH_SIZE = 5000
+
+
+class MeditationNeighbourRepository:
+    @staticmethod
+    def get_neighbours_of_meditation(
+        meditation_id: int, amount: int
+    ) -> List[Meditation]:
+        return [
+            meditation_neighbour.neighbour
+            for meditation_neighbour in MeditationNeighbour.objects.filter(
+                meditation_id=meditation_id
+            )
+            .select_related("neighbour")
+            .order_by("rank")[:amount]
+        ]
+
+    @staticmethod
+    async def aget_neighbours_of_meditation(
+        meditation_id: int, amount: int
+    ) -> List[Meditation]:
+        return [
+            meditation_neighbour.neighbour
+            async for meditation_neighbour in MeditationNeighbour.objects.filter(
+                meditation_id=meditation_id
+            )
+            .select_related("neighbour")
+            .order_by("rank")[:amount]
+        ]
+
+    @staticmethod
+    def get_catalogue_features() -> List[tuple]:
+        return list(
+            Meditation.objects.order_by("id").values_list(
+                "id", "meditation_theme_id", "meditation_narrator_id"
+            )
+        )
+
+    @staticmethod
+    def get_session_pairs():
+        return (
+            MeditationSession.objects.values_list("user_id", "meditation_id")
+            .distinct()
+            .order_by()
+            .iterator()
+        )
+
+    @staticmethod
+    def get_average_grades():
+        return (
+            MeditationGrade.objects.values_list("user_id", "meditation_id")
+            .annotate(avg_grade=Avg("grade"))
+            .order_by()
+            .iterator()
+        )
+
+    @staticmethod
+    def replace_neighbours(neighbours: List[MeditationNeighbour]) -> None:
+        with transaction.atomic():
+            MeditationNeighbour.objects.all().delete()
+            MeditationNeighbour.objects.bulk_create(
+                neighbours, batch_size=SAVE_BATCH_SIZE
+            )
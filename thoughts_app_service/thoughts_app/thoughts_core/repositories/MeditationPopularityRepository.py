@@ -0,0 +1,135 @@
+from datetime import date
+from typing import List
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Sum, Window
+from django.db.models.functions import Cast, RowNumber, TruncDate
+
+from ..models import (
+    MeditationGrade,
+    MeditationPopularityBucket,
+    MeditationSession,
+)
+
+REBUILD_BATCH_SIZE = 1000
+MAX_GRADE = 5
+
+
+class MeditationPopularityRepository:
+    @staticmethod
+    def add_activity(
+        meditation_id: int,
+        day: date,
+        session_count: int = 0,
+        grade_sum: int = 0,
+        grade_count: int = 0,
+    ) -> None:
+        updated = MeditationPopularityBucket.objects.filter(
+            meditation_id=meditation_id, day=day
+        ).update(
+            session_count=F("session_count") + session_count,
+            grade_sum=F("grade_sum") + grade_sum,
+            grade_count=F("grade_count") + grade_count,
+        )
+        if updated or max(session_count, grade_sum, grade_count) <= 0:
+            # Retractions only touch existing buckets, the meditation may be
+            # in the middle of a cascade delete
+            return
+
+        bucket, created = MeditationPopularityBucket.objects.get_or_create(
+            meditation_id=meditation_id,
+            day=day,
+            defaults={
+                "session_count": session_count,
+                "grade_sum": grade_sum,
+                "grade_count": grade_count,
+            },
+        )
+        if not created:
+            MeditationPopularityBucket.objects.filter(pk=bucket.pk).update(
+                session_count=F("session_count") + session_count,
+                grade_sum=F("grade_sum") + grade_sum,
+                grade_count=F("grade_count") + grade_count,
+            )
+
+    @staticmethod
+    def get_top_meditation_ids(since: date, amount: int) -> List[tuple]:
+        """(theme id, meditation id) of the `amount` most popular meditations
+        of every theme since the given day.
+
+        A session counts as one point and a grade as grade / MAX_GRADE points.
+        Rows are interleaved: every theme's best meditation comes first, then
+        every theme's second best and so on, by score within a rank.
+        """
+        return list(
+            MeditationPopularityBucket.objects.filter(day__gte=since)
+            .values("meditation_id", "meditation__meditation_theme_id")
+            .annotate(
+                score=Sum("session_count")
+                + Cast(Sum("grade_sum"), FloatField()) / MAX_GRADE,
+            )
+            .filter(score__gt=0)
+            .annotate(
+                theme_rank=Window(
+                    expression=RowNumber(),
+                    partition_by=F("meditation__meditation_theme_id"),
+                    order_by=(F("score").desc(), F("meditation_id").asc()),
+                )
+            )
+            .filter(theme_rank__lte=amount)
+            .order_by("theme_rank", "-score", "meditation_id")
+            .values_list("meditation__meditation_theme_id", "meditation_id")
+        )
+
+    @staticmethod
+    def rebuild(since: date, today: date) -> int:
+        """Recount buckets from `since` on.
+
+        Grades carry no timestamp, so recounted grades land on `today`.
+        """
+        buckets = {}
+        for row in (
+            MeditationSession.objects.annotate(
+                day=TruncDate("session_start_time")
+            )
+            .filter(day__gte=since)
+            .values("meditation_id", "day")
+            .annotate(session_count=Count("id"))
+            .order_by()
+            .iterator()
+        ):
+            buckets[(row["meditation_id"], row["day"])] = (
+                MeditationPopularityBucket(
+                    meditation_id=row["meditation_id"],
+                    day=row["day"],
+                    session_count=row["session_count"],
+                )
+            )
+        for row in (
+            MeditationGrade.objects.values("meditation_id")
+            .annotate(grade_sum=Sum("grade"), grade_count=Count("id"))
+            .order_by()
+            .iterator()
+        ):
+            bucket = buckets.setdefault(
+                (row["meditation_id"], today),
+                MeditationPopularityBucket(
+                    meditation_id=row["meditation_id"], day=today
+                ),
+            )
+            bucket.grade_sum = row["grade_sum"]
+            bucket.grade_count = row["grade_count"]
+
+        with transaction.atomic():
+            MeditationPopularityBucket.objects.all().delete()
+            MeditationPopularityBucket.objects.bulk_create(
+                buckets.values(), batch_size=REBUILD_BATCH_SIZE
+            )
+        return len(buckets)
+
+    @staticmethod
+    def delete_buckets_before(day: date) -> int:
+        deleted, _ = MeditationPopularityBucket.objects.filter(
+            day__lt=day
+        ).delete()
+        return deleted
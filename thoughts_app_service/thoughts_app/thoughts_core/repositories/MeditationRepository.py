@@ -1,5 +1,8 @@
 from datetime import datetime
-from typing import List
+from typing import Dict, Iterable, List
+
+from django.db.models import Case, F, IntegerField, When, Window
+from django.db.models.functions import Random, RowNumber
 
 from ..models import (
     Meditation,
@@ -107,12 +110,69 @@ class MeditationRepository:
     def get_all_meditations() -> List[Meditation]:
         return Meditation.objects.all()
 
+    @staticmethod
+    def get_all_meditation_ids() -> List[int]:
+        return Meditation.objects.order_by().values_list("id", flat=True)
+
+    @staticmethod
+    def get_meditations_by_ids(meditation_ids: List[int]) -> List[Meditation]:
+        meditations = Meditation.objects.in_bulk(meditation_ids)
+        return [
+            meditations[meditation_id]
+            for meditation_id in meditation_ids
+            if meditation_id in meditations
+        ]
+
     @staticmethod
     def get_meditations_by_meditation_theme(
         meditation_theme: MeditationTheme,
     ) -> List[Meditation]:
         return Meditation.objects.filter(meditation_theme_id=meditation_theme)
 
+    @staticmethod
+    def get_meditations_by_theme_quotas(
+        theme_quotas: List[tuple], excluded_user: User | None = None
+    ) -> List[Meditation]:
+        """Pick up to `quota` random meditations per theme in one query."""
+        theme_quotas = [
+            (meditation_theme, quota)
+            for meditation_theme, quota in theme_quotas
+            if quota > 0
+        ]
+        if not theme_quotas:
+            return []
+
+        meditations = Meditation.objects.filter(
+            meditation_theme_id__in=[
+                meditation_theme for meditation_theme, _ in theme_quotas
+            ]
+        )
+        if excluded_user is not None:
+            meditations = meditations.exclude(
+                id__in=MeditationSession.objects.filter(
+                    user=excluded_user
+                ).values("meditation_id")
+            )
+
+        return list(
+            meditations.annotate(
+                theme_rank=Window(
+                    RowNumber(),
+                    partition_by=F("meditation_theme_id"),
+                    order_by=Random(),
+                ),
+                theme_quota=Case(
+                    *[
+                        When(meditation_theme_id=meditation_theme, then=quota)
+                        for meditation_theme, quota in theme_quotas
+                    ],
+                    output_field=IntegerField(),
+                ),
+            )
+            .filter(theme_rank__lte=F("theme_quota"))
+            .order_by("-theme_quota", "meditation_theme_id", "theme_rank")
+        )
+
     @staticmethod
     def get_meditations_by_meditation_narrator(
         meditation_narrator: MeditationNarrator,
@@ -185,3 +245,53 @@ class MeditationRepository:
         meditation: Meditation,
     ) -> List[MeditationGrade]:
         return MeditationGrade.objects.filter(meditation_id=meditation)
+
+    @staticmethod
+    def get_theme_ids_of_meditations(
+        meditation_ids: Iterable[int],
+    ) -> Dict[int, int | None]:
+        return dict(
+            Meditation.objects.filter(id__in=meditation_ids).values_list(
+                "id", "meditation_theme_id"
+            )
+        )
+
+    @staticmethod
+    def lock_meditation_grades_of_user(user_id: int) -> None:
+        """Hold back other grade upserts of the user until the transaction
+        ends. Inserts referencing the user are not blocked."""
+        list(
+            User.objects.select_for_update(no_key=True)
+            .filter(pk=user_id)
+            .values_list("pk")
+        )
+
+    @staticmethod
+    def get_grades_of_user_by_meditation(
+        user_id: int, meditation_ids: Iterable[int]
+    ) -> Dict[int, int]:
+        return dict(
+            MeditationGrade.objects.filter(
+                user_id=user_id, meditation_id__in=meditation_ids
+            ).values_list("meditation_id", "grade")
+        )
+
+    @staticmethod
+    def upsert_meditation_grades(
+        user_id: int, grades: Dict[int, int]
+    ) -> List[MeditationGrade]:
+        """INSERT ... ON CONFLICT DO UPDATE of the grades by meditation id.
+
+        Model signals are not sent.
+        """
+        return MeditationGrade.objects.bulk_create(
+            [
+                MeditationGrade(
+                    user_id=user_id, meditation_id=meditation_id, grade=grade
+                )
+                for meditation_id, grade in grades.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["user", "meditation"],
+            update_fields=["grade"],
+        )
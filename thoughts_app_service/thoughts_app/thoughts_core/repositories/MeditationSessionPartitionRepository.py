@@ -0,0 +1,246 @@
+from datetime import datetime
+from typing import List
+
+from django.db import connection, transaction
+
+from ..models import MeditationSession, MeditationSessionRollup
+
+SESSION_TABLE = MeditationSession._meta.db_table
+ROLLUP_TABLE = MeditationSessionRollup._meta.db_table
+DEFAULT_PARTITION = f"{SESSION_TABLE}_default"
+
+
+def _quote(name: str) -> str:
+    return connection.ops.quote_name(name)
+
+
+def _literal(value: datetime) -> str:
+    # Partition bounds do not accept query parameters
+    return f"'{value.isoformat()}'"
+
+
+class MeditationSessionPartitionRepository:
+    """DDL of the monthly MeditationSession partitions, which Django does not
+    model. Partitions are named after the table and their month, e.g.
+    thoughts_core_meditationsession_p202610."""
+
+    @staticmethod
+    def is_partitioned() -> bool:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relkind = 'p' FROM pg_class "
+                "WHERE oid = to_regclass(%s)",
+                [SESSION_TABLE],
+            )
+            row = cursor.fetchone()
+        return bool(row and row[0])
+
+    @staticmethod
+    def get_partition_names() -> List[str]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = to_regclass(%s) "
+                "ORDER BY child.relname",
+                [SESSION_TABLE],
+            )
+            return [name for name, in cursor.fetchall()]
+
+    @staticmethod
+    def get_session_start_time_range() -> tuple:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT MIN(session_start_time), MAX(session_start_time) "
+                f"FROM {_quote(SESSION_TABLE)}"
+            )
+            return cursor.fetchone()
+
+    @staticmethod
+    def partition_table(partitions: List[tuple]) -> None:
+        """Rebuild the session table as a table partitioned by month on
+        session_start_time, with the given (name, start, end) partitions and
+        a default one.
+
+        The table is locked while its rows are copied. Its primary key
+        becomes (id, session_start_time), as PostgreSQL requires, ids stay
+        unique through the identity sequence.
+        """
+        table = SESSION_TABLE
+        new_table = f"{table}_partitioned"
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Deferred foreign key checks of earlier writes in the
+            # transaction would keep the table from being dropped
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            cursor.execute(
+                f"LOCK TABLE {_quote(table)} IN ACCESS EXCLUSIVE MODE"
+            )
+            cursor.execute(
+                "SELECT indexname, indexdef FROM pg_indexes "
+                "WHERE tablename = %s AND indexname <> %s",
+                [table, f"{table}_pkey"],
+            )
+            indexes = cursor.fetchall()
+            cursor.execute(
+                "SELECT conname, pg_get_constraintdef(oid) "
+                "FROM pg_constraint "
+                "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+                [table],
+            )
+            foreign_keys = cursor.fetchall()
+
+            cursor.execute(
+                f"CREATE TABLE {_quote(new_table)} "
+                f"(LIKE {_quote(table)} INCLUDING DEFAULTS "
+                "INCLUDING IDENTITY) PARTITION BY RANGE (session_start_time)"
+            )
+            cursor.execute(
+                f"ALTER TABLE {_quote(new_table)} "
+                f"ADD CONSTRAINT {_quote(f'{table}_pkey_partitioned')} "
+                "PRIMARY KEY (id, session_start_time)"
+            )
+            for name, start, end in partitions:
+                cursor.execute(
+                    f"CREATE TABLE {_quote(name)} "
+                    f"PARTITION OF {_quote(new_table)} "
+                    f"FOR VALUES FROM ({_literal(start)}) "
+                    f"TO ({_literal(end)})"
+                )
+            cursor.execute(
+                f"CREATE TABLE {_quote(DEFAULT_PARTITION)} "
+                f"PARTITION OF {_quote(new_table)} DEFAULT"
+            )
+            cursor.execute(
+                f"INSERT INTO {_quote(new_table)} OVERRIDING SYSTEM VALUE "
+                f"SELECT * FROM {_quote(table)}"
+            )
+            cursor.execute(
+                "SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {_quote(new_table)}), 0) + 1, "
+                "false)",
+                [new_table],
+            )
+
+            cursor.execute(f"DROP TABLE {_quote(table)}")
+            cursor.execute(
+                f"ALTER TABLE {_quote(new_table)} RENAME TO {_quote(table)}"
+            )
+            cursor.execute(
+                f"ALTER TABLE {_quote(table)} RENAME CONSTRAINT "
+                f"{_quote(f'{table}_pkey_partitioned')} "
+                f"TO {_quote(f'{table}_pkey')}"
+            )
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+            (sequence,) = cursor.fetchone()
+            cursor.execute(
+                f"ALTER SEQUENCE {sequence} RENAME TO "
+                f"{_quote(f'{table}_id_seq')}"
+            )
+            # Index and constraint definitions name the table, which has
+            # its original name again
+            for _, indexdef in indexes:
+                cursor.execute(indexdef)
+            for name, definition in foreign_keys:
+                cursor.execute(
+                    f"ALTER TABLE {_quote(table)} "
+                    f"ADD CONSTRAINT {_quote(name)} {definition}"
+                )
+
+    @staticmethod
+    def create_partition(name: str, start: datetime, end: datetime) -> int:
+        """Attach a partition for [start, end), moving the sessions the
+        default partition holds for that range. Returns the rows moved."""
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Writes to other partitions go on, the parent is locked before
+            # the default partition as inserts do
+            cursor.execute(
+                f"LOCK TABLE {_quote(SESSION_TABLE)} "
+                "IN SHARE UPDATE EXCLUSIVE MODE"
+            )
+            cursor.execute(
+                f"LOCK TABLE {_quote(DEFAULT_PARTITION)} "
+                "IN ACCESS EXCLUSIVE MODE"
+            )
+            cursor.execute(
+                f"CREATE TABLE {_quote(name)} "
+                f"(LIKE {_quote(SESSION_TABLE)} INCLUDING DEFAULTS)"
+            )
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {_quote(DEFAULT_PARTITION)} "
+                "WHERE session_start_time >= %s AND session_start_time < %s "
+                f"RETURNING *) INSERT INTO {_quote(name)} SELECT * FROM moved",
+                [start, end],
+            )
+            moved = cursor.rowcount
+            cursor.execute(
+                f"ALTER TABLE {_quote(SESSION_TABLE)} "
+                f"ATTACH PARTITION {_quote(name)} "
+                f"FOR VALUES FROM ({_literal(start)}) TO ({_literal(end)})"
+            )
+        return moved
+
+    @staticmethod
+    def _roll_up(cursor, table: str, before: datetime) -> int:
+        cursor.execute(
+            f"SELECT COUNT(*) FROM {_quote(table)} "
+            "WHERE session_start_time < %s",
+            [before],
+        )
+        (session_count,) = cursor.fetchone()
+        cursor.execute(
+            f"INSERT INTO {_quote(ROLLUP_TABLE)} "
+            "(user_id, meditation_id, month, session_count) "
+            "SELECT user_id, meditation_id, "
+            "date_trunc('month', session_start_time AT TIME ZONE %s)::date, "
+            f"COUNT(*) FROM {_quote(table)} "
+            "WHERE session_start_time < %s GROUP BY 1, 2, 3 "
+            "ON CONFLICT (user_id, meditation_id, month) DO UPDATE "
+            f"SET session_count = {_quote(ROLLUP_TABLE)}.session_count "
+            "+ EXCLUDED.session_count",
+            [connection.timezone_name, before],
+        )
+        return session_count
+
+    @staticmethod
+    def roll_up_partition(name: str, before: datetime) -> int:
+        """Add the sessions of the partition to the rollups and drop it.
+        Returns the sessions rolled up."""
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            # Detaching locks the parent anyway, taking it first keeps
+            # session writes from interleaving with the rollup
+            cursor.execute(
+                f"LOCK TABLE {_quote(SESSION_TABLE)} IN ACCESS EXCLUSIVE MODE"
+            )
+            session_count = MeditationSessionPartitionRepository._roll_up(
+                cursor, name, before
+            )
+            cursor.execute(
+                f"ALTER TABLE {_quote(SESSION_TABLE)} "
+                f"DETACH PARTITION {_quote(name)}"
+            )
+            cursor.execute(f"DROP TABLE {_quote(name)}")
+        return session_count
+
+    @staticmethod
+    def roll_up_default_partition(before: datetime) -> int:
+        """Move the sessions of the default partition older than `before`
+        to the rollups. Returns the sessions rolled up."""
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"LOCK TABLE {_quote(SESSION_TABLE)} "
+                "IN SHARE UPDATE EXCLUSIVE MODE"
+            )
+            cursor.execute(
+                f"LOCK TABLE {_quote(DEFAULT_PARTITION)} "
+                "IN ACCESS EXCLUSIVE MODE"
+            )
+            session_count = MeditationSessionPartitionRepository._roll_up(
+                cursor, DEFAULT_PARTITION, before
+            )
+            cursor.execute(
+                f"DELETE FROM {_quote(DEFAULT_PARTITION)} "
+                "WHERE session_start_time < %s",
+                [before],
+            )
+        return session_count
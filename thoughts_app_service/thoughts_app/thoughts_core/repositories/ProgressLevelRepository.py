@@ -0,0 +1,16 @@
+from typing import List
+
+from ..models import ProgressLevel
+
+
+class ProgressLevelRepository:
+    @staticmethod
+    def get_progress_levels() -> List[ProgressLevel]:
+        return list(ProgressLevel.objects.order_by("level"))
+
+    @staticmethod
+    async def aget_progress_levels() -> List[ProgressLevel]:
+        return [
+            progress_level
+            async for progress_level in ProgressLevel.objects.order_by("level")
+        ]
@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import List
+
+from ..models import RecommendationSnapshot, User
+
+
+class RecommendationSnapshotRepository:
+    @staticmethod
+    def get_snapshot_of_user(
+        user: User, catalogue_version: int, computed_after: datetime
+    ) -> RecommendationSnapshot | None:
+        return RecommendationSnapshot.objects.filter(
+            user=user,
+            catalogue_version=catalogue_version,
+            computed_at__gte=computed_after,
+        ).first()
+
+    @staticmethod
+    def save_snapshots(snapshots: List[RecommendationSnapshot]) -> None:
+        RecommendationSnapshot.objects.bulk_create(
+            snapshots,
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=[
+                "meditation_ids",
+                "catalogue_version",
+                "computed_at",
+            ],
+        )
+
+    @staticmethod
+    def delete_snapshot_of_user(user_id: int) -> None:
+        RecommendationSnapshot.objects.filter(user_id=user_id).delete()
@@ -15,6 +15,15 @@ class UserRepository:
             logger.error(f"User with id {user_id} not found!")
             return None
 
+    @staticmethod
+    async def aget_user_info_of_user(user: User) -> UserInfo | None:
+        # Achievements are serialized with the profile
+        return (
+            await UserInfo.objects.filter(user=user)
+            .prefetch_related("achievements")
+            .afirst()
+        )
+
     @staticmethod
     def create_user(user: User, name: str, phone_number: str) -> UserInfo:
         return UserInfo.objects.create(
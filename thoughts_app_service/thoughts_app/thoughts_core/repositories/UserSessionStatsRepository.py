@@ -0,0 +1,129 @@
+from typing import Iterable
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from ..models import (
+    MeditationSession,
+    MeditationSessionRollup,
+    UserSessionStats,
+)
+
+RECONCILE_BATCH_SIZE = 1000
+
+
+class UserSessionStatsRepository:
+    @staticmethod
+    def count_sessions(user_ids: Iterable[int]) -> dict:
+        user_ids = list(user_ids)
+        session_counts = dict(
+            MeditationSession.objects.filter(user_id__in=user_ids)
+            .values("user_id")
+            .annotate(session_count=Count("id"))
+            .values_list("user_id", "session_count")
+            .order_by()
+        )
+        # Sessions of partitions dropped by the retention job
+        for user_id, session_count in (
+            MeditationSessionRollup.objects.filter(user_id__in=user_ids)
+            .values("user_id")
+            .annotate(session_count=Sum("session_count"))
+            .values_list("user_id", "session_count")
+            .order_by()
+        ):
+            session_counts[user_id] = (
+                session_counts.get(user_id, 0) + session_count
+            )
+        return session_counts
+
+    @staticmethod
+    def get_or_create_stats(user_id: int) -> tuple:
+        return UserSessionStats.objects.get_or_create(
+            user_id=user_id,
+            defaults={
+                "session_count": UserSessionStatsRepository.count_sessions(
+                    [user_id]
+                ).get(user_id, 0)
+            },
+        )
+
+    @staticmethod
+    def get_session_count(user_id: int) -> int:
+        session_count = (
+            UserSessionStats.objects.filter(user_id=user_id)
+            .values_list("session_count", flat=True)
+            .first()
+        )
+        if session_count is None:
+            stats, _ = UserSessionStatsRepository.get_or_create_stats(user_id)
+            session_count = stats.session_count
+        return session_count
+
+    @staticmethod
+    async def aget_session_count(user_id: int) -> int:
+        session_count = (
+            await UserSessionStats.objects.filter(user_id=user_id)
+            .values_list("session_count", flat=True)
+            .afirst()
+        )
+        if session_count is None:
+            return await sync_to_async(
+                UserSessionStatsRepository.get_session_count
+            )(user_id)
+        return session_count
+
+    @staticmethod
+    def add_sessions(user_id: int, session_count: int) -> None:
+        updated = UserSessionStats.objects.filter(user_id=user_id).update(
+            session_count=F("session_count") + session_count
+        )
+        if updated or session_count <= 0:
+            # A missing row is counted from scratch when first read
+            return
+
+        # The COUNT already includes the sessions of this transaction
+        stats, created = UserSessionStatsRepository.get_or_create_stats(
+            user_id
+        )
+        if not created:
+            UserSessionStats.objects.filter(pk=stats.pk).update(
+                session_count=F("session_count") + session_count
+            )
+
+    @staticmethod
+    def reconcile(user_ids: Iterable[int] | None = None) -> int:
+        """Recount the existing counters, return how many had drifted.
+
+        Each batch is locked while it is recounted, so sessions written
+        meanwhile are added on top of the new values.
+        """
+        stats = UserSessionStats.objects.order_by("user_id")
+        if user_ids is not None:
+            stats = stats.filter(user_id__in=list(user_ids))
+
+        repaired = 0
+        last_user_id = None
+        while True:
+            with transaction.atomic():
+                batch = stats.select_for_update()
+                if last_user_id is not None:
+                    batch = batch.filter(user_id__gt=last_user_id)
+                batch = list(batch[:RECONCILE_BATCH_SIZE])
+                if not batch:
+                    return repaired
+                last_user_id = batch[-1].user_id
+
+                session_counts = UserSessionStatsRepository.count_sessions(
+                    [user_stats.user_id for user_stats in batch]
+                )
+                drifted = []
+                for user_stats in batch:
+                    session_count = session_counts.get(user_stats.user_id, 0)
+                    if user_stats.session_count != session_count:
+                        user_stats.session_count = session_count
+                        drifted.append(user_stats)
+                UserSessionStats.objects.bulk_update(
+                    drifted, ["session_count"]
+                )
+                repaired += len(drifted)
@@ -0,0 +1,137 @@
+from typing import Iterable, List
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast
+
+from ..models import MeditationGrade, User, UserThemeAffinity
+
+REBUILD_BATCH_SIZE = 1000
+
+
+class UserThemeAffinityRepository:
+    @staticmethod
+    def add_grades(
+        user_id: int,
+        meditation_theme_id: int,
+        grade_sum: int,
+        grade_count: int,
+    ) -> None:
+        updated = UserThemeAffinity.objects.filter(
+            user_id=user_id, meditation_theme_id=meditation_theme_id
+        ).update(
+            grade_sum=F("grade_sum") + grade_sum,
+            grade_count=F("grade_count") + grade_count,
+        )
+        if updated or grade_count <= 0:
+            # Nothing to retract from a missing row: it is either being
+            # cascade-deleted together with its user/theme or will be
+            # repaired by the rebuild command
+            return
+
+        affinity, created = UserThemeAffinity.objects.get_or_create(
+            user_id=user_id,
+            meditation_theme_id=meditation_theme_id,
+            defaults={"grade_sum": grade_sum, "grade_count": grade_count},
+        )
+        if not created:
+            UserThemeAffinity.objects.filter(pk=affinity.pk).update(
+                grade_sum=F("grade_sum") + grade_sum,
+                grade_count=F("grade_count") + grade_count,
+            )
+
+    @staticmethod
+    def move_meditation_grades(
+        meditation_id: int,
+        from_theme_id: int | None,
+        to_theme_id: int | None,
+    ) -> None:
+        """Move the grades of a meditation that changed theme between the
+        theme totals of every user that graded it."""
+        grades = MeditationGrade.objects.filter(meditation_id=meditation_id)
+        user_totals = (
+            grades.filter(user_id=OuterRef("user_id"))
+            .values("user_id")
+            .annotate(grade_sum=Sum("grade"), grade_count=Count("id"))
+            .order_by()
+        )
+        grade_sum = Subquery(user_totals.values("grade_sum"))
+        grade_count = Subquery(user_totals.values("grade_count"))
+        user_ids = grades.values("user_id")
+
+        with transaction.atomic():
+            if from_theme_id:
+                UserThemeAffinity.objects.filter(
+                    user_id__in=user_ids, meditation_theme_id=from_theme_id
+                ).update(
+                    grade_sum=F("grade_sum") - grade_sum,
+                    grade_count=F("grade_count") - grade_count,
+                )
+            if to_theme_id:
+                UserThemeAffinity.objects.bulk_create(
+                    [
+                        UserThemeAffinity(
+                            user_id=user_id, meditation_theme_id=to_theme_id
+                        )
+                        for user_id in user_ids.distinct()
+                        .order_by()
+                        .values_list("user_id", flat=True)
+                    ],
+                    ignore_conflicts=True,
+                )
+                UserThemeAffinity.objects.filter(
+                    user_id__in=user_ids, meditation_theme_id=to_theme_id
+                ).update(
+                    grade_sum=F("grade_sum") + grade_sum,
+                    grade_count=F("grade_count") + grade_count,
+                )
+
+    @staticmethod
+    def get_theme_grade_stats_of_user(user: User) -> List[tuple]:
+        return list(
+            UserThemeAffinity.objects.filter(user=user, grade_count__gt=0)
+            .annotate(
+                avg_grade=Cast("grade_sum", FloatField()) / F("grade_count")
+            )
+            .values_list("meditation_theme_id", "avg_grade", "grade_count")
+        )
+
+    @staticmethod
+    def rebuild(user_ids: Iterable[int] | None = None) -> int:
+        affinities = UserThemeAffinity.objects.all()
+        grades = MeditationGrade.objects.filter(
+            meditation__meditation_theme__isnull=False
+        )
+        if user_ids is not None:
+            user_ids = list(user_ids)
+            affinities = affinities.filter(user_id__in=user_ids)
+            grades = grades.filter(user_id__in=user_ids)
+
+        theme_totals = (
+            grades.values("user_id", "meditation__meditation_theme_id")
+            .annotate(grade_sum=Sum("grade"), grade_count=Count("id"))
+            .order_by()
+        )
+
+        created = 0
+        with transaction.atomic():
+            affinities.delete()
+            batch = []
+            for row in theme_totals.iterator():
+                batch.append(
+                    UserThemeAffinity(
+                        user_id=row["user_id"],
+                        meditation_theme_id=row[
+                            "meditation__meditation_theme_id"
+                        ],
+                        grade_sum=row["grade_sum"],
+                        grade_count=row["grade_count"],
+                    )
+                )
+                if len(batch) >= REBUILD_BATCH_SIZE:
+                    UserThemeAffinity.objects.bulk_create(batch)
+                    created += len(batch)
+                    batch = []
+            UserThemeAffinity.objects.bulk_create(batch)
+            created += len(batch)
+        return created
@@ -1,10 +1,13 @@
 from adrf.serializers import Serializer as AsyncSerializer
+from django.conf import settings
 from drf_spectacular.utils import extend_schema_serializer
 from rest_framework import serializers
 
 from .models import (
     Achievement,
     Chat,
+    ChatCompletionJob,
+    ChatMessage,
     Meditation,
     MeditationGrade,
     MeditationNarrator,
@@ -13,13 +16,14 @@ from .models import (
     User,
     UserInfo,
 )
+from .services.MeditationGradeService import MeditationGradeService
 
 
 class ChatSerializer(serializers.ModelSerializer):
     class Meta:
         model = Chat
-        exclude = ["user"]
-        read_only_fields = ["id", "created_at", "updated_at", "chat_messages"]
+        exclude = ["user", "summary", "summarized_until"]
+        read_only_fields = ["id", "created_at", "updated_at"]
 
     def create(self, validated_data):
         # Use the request user from the serializer context
@@ -27,6 +31,25 @@ class ChatSerializer(serializers.ModelSerializer):
         return Chat.objects.create(user=user, **validated_data)
 
 
+class ChatCompletionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChatCompletionJob
+        fields = [
+            "id",
+            "status",
+            "result",
+            "error",
+            "created_at",
+            "finished_at",
+        ]
+
+
+class ChatMessageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChatMessage
+        fields = ["sequence", "role", "content", "created_at"]
+
+
 class UserInfoSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserInfo
@@ -61,6 +84,18 @@ class MeditationSerializer(serializers.ModelSerializer):
 class GetGPTAnswerRequestSerializer(AsyncSerializer):
     message = serializers.CharField()
     chat_id = serializers.UUIDField()
+    use_cache = serializers.BooleanField(
+        default=True,
+        help_text="Allow a cached reply to an identical conversation",
+    )
+    mode = serializers.ChoiceField(
+        choices=["sync", "job"],
+        default="sync",
+        help_text=(
+            "job queues the message and answers 202 with a job to poll "
+            "instead of waiting for the reply"
+        ),
+    )
 
 
 class SuggestedMeditationSerializer(AsyncSerializer):
@@ -80,10 +115,54 @@ class MeditationThemeSerializer(serializers.ModelSerializer):
 
 
 class MeditationGradeSerializer(serializers.ModelSerializer):
+    # Grades are always given by the requesting user, the default still
+    # takes part in the unique (user, meditation) check on updates
+    user = serializers.PrimaryKeyRelatedField(
+        read_only=True, default=serializers.CurrentUserDefault()
+    )
+
     class Meta:
         model = MeditationGrade
         fields = "__all__"
 
+    def get_unique_together_validators(self):
+        # Creating overwrites the existing grade of the meditation
+        if self.instance is None:
+            return []
+        return super().get_unique_together_validators()
+
+    def create(self, validated_data):
+        return MeditationGradeService.save_grades(
+            user_id=self.context["request"].user.id,
+            grades={validated_data["meditation"].id: validated_data["grade"]},
+        )[0]
+
+
+class MeditationGradeBulkItemSerializer(serializers.Serializer):
+    meditation = serializers.IntegerField()
+    grade = serializers.IntegerField()
+
+
+class MeditationGradeBulkSerializer(serializers.Serializer):
+    grades = MeditationGradeBulkItemSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=settings.MEDITATION_GRADES_BULK_MAX_SIZE,
+    )
+
+    def validate_grades(self, grades):
+        meditation_ids = {grade["meditation"] for grade in grades}
+        unknown_ids = meditation_ids - set(
+            Meditation.objects.filter(id__in=meditation_ids).values_list(
+                "id", flat=True
+            )
+        )
+        if unknown_ids:
+            raise serializers.ValidationError(
+                f"Unknown meditations: {sorted(unknown_ids)}"
+            )
+        return grades
+
 
 class MeditationSessionSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
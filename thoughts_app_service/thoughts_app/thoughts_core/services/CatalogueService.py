@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from ..repositories.CatalogueRepository import CatalogueRepository
+
+CATALOGUE_VERSION_CACHE_KEY = "thoughts_core:catalogue_version"
+
+
+class CatalogueService:
+    """Catalogue version shared by all workers via the database.
+
+    Bumped on every Meditation/MeditationTheme/MeditationNarrator write,
+    reads are memoised for CATALOGUE_VERSION_CACHE_TIMEOUT seconds.
+    """
+
+    @staticmethod
+    def get_version() -> int:
+        return cache.get_or_set(
+            CATALOGUE_VERSION_CACHE_KEY,
+            CatalogueRepository.get_version,
+            settings.CATALOGUE_VERSION_CACHE_TIMEOUT,
+        )
+
+    @staticmethod
+    async def aget_version() -> int:
+        version = await cache.aget(CATALOGUE_VERSION_CACHE_KEY)
+        if version is None:
+            version = await CatalogueRepository.aget_version()
+            await cache.aset(
+                CATALOGUE_VERSION_CACHE_KEY,
+                version,
+                settings.CATALOGUE_VERSION_CACHE_TIMEOUT,
+            )
+        return version
+
+    @staticmethod
+    def bump_version() -> None:
+        CatalogueRepository.bump_version()
+        cache.delete(CATALOGUE_VERSION_CACHE_KEY)
+        # Drop a value re-read by a concurrent request before the bump
+        # became visible
+        transaction.on_commit(
+            lambda: cache.delete(CATALOGUE_VERSION_CACHE_KEY)
+        )
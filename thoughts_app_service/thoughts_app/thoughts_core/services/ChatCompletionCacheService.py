@@ -0,0 +1,73 @@
+import hashlib
+import json
+from typing import List
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .CatalogueService import CatalogueService
+from .metrics import CHAT_COMPLETION_CACHE_REQUESTS
+
+TRAILING_PUNCTUATION = ".!?…"
+
+
+def get_chat_completion_cache():
+    return caches["chat_completions"]
+
+
+class ChatCompletionCacheService:
+    """Replies of the chat model for exact conversations.
+
+    Keys cover the model, the catalogue version and the messages, with
+    case, runs of whitespace and trailing punctuation ignored.
+    """
+
+    @staticmethod
+    def normalize_content(content: str) -> str:
+        return " ".join(content.casefold().split()).rstrip(
+            TRAILING_PUNCTUATION
+        )
+
+    @staticmethod
+    def get_cache_key(
+        model: str, catalogue_version: int, messages: List[dict]
+    ) -> str:
+        normalized_messages = json.dumps(
+            [
+                [
+                    message["role"],
+                    ChatCompletionCacheService.normalize_content(
+                        message["content"]
+                    ),
+                ]
+                for message in messages
+            ],
+            ensure_ascii=False,
+        )
+        digest = hashlib.sha256(normalized_messages.encode()).hexdigest()
+        return f"chat_completion:{model}:{catalogue_version}:{digest}"
+
+    @staticmethod
+    async def aget_cache_key(messages: List[dict]) -> str:
+        return ChatCompletionCacheService.get_cache_key(
+            model=settings.CHAT_COMPLETION_MODEL,
+            catalogue_version=await CatalogueService.aget_version(),
+            messages=messages,
+        )
+
+    @staticmethod
+    async def aget_response(cache_key: str | None) -> str | None:
+        """Cached reply, None on a miss or when `cache_key` is None because
+        the request opted out of the cache."""
+        if cache_key is None:
+            CHAT_COMPLETION_CACHE_REQUESTS.labels(result="bypass").inc()
+            return None
+        response = await get_chat_completion_cache().aget(cache_key)
+        CHAT_COMPLETION_CACHE_REQUESTS.labels(
+            result="miss" if response is None else "hit"
+        ).inc()
+        return response
+
+    @staticmethod
+    async def aset_response(cache_key: str, response: str) -> None:
+        await get_chat_completion_cache().aset(cache_key, response)
@@ -0,0 +1,119 @@
+from typing import List
+
+from django.conf import settings
+from django.db import transaction
+
+from ..models import Chat, ChatCompletionJob, User
+from ..repositories.ChatCompletionJobRepository import (
+    ChatCompletionJobRepository,
+)
+from ..repositories.ChatRepository import ChatRepository
+from .logger import logger
+from .metrics import CHAT_COMPLETION_JOBS
+
+
+class ChatCompletionJobService:
+    """DB-backed queue of chatbot turns.
+
+    Workers claim jobs with SELECT ... FOR UPDATE SKIP LOCKED and hold them
+    for CHAT_COMPLETION_JOB_LEASE seconds, a job whose worker died is
+    claimed again after that, up to CHAT_COMPLETION_JOB_MAX_ATTEMPTS times.
+    """
+
+    @staticmethod
+    async def aenqueue(
+        chat: Chat, message: str, use_cache: bool = True
+    ) -> ChatCompletionJob:
+        job = await ChatCompletionJobRepository.acreate_job(
+            chat=chat, message=message, use_cache=use_cache
+        )
+        CHAT_COMPLETION_JOBS.labels(outcome="queued").inc()
+        return job
+
+    @staticmethod
+    async def aget_job(job_id, user: User) -> ChatCompletionJob | None:
+        return await ChatCompletionJobRepository.aget_job_of_user(
+            job_id=job_id, user=user
+        )
+
+    @staticmethod
+    def claim_next_job() -> ChatCompletionJob | None:
+        while True:
+            job = ChatCompletionJobRepository.claim_next_job(
+                lease=settings.CHAT_COMPLETION_JOB_LEASE
+            )
+            if (
+                job is None
+                or job.attempts <= settings.CHAT_COMPLETION_JOB_MAX_ATTEMPTS
+            ):
+                return job
+            # Its workers died on every attempt
+            ChatCompletionJobService.fail(
+                job, job.error or "Chat completion job was abandoned"
+            )
+
+    @staticmethod
+    def finish(
+        job: ChatCompletionJob,
+        status: str,
+        outcome: str,
+        chat_messages: List[dict] | None = None,
+        **kwargs,
+    ) -> bool:
+        # The turn is stored together with the job, a worker whose lease
+        # expired and whose job was claimed again must not store it twice
+        with transaction.atomic():
+            finished = ChatCompletionJobRepository.finish_job(
+                job, status=status, **kwargs
+            )
+            if finished and chat_messages:
+                ChatRepository.append_messages(job.chat_id, chat_messages)
+        if not finished:
+            logger.warning(
+                f"Chat completion job {job.id} was claimed again, "
+                "dropping its result"
+            )
+            outcome = "dropped"
+        # Counted once, by the worker that still held the claim
+        CHAT_COMPLETION_JOBS.labels(outcome=outcome).inc()
+        return finished
+
+    @staticmethod
+    def succeed(
+        job: ChatCompletionJob,
+        result: dict,
+        chat_messages: List[dict] | None = None,
+    ) -> None:
+        ChatCompletionJobService.finish(
+            job,
+            status=ChatCompletionJob.SUCCEEDED,
+            outcome="succeeded",
+            chat_messages=chat_messages,
+            result=result,
+        )
+
+    @staticmethod
+    def fail(
+        job: ChatCompletionJob,
+        error: str,
+        chat_messages: List[dict] | None = None,
+    ) -> None:
+        logger.error(f"Chat completion job {job.id} failed: {error}")
+        ChatCompletionJobService.finish(
+            job,
+            status=ChatCompletionJob.FAILED,
+            outcome="failed",
+            chat_messages=chat_messages,
+            error=error,
+        )
+
+    @staticmethod
+    def retry(job: ChatCompletionJob, delay: float, error: str) -> None:
+        if job.attempts >= settings.CHAT_COMPLETION_JOB_MAX_ATTEMPTS:
+            ChatCompletionJobService.fail(job, error)
+            return
+        logger.warning(
+            f"Retrying chat completion job {job.id} in {delay}s: {error}"
+        )
+        ChatCompletionJobRepository.requeue_job(job, delay=delay, error=error)
+        CHAT_COMPLETION_JOBS.labels(outcome="retried").inc()
@@ -0,0 +1,108 @@
+from functools import lru_cache
+from typing import Awaitable, Callable, List, Optional
+
+from django.conf import settings
+
+from ..models import Chat, ChatMessage
+from ..repositories.ChatRepository import ChatRepository
+from ..value_objects.TokenCounter import TokenCounter
+from .logger import logger
+
+SUMMARY_MESSAGE_PREFIX = "Краткое содержание предыдущего разговора:\n"
+
+
+class ChatService:
+    @staticmethod
+    @lru_cache
+    def get_token_counter(model: str) -> TokenCounter:
+        return TokenCounter(model)
+
+    @staticmethod
+    def get_recent_messages(
+        messages: List[dict], budget: int, token_counter: TokenCounter
+    ) -> List[dict]:
+        """Longest tail of `messages` that fits into `budget` tokens."""
+        used = 0
+        for index in range(len(messages) - 1, -1, -1):
+            used += token_counter.count_message(messages[index])
+            if used > budget:
+                return messages[index + 1 :]
+        return messages
+
+    @staticmethod
+    def get_summary_message(summary: str) -> dict:
+        return {
+            "role": "system",
+            "content": SUMMARY_MESSAGE_PREFIX + summary,
+        }
+
+    @staticmethod
+    async def aget_conversation(
+        chat: Chat,
+        summarize: Optional[
+            Callable[[str, List[dict]], Awaitable[str]]
+        ] = None,
+    ) -> List[dict]:
+        """Running summary of the chat followed by the most recent messages
+        that fit into CHAT_HISTORY_TOKEN_BUDGET.
+
+        Once the history outgrows the budget, `summarize(summary, messages)`
+        folds the oldest messages into the summary until half of the budget
+        is used, so it runs every few turns rather than on every turn. If it
+        fails, the older messages are only left out of this conversation.
+        """
+        token_counter = ChatService.get_token_counter(
+            settings.CHAT_COMPLETION_MODEL
+        )
+        budget = settings.CHAT_HISTORY_TOKEN_BUDGET
+        messages = await ChatRepository.aget_messages_of_chat(
+            chat_id=chat.id, after_sequence=chat.summarized_until
+        )
+        recent_messages = ChatService.get_recent_messages(
+            messages, budget, token_counter
+        )
+
+        if summarize is not None and len(recent_messages) < len(messages):
+            kept_messages = ChatService.get_recent_messages(
+                recent_messages, budget // 2, token_counter
+            )
+            folded_messages = messages[: len(messages) - len(kept_messages)]
+            try:
+                summary = await summarize(
+                    chat.summary,
+                    [
+                        {
+                            "role": message["role"],
+                            "content": message["content"],
+                        }
+                        for message in folded_messages
+                    ],
+                )
+            except Exception as e:
+                logger.warning(f"Could not summarize chat {chat.id}: {e}")
+            else:
+                chat.summary = summary
+                chat.summarized_until = folded_messages[-1]["sequence"]
+                await ChatRepository.asave_summary(
+                    chat_id=chat.id,
+                    summary=chat.summary,
+                    summarized_until=chat.summarized_until,
+                )
+                recent_messages = kept_messages
+
+        conversation = []
+        if chat.summary:
+            conversation.append(ChatService.get_summary_message(chat.summary))
+        conversation.extend(
+            {"role": message["role"], "content": message["content"]}
+            for message in recent_messages
+        )
+        return conversation
+
+    @staticmethod
+    async def aappend_messages(
+        chat: Chat, messages: List[dict]
+    ) -> List[ChatMessage]:
+        return await ChatRepository.aappend_messages(
+            chat_id=chat.id, messages=messages
+        )
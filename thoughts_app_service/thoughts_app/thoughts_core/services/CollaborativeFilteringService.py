@@ -0,0 +1,132 @@
+import os
+from typing import Iterable, List
+
+from django.conf import settings
+from django.db.models import Avg, Max
+
+from ..models import Meditation, MeditationGrade, MeditationSession, User
+from ..repositories.MeditationRepository import MeditationRepository
+from ..value_objects.ItemSimilarityModel import (
+    ItemSimilarityModel,
+    UserInteractions,
+)
+from .logger import logger
+
+# Graded meditations weigh by grade, merely listened ones get a fixed weight
+MAX_GRADE = 5
+SESSION_WEIGHT = 0.6
+
+
+class CollaborativeFilteringService:
+    _model: ItemSimilarityModel | None = None
+    _model_mtime: int | None = None
+
+    @staticmethod
+    def get_user_interactions(
+        user_ids: Iterable[int] | None = None,
+    ) -> UserInteractions:
+        grades = MeditationGrade.objects.all()
+        sessions = MeditationSession.objects.all()
+        if user_ids is not None:
+            user_ids = list(user_ids)
+            grades = grades.filter(user_id__in=user_ids)
+            sessions = sessions.filter(user_id__in=user_ids)
+
+        weights = {}
+        for user_id, meditation_id in (
+            sessions.values_list("user_id", "meditation_id")
+            .distinct()
+            .order_by()
+            .iterator()
+        ):
+            weights[(user_id, meditation_id)] = SESSION_WEIGHT
+        for user_id, meditation_id, avg_grade in (
+            grades.values_list("user_id", "meditation_id")
+            .annotate(avg_grade=Avg("grade"))
+            .order_by()
+            .iterator()
+        ):
+            weights[(user_id, meditation_id)] = float(avg_grade) / MAX_GRADE
+
+        user_interactions = {user_id: ([], []) for user_id in user_ids or []}
+        for (user_id, meditation_id), weight in weights.items():
+            meditation_ids, user_weights = user_interactions.setdefault(
+                user_id, ([], [])
+            )
+            meditation_ids.append(meditation_id)
+            user_weights.append(weight)
+        return user_interactions
+
+    @staticmethod
+    def build_model(incremental: bool = True) -> ItemSimilarityModel:
+        path = settings.ITEM_CF_MODEL_PATH
+        last_grade_id = MeditationGrade.objects.aggregate(last=Max("id"))[
+            "last"
+        ]
+        last_session_id = MeditationSession.objects.aggregate(last=Max("id"))[
+            "last"
+        ]
+
+        if incremental and os.path.exists(path):
+            model = ItemSimilarityModel.load(path)
+            # Edited or deleted grades keep their ids, a periodic full
+            # rebuild picks those up
+            changed_user_ids = set(
+                MeditationGrade.objects.filter(id__gt=model.last_grade_id)
+                .values_list("user_id", flat=True)
+                .distinct()
+            ) | set(
+                MeditationSession.objects.filter(id__gt=model.last_session_id)
+                .values_list("user_id", flat=True)
+                .distinct()
+            )
+            user_interactions = (
+                CollaborativeFilteringService.get_user_interactions(
+                    user_ids=changed_user_ids
+                )
+            )
+        else:
+            model = ItemSimilarityModel.empty()
+            user_interactions = (
+                CollaborativeFilteringService.get_user_interactions()
+            )
+
+        if user_interactions:
+            model.update_users(user_interactions)
+        model.last_grade_id = last_grade_id or 0
+        model.last_session_id = last_session_id or 0
+        model.save(path)
+        logger.info(
+            f"Item similarity model saved with {len(model.user_ids)} users "
+            f"and {len(model.meditation_ids)} meditations, "
+            f"{len(user_interactions)} users updated"
+        )
+        return model
+
+    @staticmethod
+    def get_model() -> ItemSimilarityModel | None:
+        path = settings.ITEM_CF_MODEL_PATH
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if CollaborativeFilteringService._model_mtime != mtime:
+            CollaborativeFilteringService._model = ItemSimilarityModel.load(
+                path
+            )
+            CollaborativeFilteringService._model_mtime = mtime
+        return CollaborativeFilteringService._model
+
+    @staticmethod
+    def recommend_meditations_for_user(
+        user: User, amount: int
+    ) -> List[Meditation] | None:
+        model = CollaborativeFilteringService.get_model()
+        if model is None:
+            logger.warning("Item similarity model has not been built yet")
+            return None
+
+        meditation_ids = model.recommend(user_id=user.id, amount=amount)
+        if not meditation_ids:
+            return None
+        return MeditationRepository.get_meditations_by_ids(meditation_ids)
@@ -0,0 +1,86 @@
+from typing import Dict, List
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+
+from ..models import MeditationGrade
+from ..repositories.MeditationRepository import MeditationRepository
+from ..repositories.UserThemeAffinityRepository import (
+    UserThemeAffinityRepository,
+)
+from .MeditationPopularityService import MeditationPopularityService
+from .RecommendationCacheService import RecommendationCacheService
+from .RecommendationSnapshotService import RecommendationSnapshotService
+
+
+class MeditationGradeService:
+    @staticmethod
+    def save_grades(
+        user_id: int, grades: Dict[int, int]
+    ) -> List[MeditationGrade]:
+        """Insert the grades, by meditation id, or overwrite the ones the
+        user gave before.
+
+        The upsert sends no model signals, so the theme affinities,
+        popularity buckets and recommendations they maintain are updated
+        here.
+        """
+        meditation_theme_ids = (
+            MeditationRepository.get_theme_ids_of_meditations(grades.keys())
+        )
+        with transaction.atomic():
+            # Otherwise concurrent upserts read the same previous grades
+            MeditationRepository.lock_meditation_grades_of_user(user_id)
+            previous_grades = (
+                MeditationRepository.get_grades_of_user_by_meditation(
+                    user_id=user_id, meditation_ids=grades.keys()
+                )
+            )
+            saved_grades = MeditationRepository.upsert_meditation_grades(
+                user_id=user_id, grades=grades
+            )
+
+            # meditation theme id -> (grade sum delta, grade count delta)
+            theme_deltas = {}
+            for meditation_id, grade in grades.items():
+                previous_grade = previous_grades.get(meditation_id)
+                grade_sum = grade - (previous_grade or 0)
+                grade_count = 0 if previous_grade is not None else 1
+                if grade_sum or grade_count:
+                    MeditationPopularityService.record_grade(
+                        meditation_id=meditation_id,
+                        grade_sum=grade_sum,
+                        grade_count=grade_count,
+                    )
+                meditation_theme_id = meditation_theme_ids.get(meditation_id)
+                if meditation_theme_id:
+                    theme_sum, theme_count = theme_deltas.get(
+                        meditation_theme_id, (0, 0)
+                    )
+                    theme_deltas[meditation_theme_id] = (
+                        theme_sum + grade_sum,
+                        theme_count + grade_count,
+                    )
+            for meditation_theme_id, (
+                grade_sum,
+                grade_count,
+            ) in theme_deltas.items():
+                if grade_sum or grade_count:
+                    UserThemeAffinityRepository.add_grades(
+                        user_id=user_id,
+                        meditation_theme_id=meditation_theme_id,
+                        grade_sum=grade_sum,
+                        grade_count=grade_count,
+                    )
+
+            RecommendationSnapshotService.invalidate_user(user_id)
+            RecommendationCacheService.invalidate_user(user_id)
+        return saved_grades
+
+    @staticmethod
+    async def asave_grades(
+        user_id: int, grades: Dict[int, int]
+    ) -> List[MeditationGrade]:
+        return await sync_to_async(MeditationGradeService.save_grades)(
+            user_id=user_id, grades=grades
+        )
@@ -0,0 +1,187 @@
+from typing import Iterable, List
+
+import numpy as np
+from scipy import sparse
+
+from ..models import Meditation, MeditationNeighbour
+from ..repositories.MeditationNeighbourRepository import (
+    MeditationNeighbourRepository,
+)
+from .logger import logger
+
+NEIGHBOURS_PER_MEDITATION = 20
+BLOCK_SIZE = 256
+
+# Relatedness is a weighted sum of the signals below, each in [-1, 1]
+SESSION_WEIGHT = 0.5
+GRADE_WEIGHT = 0.3
+THEME_WEIGHT = 0.15
+NARRATOR_WEIGHT = 0.05
+
+
+def _column_cosine_factors(matrix: sparse.csr_matrix) -> np.ndarray:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    return np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+
+
+class MeditationNeighbourService:
+    """Offline "more like this" neighbours of every meditation.
+
+    Combines cosine similarity of session co-occurrence, cosine similarity
+    of user mean-centred grades (adjusted cosine, a grade correlation) and
+    theme/narrator overlap. Scores are computed one block of meditations
+    at a time, so memory stays at BLOCK_SIZE x catalogue size.
+    """
+
+    @staticmethod
+    def get_similar_meditations(
+        meditation_id: int, amount: int
+    ) -> List[Meditation]:
+        return MeditationNeighbourRepository.get_neighbours_of_meditation(
+            meditation_id=meditation_id,
+            amount=min(amount, NEIGHBOURS_PER_MEDITATION),
+        )
+
+    @staticmethod
+    async def aget_similar_meditations(
+        meditation_id: int, amount: int
+    ) -> List[Meditation]:
+        return (
+            await MeditationNeighbourRepository.aget_neighbours_of_meditation(
+                meditation_id=meditation_id,
+                amount=min(amount, NEIGHBOURS_PER_MEDITATION),
+            )
+        )
+
+    @staticmethod
+    def get_user_item_matrix(
+        interactions: Iterable[tuple], meditation_index: dict
+    ) -> sparse.csr_matrix:
+        user_index, rows, columns, values = {}, [], [], []
+        for user_id, meditation_id, value in interactions:
+            if meditation_id not in meditation_index:
+                continue
+            rows.append(user_index.setdefault(user_id, len(user_index)))
+            columns.append(meditation_index[meditation_id])
+            values.append(float(value))
+        return sparse.csr_matrix(
+            (values, (rows, columns)),
+            shape=(len(user_index), len(meditation_index)),
+        )
+
+    @staticmethod
+    def center_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+        matrix = matrix.copy()
+        counts = np.diff(matrix.indptr)
+        sums = np.bincount(
+            np.repeat(np.arange(len(counts)), counts),
+            weights=matrix.data,
+            minlength=len(counts),
+        )
+        means = np.divide(
+            sums, counts, out=np.zeros(len(counts)), where=counts > 0
+        )
+        matrix.data -= np.repeat(means, counts)
+        matrix.eliminate_zeros()
+        return matrix
+
+    @staticmethod
+    def build_neighbours(
+        top_k: int = NEIGHBOURS_PER_MEDITATION, block_size: int = BLOCK_SIZE
+    ) -> int:
+        features = MeditationNeighbourRepository.get_catalogue_features()
+        meditation_ids = np.array([row[0] for row in features], dtype=np.int64)
+        theme_ids = np.array(
+            [row[1] if row[1] is not None else -1 for row in features],
+            dtype=np.int64,
+        )
+        narrator_ids = np.array(
+            [row[2] if row[2] is not None else -1 for row in features],
+            dtype=np.int64,
+        )
+        meditation_index = {
+            int(meditation_id): column
+            for column, meditation_id in enumerate(meditation_ids)
+        }
+        top_k = min(top_k, len(meditation_ids) - 1)
+        if top_k <= 0:
+            MeditationNeighbourRepository.replace_neighbours([])
+            return 0
+
+        sessions = MeditationNeighbourService.get_user_item_matrix(
+            (
+                (user_id, meditation_id, 1)
+                for user_id, meditation_id in (
+                    MeditationNeighbourRepository.get_session_pairs()
+                )
+            ),
+            meditation_index,
+        )
+        grades = MeditationNeighbourService.center_rows(
+            MeditationNeighbourService.get_user_item_matrix(
+                MeditationNeighbourRepository.get_average_grades(),
+                meditation_index,
+            )
+        )
+        signals = [
+            (
+                SESSION_WEIGHT,
+                sessions.T.tocsr(),
+                sessions,
+                _column_cosine_factors(sessions),
+            ),
+            (
+                GRADE_WEIGHT,
+                grades.T.tocsr(),
+                grades,
+                _column_cosine_factors(grades),
+            ),
+        ]
+
+        neighbours = []
+        for start in range(0, len(meditation_ids), block_size):
+            block = slice(start, min(start + block_size, len(meditation_ids)))
+            scores = THEME_WEIGHT * (
+                (theme_ids[block, None] == theme_ids[None, :])
+                & (theme_ids[block, None] >= 0)
+            ) + NARRATOR_WEIGHT * (
+                (narrator_ids[block, None] == narrator_ids[None, :])
+                & (narrator_ids[block, None] >= 0)
+            )
+            for weight, transposed, matrix, factors in signals:
+                if matrix.nnz == 0:
+                    continue
+                scores += (
+                    weight
+                    * (transposed[block] @ matrix).toarray()
+                    * factors[block, None]
+                    * factors[None, :]
+                )
+            rows = np.arange(scores.shape[0])
+            scores[rows, rows + start] = -np.inf
+
+            candidates = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+            for row, columns in enumerate(candidates):
+                row_scores = scores[row, columns]
+                # Highest score first, lower meditation id on ties
+                order = np.lexsort((meditation_ids[columns], -row_scores))
+                rank = 0
+                for column in columns[order]:
+                    if scores[row, column] <= 0:
+                        break
+                    rank += 1
+                    neighbours.append(
+                        MeditationNeighbour(
+                            meditation_id=int(meditation_ids[start + row]),
+                            neighbour_id=int(meditation_ids[column]),
+                            score=float(scores[row, column]),
+                            rank=rank,
+                        )
+                    )
+
+        MeditationNeighbourRepository.replace_neighbours(neighbours)
+        logger.info(
+            f"Saved {len(neighbours)} neighbours "
+            f"of {len(meditation_ids)} meditations"
+        )
+        return len(neighbours)
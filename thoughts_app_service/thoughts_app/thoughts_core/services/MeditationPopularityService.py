@@ -0,0 +1,114 @@
+from datetime import date, datetime, timedelta
+from typing import List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from ..models import Meditation
+from ..repositories.MeditationPopularityRepository import (
+    MeditationPopularityRepository,
+)
+from ..repositories.MeditationRepository import MeditationRepository
+from .CatalogueService import CatalogueService
+from .MeditationService import MeditationService
+
+POPULAR_MEDITATIONS_CACHE_KEY = "thoughts_core:popular_meditations"
+POPULAR_MEDITATIONS_PER_THEME = 10
+
+
+class MeditationPopularityService:
+    """Rolling-window popularity counters kept in daily buckets.
+
+    Session and grade writes update the buckets through signals, the top
+    meditations of every theme are recomputed at most once per
+    POPULAR_MEDITATIONS_CACHE_TIMEOUT seconds.
+    """
+
+    @staticmethod
+    def get_window_start() -> date:
+        return timezone.localdate() - timedelta(
+            days=settings.MEDITATION_POPULARITY_WINDOW_DAYS - 1
+        )
+
+    @staticmethod
+    def record_session(
+        meditation_id: int, session_start_time: datetime, session_count: int
+    ) -> None:
+        MeditationPopularityRepository.add_activity(
+            meditation_id=meditation_id,
+            day=timezone.localdate(session_start_time),
+            session_count=session_count,
+        )
+
+    @staticmethod
+    def record_grade(
+        meditation_id: int, grade_sum: int, grade_count: int
+    ) -> None:
+        # Grades have no timestamp of their own, changes are booked on the
+        # day they happen
+        MeditationPopularityRepository.add_activity(
+            meditation_id=meditation_id,
+            day=timezone.localdate(),
+            grade_sum=grade_sum,
+            grade_count=grade_count,
+        )
+
+    @staticmethod
+    def get_cache_key() -> str:
+        return (
+            f"{POPULAR_MEDITATIONS_CACHE_KEY}:"
+            f"{CatalogueService.get_version()}"
+        )
+
+    @staticmethod
+    def get_popular_meditation_ids() -> List[tuple]:
+        def compute_popular_meditation_ids():
+            return MeditationPopularityRepository.get_top_meditation_ids(
+                since=MeditationPopularityService.get_window_start(),
+                amount=POPULAR_MEDITATIONS_PER_THEME,
+            )
+
+        return cache.get_or_set(
+            MeditationPopularityService.get_cache_key(),
+            compute_popular_meditation_ids,
+            settings.POPULAR_MEDITATIONS_CACHE_TIMEOUT,
+        )
+
+    @staticmethod
+    def get_popular_meditations(amount: int) -> List[Meditation]:
+        meditation_ids = [
+            meditation_id
+            for _, meditation_id in (
+                MeditationPopularityService.get_popular_meditation_ids()
+            )
+        ][:amount]
+        if len(meditation_ids) < amount:
+            # Not enough recent activity yet, top up with random picks
+            chosen = set(meditation_ids)
+            meditation_ids += [
+                meditation_id
+                for meditation_id in (
+                    MeditationService.get_meditation_id_index().sample(
+                        amount + len(chosen)
+                    )
+                )
+                if meditation_id not in chosen
+            ][: amount - len(meditation_ids)]
+        return MeditationRepository.get_meditations_by_ids(meditation_ids)
+
+    @staticmethod
+    def refresh(rebuild: bool = False) -> tuple:
+        """Drop buckets that left the window and the cached lists, optionally
+        recounting the window first. Returns (buckets written, deleted)."""
+        window_start = MeditationPopularityService.get_window_start()
+        written = 0
+        if rebuild:
+            written = MeditationPopularityRepository.rebuild(
+                since=window_start, today=timezone.localdate()
+            )
+        deleted = MeditationPopularityRepository.delete_buckets_before(
+            window_start
+        )
+        cache.delete(MeditationPopularityService.get_cache_key())
+        return written, deleted
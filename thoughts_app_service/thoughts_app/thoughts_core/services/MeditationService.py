@@ -1,4 +1,3 @@
-import random
 from typing import List
 
 from ..models import (
@@ -10,9 +9,16 @@ from ..models import (
     UserInfo,
 )
 from ..repositories.MeditationRepository import MeditationRepository
+from ..repositories.UserThemeAffinityRepository import (
+    UserThemeAffinityRepository,
+)
+from ..value_objects.MeditationIdIndex import MeditationIdIndex
+from .CatalogueService import CatalogueService
 
 
 class MeditationService:
+    _meditation_id_index: MeditationIdIndex | None = None
+
     @staticmethod
     def end_meditation_session(
         meditation_session: MeditationSession,
@@ -34,13 +40,41 @@ class MeditationService:
         )
 
     @staticmethod
-    def get_random_meditations(amount: int) -> List[Meditation]:
-        meditations = MeditationRepository.get_all_meditations()
-        if amount >= len(meditations):
-            return meditations
+    def get_meditations_by_theme_quotas(
+        theme_quotas: List[tuple], excluded_user: User | None = None
+    ) -> List[Meditation]:
+        return MeditationRepository.get_meditations_by_theme_quotas(
+            theme_quotas=theme_quotas, excluded_user=excluded_user
+        )
 
-        return random.sample(meditations, amount)
+    @staticmethod
+    def get_meditation_id_index() -> MeditationIdIndex:
+        catalogue_version = CatalogueService.get_version()
+        meditation_id_index = MeditationService._meditation_id_index
+        if (
+            meditation_id_index is None
+            or meditation_id_index.catalogue_version != catalogue_version
+        ):
+            meditation_id_index = MeditationIdIndex(
+                meditation_ids=MeditationRepository.get_all_meditation_ids(),
+                catalogue_version=catalogue_version,
+            )
+            MeditationService._meditation_id_index = meditation_id_index
+        return meditation_id_index
+
+    @staticmethod
+    def get_random_meditations(amount: int) -> List[Meditation]:
+        meditation_ids = MeditationService.get_meditation_id_index().sample(
+            amount
+        )
+        return MeditationRepository.get_meditations_by_ids(meditation_ids)
 
     @staticmethod
     def get_user_grades(user: UserInfo) -> List[MeditationGrade]:
         return MeditationRepository.get_meditation_grades_of_user(user=user)
+
+    @staticmethod
+    def get_user_theme_grade_stats(user: User) -> List[tuple]:
+        return UserThemeAffinityRepository.get_theme_grade_stats_of_user(
+            user=user
+        )
@@ -0,0 +1,174 @@
+from datetime import date, datetime
+from typing import List
+
+from django.conf import settings
+from django.utils import timezone
+
+from ..repositories.MeditationSessionPartitionRepository import (
+    SESSION_TABLE,
+    MeditationSessionPartitionRepository,
+)
+from .logger import logger
+
+PARTITION_PREFIX = f"{SESSION_TABLE}_p"
+
+
+def add_months(month: date, months: int) -> date:
+    month_index = month.year * 12 + month.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+class MeditationSessionPartitionService:
+    """Opt-in monthly partitions of MeditationSession.
+
+    partition() converts the table once, maintain() is meant to run daily:
+    it creates the partitions of the coming
+    MEDITATION_SESSION_PARTITIONS_AHEAD months and rolls the partitions older
+    than MEDITATION_SESSION_RETENTION_MONTHS up into MeditationSessionRollup
+    rows before dropping them. Sessions outside every partition land in a
+    default partition and are moved out when their month gets one.
+    """
+
+    @staticmethod
+    def get_current_month() -> date:
+        return timezone.localdate().replace(day=1)
+
+    @staticmethod
+    def get_month_start(month: date) -> datetime:
+        return timezone.make_aware(datetime(month.year, month.month, 1))
+
+    @staticmethod
+    def get_partition_name(month: date) -> str:
+        return f"{PARTITION_PREFIX}{month:%Y%m}"
+
+    @staticmethod
+    def get_partition_month(name: str) -> date | None:
+        suffix = name.removeprefix(PARTITION_PREFIX)
+        if name == suffix or len(suffix) != 6 or not suffix.isdigit():
+            return None
+        return date(int(suffix[:4]), int(suffix[4:]), 1)
+
+    @staticmethod
+    def get_partition(month: date) -> tuple:
+        return (
+            MeditationSessionPartitionService.get_partition_name(month),
+            MeditationSessionPartitionService.get_month_start(month),
+            MeditationSessionPartitionService.get_month_start(
+                add_months(month, 1)
+            ),
+        )
+
+    @staticmethod
+    def get_retention_start() -> date:
+        return add_months(
+            MeditationSessionPartitionService.get_current_month(),
+            -settings.MEDITATION_SESSION_RETENTION_MONTHS,
+        )
+
+    @staticmethod
+    def get_partitioned_months() -> List[date]:
+        return [
+            month
+            for month in map(
+                MeditationSessionPartitionService.get_partition_month,
+                MeditationSessionPartitionRepository.get_partition_names(),
+            )
+            if month
+        ]
+
+    @staticmethod
+    def partition() -> int:
+        """Convert the session table, returns the monthly partitions
+        created. Sessions older than the retention period are kept until
+        the next maintain()."""
+        if MeditationSessionPartitionRepository.is_partitioned():
+            return 0
+        current_month = MeditationSessionPartitionService.get_current_month()
+        first_time, _ = (
+            MeditationSessionPartitionRepository.get_session_start_time_range()
+        )
+        first_month = (
+            timezone.localdate(first_time).replace(day=1)
+            if first_time
+            else current_month
+        )
+        last_month = add_months(
+            current_month, settings.MEDITATION_SESSION_PARTITIONS_AHEAD
+        )
+        partitions = []
+        month = min(first_month, current_month)
+        while month <= last_month:
+            partitions.append(
+                MeditationSessionPartitionService.get_partition(month)
+            )
+            month = add_months(month, 1)
+        MeditationSessionPartitionRepository.partition_table(partitions)
+        logger.info(
+            f"Partitioned {SESSION_TABLE} into {len(partitions)} months"
+        )
+        return len(partitions)
+
+    @staticmethod
+    def create_partitions() -> int:
+        """Create the missing partitions from the current month on, returns
+        how many were created."""
+        current_month = MeditationSessionPartitionService.get_current_month()
+        existing = set(
+            MeditationSessionPartitionService.get_partitioned_months()
+        )
+        created = 0
+        for months in range(settings.MEDITATION_SESSION_PARTITIONS_AHEAD + 1):
+            month = add_months(current_month, months)
+            if month in existing:
+                continue
+            name, start, end = MeditationSessionPartitionService.get_partition(
+                month
+            )
+            moved = MeditationSessionPartitionRepository.create_partition(
+                name=name, start=start, end=end
+            )
+            logger.info(f"Created {name}, moved {moved} sessions into it")
+            created += 1
+        return created
+
+    @staticmethod
+    def apply_retention() -> tuple:
+        """Roll up and drop the partitions that ended before the retention
+        period. Returns (partitions dropped, sessions rolled up)."""
+        retention_start = (
+            MeditationSessionPartitionService.get_retention_start()
+        )
+        before = MeditationSessionPartitionService.get_month_start(
+            retention_start
+        )
+        dropped = 0
+        session_count = (
+            MeditationSessionPartitionRepository.roll_up_default_partition(
+                before
+            )
+        )
+        for (
+            month
+        ) in MeditationSessionPartitionService.get_partitioned_months():
+            if month >= retention_start:
+                continue
+            name = MeditationSessionPartitionService.get_partition_name(month)
+            rolled_up = MeditationSessionPartitionRepository.roll_up_partition(
+                name, before
+            )
+            logger.info(f"Rolled up {rolled_up} sessions and dropped {name}")
+            session_count += rolled_up
+            dropped += 1
+        return dropped, session_count
+
+    @staticmethod
+    def maintain() -> tuple:
+        """Returns (partitions created, partitions dropped, sessions rolled
+        up), all zero while the table is not partitioned."""
+        if not MeditationSessionPartitionRepository.is_partitioned():
+            return 0, 0, 0
+        created = MeditationSessionPartitionService.create_partitions()
+        dropped, session_count = (
+            MeditationSessionPartitionService.apply_retention()
+        )
+        return created, dropped, session_count
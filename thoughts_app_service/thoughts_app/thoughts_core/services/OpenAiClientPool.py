@@ -0,0 +1,296 @@
+import asyncio
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from types import SimpleNamespace
+
+import openai
+
+from .logger import logger
+from .metrics import (
+    OPENAI_ACTIVE_REQUESTS,
+    OPENAI_QUEUE_DEPTH,
+    OPENAI_REJECTED_REQUESTS,
+    OPENAI_REQUEST_DURATION,
+    OPENAI_RETRIES,
+    OPENAI_TOKENS,
+)
+
+# Longest pause between two attempts, before jitter
+MAX_RETRY_DELAY = 8.0
+
+
+class OpenAiOverloadedError(Exception):
+    """No OpenAI call slot is free and the queue is full, or the deadline
+    passed while waiting for one."""
+
+
+def get_call_outcome(error: BaseException) -> str:
+    if isinstance(error, OpenAiOverloadedError):
+        return "overloaded"
+    if isinstance(error, openai.APITimeoutError):
+        return "timeout"
+    if isinstance(error, asyncio.CancelledError):
+        return "cancelled"
+    return "error"
+
+
+def observe_call(model: str, started: float, outcome: str, usage=None):
+    OPENAI_REQUEST_DURATION.labels(model=model, outcome=outcome).observe(
+        time.monotonic() - started
+    )
+    if usage is not None:
+        OPENAI_TOKENS.labels(
+            model=model, outcome=outcome, type="prompt"
+        ).observe(usage.prompt_tokens)
+        OPENAI_TOKENS.labels(
+            model=model, outcome=outcome, type="completion"
+        ).observe(usage.completion_tokens)
+
+
+class ConcurrencyLimiter:
+    """Slots shared by every thread and event loop of the process.
+
+    Under WSGI each request runs in its own event loop, so an
+    asyncio.Semaphore, which belongs to one loop, cannot be used.
+    """
+
+    def __init__(self, limit: int, max_waiting: int):
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.active = 0
+        self.waiting = deque()
+        self.lock = threading.Lock()
+
+    def is_saturated(self) -> bool:
+        with self.lock:
+            return (
+                self.active >= self.limit
+                and len(self.waiting) >= self.max_waiting
+            )
+
+    async def acquire(self, timeout: float) -> None:
+        with self.lock:
+            if self.active < self.limit and not self.waiting:
+                self.active += 1
+                OPENAI_ACTIVE_REQUESTS.set(self.active)
+                return
+            if len(self.waiting) >= self.max_waiting:
+                OPENAI_REJECTED_REQUESTS.labels(reason="queue_full").inc()
+                raise OpenAiOverloadedError("OpenAI request queue is full")
+            loop = asyncio.get_running_loop()
+            granted = loop.create_future()
+            self.waiting.append((loop, granted))
+            OPENAI_QUEUE_DEPTH.set(len(self.waiting))
+
+        try:
+            await asyncio.wait_for(asyncio.shield(granted), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self.lock:
+                if (loop, granted) in self.waiting:
+                    self.waiting.remove((loop, granted))
+                    OPENAI_QUEUE_DEPTH.set(len(self.waiting))
+                    granted.cancel()
+                    handed_over = False
+                else:
+                    handed_over = True
+            if handed_over:
+                # The slot was handed over in the meantime
+                granted.add_done_callback(lambda future: self.release())
+            if isinstance(e, asyncio.TimeoutError):
+                OPENAI_REJECTED_REQUESTS.labels(reason="deadline").inc()
+                raise OpenAiOverloadedError(
+                    "Deadline passed waiting for an OpenAI request slot"
+                ) from e
+            raise
+
+    def release(self) -> None:
+        with self.lock:
+            while self.waiting:
+                loop, granted = self.waiting.popleft()
+                OPENAI_QUEUE_DEPTH.set(len(self.waiting))
+                try:
+                    # The slot passes to the waiter without becoming free
+                    loop.call_soon_threadsafe(self.grant, granted)
+                    return
+                except RuntimeError:
+                    # Its event loop is closed
+                    continue
+            self.active -= 1
+            OPENAI_ACTIVE_REQUESTS.set(self.active)
+
+    def grant(self, granted: asyncio.Future) -> None:
+        if granted.cancelled():
+            self.release()
+        else:
+            granted.set_result(None)
+
+
+class SlotStream:
+    """Streamed completion that holds its slot until it is consumed,
+    closed or garbage collected.
+
+    `finish` is called once with the outcome of the stream and its token
+    usage, when OpenAI sent one.
+    """
+
+    def __init__(self, stream, release, finish):
+        self.stream = stream
+        self.release_slot = release
+        self.finish = finish
+        self.released = False
+
+    def release(self, outcome: str = "cancelled", usage=None) -> None:
+        if not self.released:
+            self.released = True
+            self.release_slot()
+            self.finish(outcome, usage)
+
+    def __aiter__(self):
+        return self.iterate()
+
+    def __del__(self):
+        self.release()
+
+    async def iterate(self):
+        outcome, usage = "cancelled", None
+        try:
+            async for chunk in self.stream:
+                usage = getattr(chunk, "usage", None) or usage
+                yield chunk
+            outcome = "success"
+        except Exception as e:
+            outcome = get_call_outcome(e)
+            raise
+        finally:
+            self.release(outcome, usage)
+            await self.stream.close()
+
+
+class OpenAiClientPool:
+    """AsyncOpenAI wrapper bounding calls per process.
+
+    At most `max_concurrency` calls run at a time and `max_queued` more wait
+    for a slot, further calls fail fast with OpenAiOverloadedError. Each
+    call, including waiting and retries, ends after `deadline` seconds.
+    Rate limits, server errors and connection failures are retried up to
+    `max_retries` times with full jitter backoff. Duration and token
+    usage of each call are recorded by model and outcome.
+    """
+
+    RETRIED_ERRORS = (
+        openai.RateLimitError,
+        openai.InternalServerError,
+        openai.APIConnectionError,
+    )
+
+    def __init__(
+        self,
+        api_key: str | None,
+        base_url: str | None,
+        max_concurrency: int,
+        max_queued: int,
+        deadline: float,
+        max_retries: int,
+        retry_backoff: float,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.limiter = ConcurrencyLimiter(max_concurrency, max_queued)
+        # An AsyncOpenAI client keeps connections of the event loop it was
+        # first used in, so each loop gets its own
+        self.clients = weakref.WeakKeyDictionary()
+        # Mirrors the AsyncOpenAI interface used by the views
+        self.chat = SimpleNamespace(
+            completions=SimpleNamespace(create=self.create_chat_completion)
+        )
+
+    def get_openai_client(self) -> openai.AsyncOpenAI:
+        loop = asyncio.get_running_loop()
+        client = self.clients.get(loop)
+        if client is None:
+            client = openai.AsyncOpenAI(
+                api_key=self.api_key, base_url=self.base_url, max_retries=0
+            )
+            self.clients[loop] = client
+        return client
+
+    def is_saturated(self) -> bool:
+        return self.limiter.is_saturated()
+
+    def get_retry_delay(self, attempt: int, error: Exception) -> float:
+        response = getattr(error, "response", None)
+        retry_after = (
+            response.headers.get("retry-after")
+            if response is not None
+            else None
+        )
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return random.uniform(
+            0, min(MAX_RETRY_DELAY, self.retry_backoff * 2**attempt)
+        )
+
+    async def create_chat_completion(self, **kwargs):
+        model = kwargs.get("model", "")
+        started = time.monotonic()
+        try:
+            await self.limiter.acquire(timeout=self.deadline)
+            try:
+                response = await self.create_with_retries(
+                    started + self.deadline, **kwargs
+                )
+            except BaseException:
+                self.limiter.release()
+                raise
+        except BaseException as e:
+            observe_call(model, started, get_call_outcome(e))
+            raise
+        if kwargs.get("stream"):
+            return SlotStream(
+                response,
+                self.limiter.release,
+                lambda outcome, usage: observe_call(
+                    model, started, outcome, usage
+                ),
+            )
+        self.limiter.release()
+        observe_call(model, started, "success", response.usage)
+        return response
+
+    async def create_with_retries(self, deadline: float, **kwargs):
+        client = self.get_openai_client()
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                OPENAI_REJECTED_REQUESTS.labels(reason="deadline").inc()
+                raise OpenAiOverloadedError(
+                    "Deadline passed waiting for an OpenAI request slot"
+                )
+            try:
+                return await client.chat.completions.create(
+                    **kwargs, timeout=remaining
+                )
+            except self.RETRIED_ERRORS as e:
+                delay = self.get_retry_delay(attempt, e)
+                if (
+                    attempt >= self.max_retries
+                    or time.monotonic() + delay >= deadline
+                ):
+                    raise
+                attempt += 1
+                OPENAI_RETRIES.labels(reason=type(e).__name__).inc()
+                logger.warning(
+                    f"Retrying OpenAI call in {delay:.2f}s "
+                    f"(attempt {attempt}): {e}"
+                )
+                await asyncio.sleep(delay)
@@ -0,0 +1,59 @@
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from ..repositories.ProgressLevelRepository import ProgressLevelRepository
+from ..value_objects.ProgressLevelLadder import ProgressLevelLadder
+
+
+class ProgressLevelService:
+    """Progress level ladder, loaded once per process.
+
+    ProgressLevel writes drop it in the process that makes them, other
+    workers reload it at most PROGRESS_LEVEL_LADDER_MAX_AGE seconds later.
+    """
+
+    _ladder: ProgressLevelLadder | None = None
+
+    @staticmethod
+    def get_cached_ladder() -> ProgressLevelLadder | None:
+        ladder = ProgressLevelService._ladder
+        if (
+            ladder is None
+            or time.monotonic() - ladder.loaded_at
+            >= settings.PROGRESS_LEVEL_LADDER_MAX_AGE
+        ):
+            return None
+        return ladder
+
+    @staticmethod
+    def get_ladder() -> ProgressLevelLadder:
+        ladder = ProgressLevelService.get_cached_ladder()
+        if ladder is None:
+            ladder = ProgressLevelLadder(
+                ProgressLevelRepository.get_progress_levels()
+            )
+            ProgressLevelService._ladder = ladder
+        return ladder
+
+    @staticmethod
+    async def aget_ladder() -> ProgressLevelLadder:
+        ladder = ProgressLevelService.get_cached_ladder()
+        if ladder is None:
+            ladder = ProgressLevelLadder(
+                await ProgressLevelRepository.aget_progress_levels()
+            )
+            ProgressLevelService._ladder = ladder
+        return ladder
+
+    @staticmethod
+    def invalidate() -> None:
+        ProgressLevelService._ladder = None
+        # Drop a ladder reloaded by a concurrent request before the write
+        # became visible
+        transaction.on_commit(ProgressLevelService.clear)
+
+    @staticmethod
+    def clear() -> None:
+        ProgressLevelService._ladder = None
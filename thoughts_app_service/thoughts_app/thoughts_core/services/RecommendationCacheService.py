@@ -0,0 +1,97 @@
+from typing import List
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from ..models import Meditation, User
+from .CatalogueService import CatalogueService
+from .metrics import RECOMMENDATION_CACHE_REQUESTS
+from .RecommendationService import (
+    RECOMMENDATION_STRATEGIES,
+    RecommendationService,
+)
+from .RecommendationSnapshotService import RecommendationSnapshotService
+
+
+def get_recommendation_cache():
+    return caches["recommendations"]
+
+
+class RecommendationCacheService:
+    @staticmethod
+    def get_cache_key(user_id: int, strategy: str) -> str:
+        return f"recommendations:{user_id}:{strategy}"
+
+    @staticmethod
+    def get_recommendations(
+        user: User, strategy: str | None = None
+    ) -> List[Meditation]:
+        strategy = strategy or settings.RECOMMENDATION_STRATEGY
+        cache_key = RecommendationCacheService.get_cache_key(user.id, strategy)
+        catalogue_version = CatalogueService.get_version()
+
+        cached = get_recommendation_cache().get(cache_key)
+        if cached is not None and cached[0] == catalogue_version:
+            RECOMMENDATION_CACHE_REQUESTS.labels(result="hit").inc()
+            return cached[1]
+        return RecommendationCacheService.refresh_recommendations(
+            user=user, strategy=strategy, catalogue_version=catalogue_version
+        )
+
+    @staticmethod
+    async def aget_recommendations(
+        user: User, strategy: str | None = None
+    ) -> List[Meditation]:
+        strategy = strategy or settings.RECOMMENDATION_STRATEGY
+        cache_key = RecommendationCacheService.get_cache_key(user.id, strategy)
+        catalogue_version = await CatalogueService.aget_version()
+
+        cached = await get_recommendation_cache().aget(cache_key)
+        if cached is not None and cached[0] == catalogue_version:
+            RECOMMENDATION_CACHE_REQUESTS.labels(result="hit").inc()
+            return cached[1]
+        # Strategies are numpy and ORM code, run in one thread hop
+        return await sync_to_async(
+            RecommendationCacheService.refresh_recommendations
+        )(user=user, strategy=strategy, catalogue_version=catalogue_version)
+
+    @staticmethod
+    def refresh_recommendations(
+        user: User, strategy: str, catalogue_version: int
+    ) -> List[Meditation]:
+        RECOMMENDATION_CACHE_REQUESTS.labels(result="miss").inc()
+        recommended_meditations = None
+        # Snapshots are precomputed with the default strategy only
+        if strategy == settings.RECOMMENDATION_STRATEGY:
+            recommended_meditations = (
+                RecommendationSnapshotService.get_recommendations(user=user)
+            )
+        if recommended_meditations is None:
+            recommended_meditations = list(
+                RecommendationService.recommend_meditations_for_user(
+                    user=user, strategy=strategy
+                )
+            )
+        get_recommendation_cache().set(
+            RecommendationCacheService.get_cache_key(user.id, strategy),
+            (catalogue_version, recommended_meditations),
+        )
+        return recommended_meditations
+
+    @staticmethod
+    def invalidate_user(user_id: int) -> None:
+        cache_keys = [
+            RecommendationCacheService.get_cache_key(user_id, strategy)
+            for strategy in RECOMMENDATION_STRATEGIES
+        ]
+        get_recommendation_cache().delete_many(cache_keys)
+        # A concurrent miss may cache pre-commit data in between
+        transaction.on_commit(
+            lambda: get_recommendation_cache().delete_many(cache_keys)
+        )
+
+    @staticmethod
+    def invalidate_all() -> None:
+        get_recommendation_cache().clear()
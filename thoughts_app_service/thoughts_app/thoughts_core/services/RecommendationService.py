@@ -1,23 +1,66 @@
 from math import floor
 from typing import List
 
+from django.conf import settings
+
 from ..models import Meditation, User, UserInfo
 from ..value_objects.UserThemePreference import UserThemePreference
+from .CollaborativeFilteringService import CollaborativeFilteringService
 from .logger import logger
+from .MeditationPopularityService import MeditationPopularityService
 from .MeditationService import MeditationService
 
 AMOUNT_OF_MEDITATIONS_TO_RECOMMEND = 10
+MIN_SESSIONS_FOR_PERSONAL_RECOMMENDATIONS = 5
+
+THEME_STRATEGY = "theme"
+ITEM_CF_STRATEGY = "item_cf"
+RECOMMENDATION_STRATEGIES = (THEME_STRATEGY, ITEM_CF_STRATEGY)
 
 
 class RecommendationService:
     @staticmethod
-    def recommend_meditations_for_user(user: User) -> List[Meditation]:
+    def recommend_meditations_for_user(
+        user: User, strategy: str | None = None
+    ) -> List[Meditation]:
+        strategy = strategy or settings.RECOMMENDATION_STRATEGY
+        if strategy == ITEM_CF_STRATEGY:
+            return RecommendationService.recommend_by_similar_meditations(
+                user=user
+            )
+        return RecommendationService.recommend_by_theme_preferences(user=user)
+
+    @staticmethod
+    def recommend_by_similar_meditations(user: User) -> List[Meditation]:
+        recommended_meditations = (
+            CollaborativeFilteringService.recommend_meditations_for_user(
+                user=user, amount=AMOUNT_OF_MEDITATIONS_TO_RECOMMEND
+            )
+        )
+        if not recommended_meditations:
+            logger.info(
+                f"No similar meditations for user {user}, "
+                "falling back to theme preferences"
+            )
+            return RecommendationService.recommend_by_theme_preferences(
+                user=user
+            )
+        return recommended_meditations
+
+    @staticmethod
+    def recommend_by_theme_preferences(user: User) -> List[Meditation]:
         user_session = MeditationService.get_user_meditation_session(user=user)
-        if len(user_session) < 5:
+        # Only whether the threshold is reached matters, don't count them all
+        sessions_amount = user_session[
+            :MIN_SESSIONS_FOR_PERSONAL_RECOMMENDATIONS
+        ].count()
+        if sessions_amount < MIN_SESSIONS_FOR_PERSONAL_RECOMMENDATIONS:
             logger.info(
                 f"Not enough sessions for recommendation for user {user}"
             )
-            return MeditationService.get_random_meditations(amount=10)
+            return MeditationPopularityService.get_popular_meditations(
+                amount=AMOUNT_OF_MEDITATIONS_TO_RECOMMEND
+            )
 
         meditation_theme_to_amount_of_meditations = (
             RecommendationService.analyze_user_grades(user=user)
@@ -26,26 +69,54 @@ class RecommendationService:
             logger.info(
                 f"Not enough grades for recommendation for user {user}"
             )
-            return MeditationService.get_random_meditations(amount=10)
+            return MeditationPopularityService.get_popular_meditations(
+                amount=AMOUNT_OF_MEDITATIONS_TO_RECOMMEND
+            )
 
-        recommended_meditations = []
-        for (meditation_theme,) in meditation_theme_to_amount_of_meditations:
-            recommended_meditations += (
-                MeditationService.get_meditations_by_meditation_theme(
-                    meditation_theme=meditation_theme
-                )
+        exclude_seen = settings.RECOMMENDATION_EXCLUDE_SEEN
+        recommended_meditations = (
+            MeditationService.get_meditations_by_theme_quotas(
+                theme_quotas=meditation_theme_to_amount_of_meditations,
+                excluded_user=user if exclude_seen else None,
             )
+        )
+        missing = AMOUNT_OF_MEDITATIONS_TO_RECOMMEND - len(
+            recommended_meditations
+        )
+        if missing > 0:
+            # Small themes or seen meditations left too few, top up with
+            # popular ones
+            skipped_ids = {
+                meditation.id for meditation in recommended_meditations
+            }
+            if exclude_seen:
+                skipped_ids.update(
+                    user_session.values_list("meditation_id", flat=True)
+                )
+            # Enough of them to fill every slot after skipping
+            recommended_meditations += [
+                meditation
+                for meditation in (
+                    MeditationPopularityService.get_popular_meditations(
+                        amount=missing + len(skipped_ids)
+                    )
+                )
+                if meditation.id not in skipped_ids
+            ][:missing]
         logger.info(f"recommended_meditations: {recommended_meditations}")
         return recommended_meditations
 
     @staticmethod
     def analyze_user_grades(user: UserInfo) -> List[tuple] | None:
         user_theme_preference = UserThemePreference(user=user)
-        user_grades = MeditationService.get_user_grades(user=user)
-        for user_grade in user_grades:
-            meditation_theme = user_grade.meditation_id.meditation_theme_id
-            user_theme_preference.add_grade(
-                meditation_theme=meditation_theme, grade=user_grade.grade
+        theme_grade_stats = MeditationService.get_user_theme_grade_stats(
+            user=user
+        )
+        for meditation_theme, avg_grade, grade_count in theme_grade_stats:
+            user_theme_preference.add_theme_grades(
+                meditation_theme=meditation_theme,
+                average_grade=avg_grade,
+                grade_count=grade_count,
             )
 
         logger.info(f"User total grades: {user_theme_preference.total_grades}")
@@ -64,14 +135,9 @@ class RecommendationService:
         ]
 
         # Вычисляем пропорциональное количество медитаций для каждой темы
-        meditations_per_theme = [
-            floor(
-                AMOUNT_OF_MEDITATIONS_TO_RECOMMEND
-                * rating
-                / sum(rating for _, rating in meditation_theme_grade_filtered)
-            )
-            for _, rating in meditation_theme_grade_filtered
-        ]
+        meditations_per_theme = RecommendationService.get_theme_quotas(
+            [rating for _, rating in meditation_theme_grade_filtered]
+        )
 
         meditation_name_to_amount_of_meditations = []
         for i in range(len(meditation_theme_grade_filtered)):
@@ -87,18 +153,47 @@ class RecommendationService:
         )
         return meditation_name_to_amount_of_meditations
 
+    @staticmethod
+    def get_theme_quotas(ratings: List[float]) -> List[int]:
+        """Split the recommendations between themes in proportion to their
+        ratings. Every theme gets at least one, the slots left after
+        rounding down go to the largest remainders. With more themes than
+        slots, the best rated ones get one each."""
+        if len(ratings) > AMOUNT_OF_MEDITATIONS_TO_RECOMMEND:
+            best_rated = set(
+                sorted(
+                    range(len(ratings)), key=lambda i: ratings[i], reverse=True
+                )[:AMOUNT_OF_MEDITATIONS_TO_RECOMMEND]
+            )
+            return [int(i in best_rated) for i in range(len(ratings))]
+        total_rating = sum(ratings)
+        shares = [
+            AMOUNT_OF_MEDITATIONS_TO_RECOMMEND * rating / total_rating
+            for rating in ratings
+        ]
+        quotas = [max(1, floor(share)) for share in shares]
+        left = AMOUNT_OF_MEDITATIONS_TO_RECOMMEND - sum(quotas)
+        if left > 0:
+            by_remainder = sorted(
+                range(len(shares)),
+                key=lambda i: (shares[i] - floor(shares[i]), shares[i]),
+                reverse=True,
+            )
+            for i in by_remainder[:left]:
+                quotas[i] += 1
+        while sum(quotas) > AMOUNT_OF_MEDITATIONS_TO_RECOMMEND:
+            # Raising small shares to one took slots from the larger ones
+            quotas[quotas.index(max(quotas))] -= 1
+        return quotas
+
     @staticmethod
     def get_result_of_analysis(
         user_theme_preference: UserThemePreference,
     ) -> List[tuple]:
         meditation_theme_grade = []
-        for theme in user_theme_preference.theme_to_grades.keys():
+        for theme in user_theme_preference.theme_to_grade_count.keys():
             meditation_theme_grade.append(
-                (
-                    theme,
-                    sum(user_theme_preference.theme_to_grades[theme])
-                    / len(user_theme_preference.theme_to_grades[theme]),
-                )
+                (theme, user_theme_preference.get_average_grade(theme))
             )
 
         return meditation_theme_grade
@@ -0,0 +1,66 @@
+from datetime import timedelta
+from typing import List
+
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import Meditation, RecommendationSnapshot, User
+from ..repositories.MeditationRepository import MeditationRepository
+from ..repositories.RecommendationSnapshotRepository import (
+    RecommendationSnapshotRepository,
+)
+from .CatalogueService import CatalogueService
+from .logger import logger
+from .RecommendationService import RecommendationService
+
+
+class RecommendationSnapshotService:
+    @staticmethod
+    def get_recommendations(user: User) -> List[Meditation] | None:
+        snapshot = RecommendationSnapshotRepository.get_snapshot_of_user(
+            user=user,
+            catalogue_version=CatalogueService.get_version(),
+            computed_after=timezone.now()
+            - timedelta(seconds=settings.RECOMMENDATION_SNAPSHOT_MAX_AGE),
+        )
+        if snapshot is None:
+            return None
+        return MeditationRepository.get_meditations_by_ids(
+            snapshot.meditation_ids
+        )
+
+    @staticmethod
+    def precompute_user_range(
+        first_user_id: int, last_user_id: int, catalogue_version: int
+    ) -> int:
+        """Compute and store snapshots for users with ids in the range."""
+        snapshots = []
+        users = User.objects.filter(
+            id__gte=first_user_id, id__lte=last_user_id
+        ).order_by("id")
+        for user in users.iterator():
+            try:
+                recommended_meditations = (
+                    RecommendationService.recommend_meditations_for_user(
+                        user=user
+                    )
+                )
+            except Exception as e:
+                logger.error(f"Failed to precompute for user {user}: {e}")
+                continue
+            snapshots.append(
+                RecommendationSnapshot(
+                    user=user,
+                    meditation_ids=[
+                        meditation.id for meditation in recommended_meditations
+                    ],
+                    catalogue_version=catalogue_version,
+                    computed_at=timezone.now(),
+                )
+            )
+        RecommendationSnapshotRepository.save_snapshots(snapshots)
+        return len(snapshots)
+
+    @staticmethod
+    def invalidate_user(user_id: int) -> None:
+        RecommendationSnapshotRepository.delete_snapshot_of_user(user_id)
@@ -1,7 +1,11 @@
-from ..models import MeditationSession, ProgressLevel, User, UserInfo
+from ..models import ProgressLevel, User, UserInfo
 from ..repositories.AchievementRepository import AchievementRepository
 from ..repositories.UserRepository import UserRepository
+from ..repositories.UserSessionStatsRepository import (
+    UserSessionStatsRepository,
+)
 from .logger import logger
+from .ProgressLevelService import ProgressLevelService
 
 
 class UserService:
@@ -13,6 +17,10 @@ class UserService:
             user=user, name=name, phone_number=phone_number
         )
 
+    @staticmethod
+    async def aget_user_info(user: User) -> UserInfo | None:
+        return await UserRepository.aget_user_info_of_user(user=user)
+
     @staticmethod
     def get_user_by_id(user_id: int) -> UserInfo | None:
         return UserRepository.get_user_by_id(user_id=user_id)
@@ -50,9 +58,22 @@ class UserService:
 
     @staticmethod
     def get_level(user: User) -> ProgressLevel:
-        sessions_count = len(MeditationSession.objects.filter(user_id=user))
-        progress_levels = ProgressLevel.objects.all().order_by("level")
-        for i in range(len(progress_levels)):
-            if sessions_count < progress_levels[i].level:
-                return progress_levels[i]
-        return progress_levels.last() if progress_levels else None
+        sessions_count = UserSessionStatsRepository.get_session_count(
+            user_id=user.id
+        )
+        return ProgressLevelService.get_ladder().get_level(sessions_count)
+
+    @staticmethod
+    async def aget_sessions_count(user: User) -> int:
+        return await UserSessionStatsRepository.aget_session_count(
+            user_id=user.id
+        )
+
+    @staticmethod
+    async def aget_level(
+        user: User, sessions_count: int | None = None
+    ) -> ProgressLevel | None:
+        if sessions_count is None:
+            sessions_count = await UserService.aget_sessions_count(user=user)
+        ladder = await ProgressLevelService.aget_ladder()
+        return ladder.get_level(sessions_count)
@@ -0,0 +1,78 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# Exposed by the django_prometheus endpoint through the default registry
+RECOMMENDATION_CACHE_REQUESTS = Counter(
+    "thoughts_recommendation_cache_requests_total",
+    "Recommendation cache lookups by result",
+    ["result"],
+)
+
+CHAT_COMPLETION_CACHE_REQUESTS = Counter(
+    "thoughts_chat_completion_cache_requests_total",
+    "Chatbot reply cache lookups by result",
+    ["result"],
+)
+
+OPENAI_ACTIVE_REQUESTS = Gauge(
+    "thoughts_openai_active_requests",
+    "OpenAI calls holding a concurrency slot",
+)
+
+OPENAI_QUEUE_DEPTH = Gauge(
+    "thoughts_openai_queue_depth",
+    "OpenAI calls waiting for a concurrency slot",
+)
+
+OPENAI_REJECTED_REQUESTS = Counter(
+    "thoughts_openai_rejected_requests_total",
+    "OpenAI calls failed fast by reason",
+    ["reason"],
+)
+
+OPENAI_RETRIES = Counter(
+    "thoughts_openai_retries_total",
+    "Retried OpenAI calls by error",
+    ["reason"],
+)
+
+OPENAI_REQUEST_DURATION = Histogram(
+    "thoughts_openai_request_duration_seconds",
+    "OpenAI calls by model and outcome, including waiting for a slot, "
+    "retries and reading a streamed reply",
+    ["model", "outcome"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+
+OPENAI_TOKENS = Histogram(
+    "thoughts_openai_tokens",
+    "Tokens of an OpenAI call by model, outcome and type, as reported by "
+    "OpenAI",
+    ["model", "outcome", "type"],
+    buckets=(64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384),
+)
+
+CHATBOT_REPLIES = Counter(
+    "thoughts_chatbot_replies_total",
+    "Chatbot replies by model and outcome",
+    ["model", "outcome"],
+)
+
+CHATBOT_PROMPT_MEDITATIONS = Histogram(
+    "thoughts_chatbot_prompt_meditations",
+    "Catalogue meditations embedded in the chatbot prompt",
+    ["model", "outcome"],
+    buckets=(0, 5, 10, 20, 40, 80, 160, 320),
+)
+
+CHATBOT_CONVERSATION_MESSAGES = Histogram(
+    "thoughts_chatbot_conversation_messages",
+    "Messages sent to the chatbot after the system prompt",
+    ["model", "outcome"],
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+
+CHAT_COMPLETION_JOBS = Counter(
+    "thoughts_chat_completion_jobs_total",
+    "Chatbot completion jobs by outcome",
+    ["outcome"],
+)
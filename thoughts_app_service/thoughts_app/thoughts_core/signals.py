@@ -0,0 +1,233 @@
+from django.db.models.signals import (
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from .models import (
+    Meditation,
+    MeditationGrade,
+    MeditationNarrator,
+    MeditationSession,
+    MeditationTheme,
+    ProgressLevel,
+)
+from .repositories.MeditationSessionPartitionRepository import (
+    MeditationSessionPartitionRepository,
+)
+from .repositories.UserSessionStatsRepository import (
+    UserSessionStatsRepository,
+)
+from .repositories.UserThemeAffinityRepository import (
+    UserThemeAffinityRepository,
+)
+from .services.CatalogueService import CatalogueService
+from .services.MeditationPopularityService import MeditationPopularityService
+from .services.MeditationSessionPartitionService import (
+    MeditationSessionPartitionService,
+)
+from .services.ProgressLevelService import ProgressLevelService
+from .services.RecommendationCacheService import RecommendationCacheService
+from .services.RecommendationSnapshotService import (
+    RecommendationSnapshotService,
+)
+
+
+def _get_meditation_theme_id(meditation_id: int) -> int | None:
+    return (
+        Meditation.objects.filter(pk=meditation_id)
+        .values_list("meditation_theme_id", flat=True)
+        .first()
+    )
+
+
+@receiver(pre_save, sender=Meditation)
+def remember_previous_meditation_theme(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    instance._previous_meditation_theme_id = _get_meditation_theme_id(
+        instance.pk
+    )
+
+
+@receiver(post_save, sender=Meditation)
+def move_theme_affinity_on_meditation_save(
+    sender, instance, created, raw=False, **kwargs
+):
+    if raw or created:
+        return
+    previous_meditation_theme_id = getattr(
+        instance, "_previous_meditation_theme_id", None
+    )
+    if previous_meditation_theme_id != instance.meditation_theme_id:
+        UserThemeAffinityRepository.move_meditation_grades(
+            meditation_id=instance.pk,
+            from_theme_id=previous_meditation_theme_id,
+            to_theme_id=instance.meditation_theme_id,
+        )
+
+
+@receiver(pre_save, sender=MeditationGrade)
+def remember_previous_grade(sender, instance, raw=False, **kwargs):
+    instance._previous_grade = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_grade = (
+        MeditationGrade.objects.filter(pk=instance.pk)
+        .values(
+            "user_id",
+            "grade",
+            "meditation_id",
+            "meditation__meditation_theme_id",
+        )
+        .first()
+    )
+
+
+@receiver(post_save, sender=MeditationGrade)
+def update_theme_affinity_on_grade_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_grade", None)
+    if previous and previous["meditation__meditation_theme_id"]:
+        UserThemeAffinityRepository.add_grades(
+            user_id=previous["user_id"],
+            meditation_theme_id=previous["meditation__meditation_theme_id"],
+            grade_sum=-previous["grade"],
+            grade_count=-1,
+        )
+
+    meditation_theme_id = _get_meditation_theme_id(instance.meditation_id)
+    if meditation_theme_id:
+        UserThemeAffinityRepository.add_grades(
+            user_id=instance.user_id,
+            meditation_theme_id=meditation_theme_id,
+            grade_sum=instance.grade,
+            grade_count=1,
+        )
+
+
+@receiver(post_delete, sender=MeditationGrade)
+def update_theme_affinity_on_grade_delete(sender, instance, **kwargs):
+    meditation_theme_id = _get_meditation_theme_id(instance.meditation_id)
+    if meditation_theme_id:
+        UserThemeAffinityRepository.add_grades(
+            user_id=instance.user_id,
+            meditation_theme_id=meditation_theme_id,
+            grade_sum=-instance.grade,
+            grade_count=-1,
+        )
+
+
+@receiver(post_save, sender=MeditationGrade)
+def update_popularity_on_grade_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # meditation id -> (grade sum delta, grade count delta)
+    deltas = {instance.meditation_id: (instance.grade, 1)}
+    previous = getattr(instance, "_previous_grade", None)
+    if previous:
+        grade_sum, grade_count = deltas.get(previous["meditation_id"], (0, 0))
+        deltas[previous["meditation_id"]] = (
+            grade_sum - previous["grade"],
+            grade_count - 1,
+        )
+    for meditation_id, (grade_sum, grade_count) in deltas.items():
+        if grade_sum or grade_count:
+            MeditationPopularityService.record_grade(
+                meditation_id=meditation_id,
+                grade_sum=grade_sum,
+                grade_count=grade_count,
+            )
+
+
+@receiver(post_delete, sender=MeditationGrade)
+def update_popularity_on_grade_delete(sender, instance, **kwargs):
+    MeditationPopularityService.record_grade(
+        meditation_id=instance.meditation_id,
+        grade_sum=-instance.grade,
+        grade_count=-1,
+    )
+
+
+@receiver(post_save, sender=MeditationSession)
+def update_popularity_on_session_save(
+    sender, instance, created, raw=False, **kwargs
+):
+    if raw or not created:
+        return
+    MeditationPopularityService.record_session(
+        meditation_id=instance.meditation_id,
+        session_start_time=instance.session_start_time,
+        session_count=1,
+    )
+
+
+@receiver(post_delete, sender=MeditationSession)
+def update_popularity_on_session_delete(sender, instance, **kwargs):
+    MeditationPopularityService.record_session(
+        meditation_id=instance.meditation_id,
+        session_start_time=instance.session_start_time,
+        session_count=-1,
+    )
+
+
+@receiver(post_save, sender=MeditationSession)
+def update_session_stats_on_session_save(
+    sender, instance, created, raw=False, **kwargs
+):
+    if raw or not created:
+        return
+    UserSessionStatsRepository.add_sessions(
+        user_id=instance.user_id, session_count=1
+    )
+
+
+@receiver(post_delete, sender=MeditationSession)
+def update_session_stats_on_session_delete(sender, instance, **kwargs):
+    UserSessionStatsRepository.add_sessions(
+        user_id=instance.user_id, session_count=-1
+    )
+
+
+@receiver(post_save, sender=Meditation)
+@receiver(post_delete, sender=Meditation)
+@receiver(post_save, sender=MeditationTheme)
+@receiver(post_delete, sender=MeditationTheme)
+@receiver(post_save, sender=MeditationNarrator)
+@receiver(post_delete, sender=MeditationNarrator)
+def bump_catalogue_version(sender, raw=False, **kwargs):
+    if raw:
+        return
+    CatalogueService.bump_version()
+
+
+@receiver(post_save, sender=ProgressLevel)
+@receiver(post_delete, sender=ProgressLevel)
+def invalidate_progress_level_ladder(sender, raw=False, **kwargs):
+    if raw:
+        return
+    ProgressLevelService.invalidate()
+
+
+@receiver(post_save, sender=MeditationSession)
+@receiver(post_delete, sender=MeditationSession)
+@receiver(post_save, sender=MeditationGrade)
+@receiver(post_delete, sender=MeditationGrade)
+def invalidate_user_recommendations(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    RecommendationSnapshotService.invalidate_user(instance.user_id)
+    RecommendationCacheService.invalidate_user(instance.user_id)
+
+
+@receiver(post_migrate)
+def create_session_partitions(sender, **kwargs):
+    # Every deploy migrates, so the coming months get their partitions even
+    # if maintain_session_partitions is not scheduled
+    if sender.name != "thoughts_core":
+        return
+    if MeditationSessionPartitionRepository.is_partitioned():
+        MeditationSessionPartitionService.create_partitions()
@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOpenAIServer:
+    """Local OpenAI-compatible /chat/completions endpoint for tests.
+
+    Replies with `content` after `delay` seconds. When streaming, the
+    content is split into `chunks` and sent with `chunk_delay` seconds
+    between them. `status` other than 200 returns an error body, `statuses`
+    gives the status of each request in turn before falling back to
+    `status`. Received request bodies are collected in `requests`.
+    """
+
+    def __init__(
+        self,
+        content="",
+        chunks=1,
+        chunk_delay=0.0,
+        status=200,
+        statuses=(),
+        delay=0.0,
+    ):
+        self.content = content
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+        self.status = status
+        self.statuses = list(statuses)
+        self.delay = delay
+        self.requests = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.get_handler())
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_port}/v1"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def split_content(self):
+        size = max(1, -(-len(self.content) // self.chunks))
+        return [
+            self.content[i : i + size]
+            for i in range(0, len(self.content), size)
+        ]
+
+    def get_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def send_json(self, status, body):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def send_event(self, data):
+                payload = f"data: {data}\n\n".encode()
+                self.wfile.write(f"{len(payload):x}\r\n".encode())
+                self.wfile.write(payload + b"\r\n")
+                self.wfile.flush()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length))
+                with fake.lock:
+                    fake.requests.append(request)
+                    status = (
+                        fake.statuses.pop(0) if fake.statuses else fake.status
+                    )
+
+                time.sleep(fake.delay)
+                if status != 200:
+                    self.send_json(
+                        status,
+                        {"error": {"message": "Fake error", "type": "fake"}},
+                    )
+                    return
+
+                base = {
+                    "id": "chatcmpl-fake",
+                    "created": int(time.time()),
+                    "model": request["model"],
+                }
+                if not request.get("stream"):
+                    self.send_json(
+                        200,
+                        {
+                            **base,
+                            "object": "chat.completion",
+                            "choices": [
+                                {
+                                    "index": 0,
+                                    "message": {
+                                        "role": "assistant",
+                                        "content": fake.content,
+                                    },
+                                    "finish_reason": "stop",
+                                }
+                            ],
+                            "usage": {
+                                "prompt_tokens": 1,
+                                "completion_tokens": 1,
+                                "total_tokens": 2,
+                            },
+                        },
+                    )
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i, part in enumerate(fake.split_content()):
+                    if i:
+                        time.sleep(fake.chunk_delay)
+                    self.send_event(
+                        json.dumps(
+                            {
+                                **base,
+                                "object": "chat.completion.chunk",
+                                "choices": [
+                                    {
+                                        "index": 0,
+                                        "delta": {"content": part},
+                                        "finish_reason": None,
+                                    }
+                                ],
+                            }
+                        )
+                    )
+                self.send_event("[DONE]")
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+        return Handler
@@ -0,0 +1,200 @@
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..models import (
+    Achievement,
+    Meditation,
+    MeditationGrade,
+    MeditationSession,
+    ProgressLevel,
+    UserAchievement,
+    UserInfo,
+)
+from ..services.ProgressLevelService import ProgressLevelService
+from ..services.UserService import UserService
+from ..views import (
+    MeditationGradeViewSet,
+    MeditationProgressView,
+    MeditationSessionViewSet,
+    MeditationViewSet,
+    RecommendMeditationsApiView,
+    UserInfoView,
+)
+
+
+class AsyncViewTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser")
+        self.other_user = User.objects.create_user(username="otheruser")
+        self.meditation = Meditation.objects.create(name="Глубокий сон")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+
+class AsyncViewsTest(TestCase):
+    def test_hot_views_are_async(self):
+        for view in [
+            MeditationViewSet,
+            MeditationGradeViewSet,
+            MeditationSessionViewSet,
+            RecommendMeditationsApiView,
+            MeditationProgressView,
+            UserInfoView,
+        ]:
+            with self.subTest(view=view.__name__):
+                self.assertTrue(view.view_is_async)
+
+
+class MeditationViewSetTest(AsyncViewTestCase):
+    def test_list_and_retrieve(self):
+        response = self.client.get("/api/meditation/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [meditation["name"] for meditation in response.data],
+            ["Глубокий сон"],
+        )
+
+        response = self.client.get(f"/api/meditation/{self.meditation.id}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["name"], "Глубокий сон")
+
+    def test_unknown_or_malformed_id_is_not_found(self):
+        for pk in [999999, "abc"]:
+            with self.subTest(pk=pk):
+                response = self.client.get(f"/api/meditation/{pk}/")
+                self.assertEqual(
+                    response.status_code, status.HTTP_404_NOT_FOUND
+                )
+
+
+class MeditationGradeViewSetTest(AsyncViewTestCase):
+    def test_create_update_and_delete(self):
+        response = self.client.post(
+            "/api/meditation_grade/",
+            {
+                "user": self.user.id,
+                "meditation": self.meditation.id,
+                "grade": 4,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        grade_id = response.data["id"]
+
+        response = self.client.patch(
+            f"/api/meditation_grade/{grade_id}/", {"grade": 5}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(MeditationGrade.objects.get(pk=grade_id).grade, 5)
+
+        response = self.client.delete(f"/api/meditation_grade/{grade_id}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(MeditationGrade.objects.exists())
+
+    def test_invalid_grade_is_rejected(self):
+        response = self.client.post(
+            "/api/meditation_grade/",
+            {"user": self.user.id, "meditation": 999999, "grade": 4},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("meditation", response.data)
+
+    def test_grades_of_other_users_are_hidden(self):
+        own_grade = MeditationGrade.objects.create(
+            user=self.user, meditation=self.meditation, grade=3
+        )
+        other_grade = MeditationGrade.objects.create(
+            user=self.other_user, meditation=self.meditation, grade=1
+        )
+
+        response = self.client.get("/api/meditation_grade/")
+        self.assertEqual(
+            [grade["id"] for grade in response.data], [own_grade.id]
+        )
+        response = self.client.get(f"/api/meditation_grade/{other_grade.id}/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class MeditationSessionViewSetTest(AsyncViewTestCase):
+    def test_create_and_list(self):
+        response = self.client.post(
+            "/api/meditation_session/",
+            {"meditation": self.meditation.id},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        session = MeditationSession.objects.get()
+        self.assertEqual(session.user, self.user)
+
+        MeditationSession.objects.create(
+            user=self.other_user, meditation=self.meditation
+        )
+        response = self.client.get("/api/meditation_session/")
+        self.assertEqual(
+            [session["id"] for session in response.data], [session.id]
+        )
+
+
+class UserInfoViewTest(AsyncViewTestCase):
+    def test_get_and_update_with_achievements(self):
+        user_info = UserInfo.objects.create(user=self.user, name="Анна")
+        achievement = Achievement.objects.create(
+            name="Первая медитация",
+            cover_file_url="http://example.com/cover.jpg",
+            description="",
+        )
+        UserAchievement.objects.create(
+            user_info=user_info, achievement=achievement
+        )
+
+        response = self.client.get("/api/user_info/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["name"], "Анна")
+        self.assertEqual(response.data["achievements"], [achievement.id])
+
+        response = self.client.patch(
+            "/api/user_info/", {"name": "Аня"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user_info.refresh_from_db()
+        self.assertEqual(user_info.name, "Аня")
+
+
+class MeditationProgressTest(AsyncViewTestCase):
+    def setUp(self):
+        super().setUp()
+        ProgressLevelService.clear()
+        ProgressLevel.objects.create(level=2, name="Новичок")
+        ProgressLevel.objects.create(level=5, name="Практик")
+
+    def test_level_follows_session_count(self):
+        for _ in range(3):
+            MeditationSession.objects.create(
+                user=self.user, meditation=self.meditation
+            )
+
+        self.client.get("/api/meditation_progress/")
+        # Only the session counter is read once the ladder is loaded
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/meditation_progress/")
+
+        self.assertEqual(
+            response.data,
+            {
+                "level_name": "Практик",
+                "next_level_count": 5,
+                "current_level_count": 3,
+            },
+        )
+
+    def test_last_level_once_all_are_passed(self):
+        level = async_to_sync(UserService.aget_level)(
+            user=self.user, sessions_count=10
+        )
+
+        self.assertEqual(level.name, "Практик")
@@ -0,0 +1,141 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from ..benchmarks.workload import SyntheticWorkload, measure
+from ..models import (
+    Chat,
+    Meditation,
+    MeditationSession,
+    ProgressLevel,
+    UserThemeAffinity,
+)
+from ..services.MeditationService import MeditationService
+from ..services.RecommendationCacheService import get_recommendation_cache
+
+
+class SyntheticWorkloadTest(TestCase):
+    def test_seeds_requested_volumes(self):
+        workload = SyntheticWorkload(themes=3, meditations=12, seed=1)
+        workload.seed_catalogue()
+        users = workload.seed_users(2, "warm")
+        workload.seed_activity(users, sessions=5, grades=4)
+        workload.finalize()
+
+        self.assertEqual(Meditation.objects.count(), 12)
+        self.assertEqual(MeditationSession.objects.count(), 10)
+        self.assertTrue(
+            UserThemeAffinity.objects.filter(user__in=users).exists()
+        )
+
+    def test_measure_reports_percentiles_and_queries(self):
+        result = measure(
+            lambda _: list(User.objects.all()), [None, None], iterations=2
+        )
+
+        self.assertEqual(result["calls"], 4)
+        self.assertEqual(result["queries"], {"mean": 1, "max": 1})
+        self.assertLessEqual(
+            result["latency_ms"]["p50"], result["latency_ms"]["max"]
+        )
+
+
+class BenchmarkRecommendationsCommandTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_recommendation_cache().clear()
+        MeditationService._meditation_id_index = None
+
+    def test_writes_report_and_rolls_back_seeded_rows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "report.json")
+            call_command(
+                "benchmark_recommendations",
+                themes=2,
+                meditations=20,
+                cold_users=2,
+                warm_users=2,
+                heavy_users=1,
+                heavy_sessions=20,
+                heavy_grades=10,
+                iterations=1,
+                seed=1,
+                output=output,
+                stdout=StringIO(),
+            )
+            with open(output) as report_file:
+                report = json.load(report_file)
+
+        self.assertEqual(
+            set(report["cohorts"]), {"cold_start", "warm", "heavy"}
+        )
+        for result in report["cohorts"].values():
+            self.assertIn("p99", result["latency_ms"])
+            self.assertIn("peak_memory_kb", result)
+        self.assertEqual(report["parameters"]["strategy"], "theme")
+        self.assertFalse(Meditation.objects.exists())
+        self.assertFalse(User.objects.exists())
+
+
+class BenchmarkChatPromptCommandTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_windowed_prompt_stays_bounded(self):
+        stdout = StringIO()
+        with override_settings(CHAT_HISTORY_TOKEN_BUDGET=300):
+            call_command(
+                "benchmark_chat_prompt",
+                meditations=5,
+                turns=[1, 20],
+                stdout=stdout,
+            )
+        report = json.loads(stdout.getvalue())
+
+        first, last = report["turns"]
+        self.assertEqual(
+            first["full_prompt_tokens"], first["windowed_prompt_tokens"]
+        )
+        self.assertGreater(
+            last["full_prompt_tokens"], last["windowed_prompt_tokens"]
+        )
+        self.assertGreater(last["summary_calls"], 0)
+        self.assertFalse(Chat.objects.exists())
+
+
+class BenchmarkRequestPathCommandTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        get_recommendation_cache().clear()
+
+    def test_serves_every_endpoint_and_deletes_seeded_rows(self):
+        stdout = StringIO()
+        call_command(
+            "benchmark_request_path",
+            meditations=5,
+            users=2,
+            sessions=3,
+            grades=2,
+            requests=4,
+            concurrency=2,
+            seed=1,
+            stdout=stdout,
+        )
+        report = json.loads(stdout.getvalue())
+
+        self.assertEqual(set(report["servers"]), {"wsgi", "asgi"})
+        for endpoints in report["servers"].values():
+            self.assertEqual(len(endpoints), 6)
+            for result in endpoints.values():
+                self.assertEqual(result["requests"], 4)
+                self.assertEqual(result["errors"], 0)
+                self.assertGreater(result["requests_per_second"], 0)
+        self.assertFalse(Meditation.objects.exists())
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(ProgressLevel.objects.exists())
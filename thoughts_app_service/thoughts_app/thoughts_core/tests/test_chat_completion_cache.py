@@ -0,0 +1,192 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+from ..models import Chat, Meditation
+from ..services.ChatCompletionCacheService import (
+    ChatCompletionCacheService,
+    get_chat_completion_cache,
+)
+from ..views import (
+    MeditationSearchIndexCache,
+    OpenAiClientSingleton,
+    generate_chat_completion,
+)
+from .fake_openai import FakeOpenAIServer
+
+REPLY = {
+    "message": "Попробуйте медитацию перед сном",
+    "suggested_meditations": [{"id": 1, "name": "Глубокий сон"}],
+}
+
+
+def get_cache_requests(result):
+    return (
+        REGISTRY.get_sample_value(
+            "thoughts_chat_completion_cache_requests_total",
+            {"result": result},
+        )
+        or 0
+    )
+
+
+class ChatCompletionCacheKeyTest(TestCase):
+    def get_cache_key(self, content, model="gpt", catalogue_version=1):
+        return ChatCompletionCacheService.get_cache_key(
+            model=model,
+            catalogue_version=catalogue_version,
+            messages=[{"role": "user", "content": content}],
+        )
+
+    def test_case_whitespace_and_trailing_punctuation_are_ignored(self):
+        self.assertEqual(
+            self.get_cache_key("Не могу уснуть."),
+            self.get_cache_key("  не могу\n уснуть"),
+        )
+
+    def test_model_catalogue_version_and_content_are_part_of_key(self):
+        cache_key = self.get_cache_key("Не могу уснуть")
+
+        self.assertNotEqual(
+            cache_key, self.get_cache_key("Не могу уснуть", model="other")
+        )
+        self.assertNotEqual(
+            cache_key,
+            self.get_cache_key("Не могу уснуть", catalogue_version=2),
+        )
+        self.assertNotEqual(cache_key, self.get_cache_key("Мне тревожно"))
+
+
+class ChatCompletionCacheTestMixin:
+    def setUp(self):
+        cache.clear()
+        get_chat_completion_cache().clear()
+        OpenAiClientSingleton._instance = None
+        MeditationSearchIndexCache.search_index = None
+        Meditation.objects.create(name="Глубокий сон")
+
+    def tearDown(self):
+        OpenAiClientSingleton._instance = None
+
+    def fake_openai(self, **kwargs):
+        fake = FakeOpenAIServer(**kwargs)
+        settings_override = override_settings(
+            OPENAI_API_KEY="test", OPENAI_BASE_URL=fake.base_url
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        return fake
+
+
+class GenerateChatCompletionCacheTest(ChatCompletionCacheTestMixin, TestCase):
+    def generate(self, message="Не могу уснуть", use_cache=True):
+        return async_to_sync(generate_chat_completion)(
+            [], message, use_cache=use_cache
+        )
+
+    def test_identical_conversation_is_answered_from_cache(self):
+        hits = get_cache_requests("hit")
+        content = json.dumps(REPLY, ensure_ascii=False)
+
+        with self.fake_openai(content=content) as fake:
+            first = self.generate("Не могу уснуть")
+            second = self.generate("не могу уснуть!")
+
+        self.assertEqual(len(fake.requests), 1)
+        self.assertEqual(first[-1], second[-1])
+        self.assertEqual(second[-1]["content"], content)
+        self.assertEqual(get_cache_requests("hit"), hits + 1)
+
+    def test_opting_out_skips_the_cache(self):
+        bypasses = get_cache_requests("bypass")
+
+        with self.fake_openai(
+            content=json.dumps(REPLY, ensure_ascii=False)
+        ) as fake:
+            self.generate()
+            self.generate(use_cache=False)
+
+        self.assertEqual(len(fake.requests), 2)
+        self.assertEqual(get_cache_requests("bypass"), bypasses + 1)
+
+    def test_invalid_replies_are_not_cached(self):
+        invalid_reply = json.dumps({"message": "Нет списка медитаций"})
+
+        with self.fake_openai(content=invalid_reply) as fake:
+            self.generate()
+            self.generate()
+
+        self.assertEqual(len(fake.requests), 2)
+
+    def test_catalogue_change_misses(self):
+        with self.fake_openai(
+            content=json.dumps(REPLY, ensure_ascii=False)
+        ) as fake:
+            self.generate()
+            Meditation.objects.create(name="Утреннее пробуждение")
+            self.generate()
+
+        self.assertEqual(len(fake.requests), 2)
+
+    def test_cached_reply_that_no_longer_validates_is_refetched(self):
+        content = json.dumps(REPLY, ensure_ascii=False)
+
+        with self.fake_openai(content=content) as fake, patch.object(
+            ChatCompletionCacheService,
+            "aget_response",
+            new_callable=AsyncMock,
+            return_value=json.dumps({"message": "Старый формат"}),
+        ):
+            conversation = self.generate()
+
+        self.assertEqual(len(fake.requests), 1)
+        self.assertEqual(conversation[-1]["content"], content)
+
+
+class ChatBotStreamCacheTest(
+    ChatCompletionCacheTestMixin, TransactionTestCase
+):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="testuser")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def post(self, use_cache=True):
+        chat = Chat.objects.create(user=self.user)
+        response = self.client.post(
+            "/api/chatbot/stream/",
+            {
+                "message": "Не могу уснуть",
+                "chat_id": chat.id,
+                "use_cache": use_cache,
+            },
+            format="json",
+        )
+        return b"".join(response.streaming_content).decode("utf-8")
+
+    def test_cached_reply_is_streamed_as_one_delta(self):
+        content = json.dumps(REPLY, ensure_ascii=False)
+
+        with self.fake_openai(content=content, chunks=4) as fake:
+            self.post()
+            body = self.post()
+
+        self.assertEqual(len(fake.requests), 1)
+        self.assertEqual(body.count("event: delta"), 1)
+        self.assertIn("event: done", body)
+
+    def test_opting_out_streams_from_the_model(self):
+        content = json.dumps(REPLY, ensure_ascii=False)
+
+        with self.fake_openai(content=content, chunks=4) as fake:
+            self.post()
+            self.post(use_cache=False)
+
+        self.assertEqual(len(fake.requests), 2)
@@ -0,0 +1,294 @@
+import json
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import AsyncMock, patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..models import Chat, ChatCompletionJob, ChatMessage
+from ..services.ChatCompletionJobService import ChatCompletionJobService
+from ..services.OpenAiClientPool import OpenAiOverloadedError
+
+REPLY = {
+    "message": "Попробуйте медитацию перед сном",
+    "suggested_meditations": [{"id": 1, "name": "Глубокий сон"}],
+}
+
+
+def get_conversation(content):
+    return [{"role": "assistant", "content": content}]
+
+
+class ChatBotJobModeTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser")
+        self.chat = Chat.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    @patch(
+        "thoughts_core.views.generate_chat_completion", new_callable=AsyncMock
+    )
+    def test_job_mode_queues_without_calling_the_model(
+        self, mock_generate_chat_completion
+    ):
+        response = self.client.post(
+            "/api/chatbot/",
+            {
+                "message": "Не могу уснуть",
+                "chat_id": self.chat.id,
+                "mode": "job",
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], ChatCompletionJob.QUEUED)
+        self.assertEqual(
+            response["Location"], f"/api/chatbot/jobs/{response.data['id']}/"
+        )
+        job = ChatCompletionJob.objects.get()
+        self.assertEqual(job.message, "Не могу уснуть")
+        mock_generate_chat_completion.assert_not_called()
+
+    def test_poll_returns_the_job(self):
+        job = ChatCompletionJob.objects.create(
+            chat=self.chat,
+            message="Не могу уснуть",
+            status=ChatCompletionJob.SUCCEEDED,
+            result=REPLY,
+        )
+
+        response = self.client.get(f"/api/chatbot/jobs/{job.id}/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["result"], REPLY)
+
+    def test_jobs_of_other_users_are_not_found(self):
+        other_user = User.objects.create_user(username="otheruser")
+        job = ChatCompletionJob.objects.create(
+            chat=Chat.objects.create(user=other_user), message="Привет"
+        )
+
+        response = self.client.get(f"/api/chatbot/jobs/{job.id}/")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(
+        CHAT_COMPLETION_JOB_MAX_WAIT=1,
+        CHAT_COMPLETION_JOB_POLL_INTERVAL=0.05,
+    )
+    def test_long_poll_is_capped(self):
+        job = ChatCompletionJob.objects.create(
+            chat=self.chat, message="Привет"
+        )
+
+        started = time.monotonic()
+        response = self.client.get(
+            f"/api/chatbot/jobs/{job.id}/", {"wait": 60}
+        )
+
+        self.assertEqual(response.data["status"], ChatCompletionJob.QUEUED)
+        self.assertGreaterEqual(time.monotonic() - started, 1)
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_bad_wait_is_rejected(self):
+        job = ChatCompletionJob.objects.create(
+            chat=self.chat, message="Привет"
+        )
+
+        response = self.client.get(
+            f"/api/chatbot/jobs/{job.id}/", {"wait": "long"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ChatCompletionJobQueueTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="testuser")
+        self.chat = Chat.objects.create(user=user)
+
+    def test_oldest_job_is_claimed_once(self):
+        first = ChatCompletionJob.objects.create(chat=self.chat, message="1")
+        second = ChatCompletionJob.objects.create(chat=self.chat, message="2")
+
+        self.assertEqual(ChatCompletionJobService.claim_next_job(), first)
+        self.assertEqual(ChatCompletionJobService.claim_next_job(), second)
+        self.assertIsNone(ChatCompletionJobService.claim_next_job())
+        first.refresh_from_db()
+        self.assertEqual(first.status, ChatCompletionJob.RUNNING)
+        self.assertEqual(first.attempts, 1)
+
+    def test_expired_lease_is_claimed_again(self):
+        job = ChatCompletionJob.objects.create(chat=self.chat, message="1")
+        job = ChatCompletionJobService.claim_next_job()
+        ChatCompletionJob.objects.filter(pk=job.pk).update(
+            available_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        reclaimed = ChatCompletionJobService.claim_next_job()
+
+        self.assertEqual(reclaimed.attempts, 2)
+        # The first worker can no longer finish it
+        ChatCompletionJobService.succeed(job, REPLY)
+        reclaimed.refresh_from_db()
+        self.assertEqual(reclaimed.status, ChatCompletionJob.RUNNING)
+
+    @override_settings(CHAT_COMPLETION_JOB_MAX_ATTEMPTS=1)
+    def test_abandoned_job_fails_after_max_attempts(self):
+        ChatCompletionJob.objects.create(
+            chat=self.chat,
+            message="1",
+            status=ChatCompletionJob.RUNNING,
+            attempts=1,
+        )
+
+        self.assertIsNone(ChatCompletionJobService.claim_next_job())
+        self.assertEqual(
+            ChatCompletionJob.objects.get().status, ChatCompletionJob.FAILED
+        )
+
+
+class ChatCompletionJobLockingTest(TransactionTestCase):
+    def test_locked_jobs_are_skipped(self):
+        user = User.objects.create_user(username="testuser")
+        job = ChatCompletionJob.objects.create(
+            chat=Chat.objects.create(user=user), message="1"
+        )
+        locked, release = threading.Event(), threading.Event()
+
+        def hold_lock():
+            with transaction.atomic():
+                ChatCompletionJob.objects.select_for_update().get(pk=job.pk)
+                locked.set()
+                release.wait(5)
+            connection.close()
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        locked.wait(5)
+        try:
+            self.assertIsNone(ChatCompletionJobService.claim_next_job())
+        finally:
+            release.set()
+            holder.join()
+        self.assertEqual(ChatCompletionJobService.claim_next_job(), job)
+
+
+class RunChatCompletionWorkerTest(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser")
+        self.chat = Chat.objects.create(user=self.user)
+
+    def run_worker(self):
+        stdout = StringIO()
+        call_command("run_chat_completion_worker", burst=True, stdout=stdout)
+        return stdout.getvalue()
+
+    def get_job_count(self, outcome):
+        return (
+            REGISTRY.get_sample_value(
+                "thoughts_chat_completion_jobs_total", {"outcome": outcome}
+            )
+            or 0
+        )
+
+    @patch(
+        "thoughts_core.views.generate_chat_completion", new_callable=AsyncMock
+    )
+    def test_worker_answers_and_stores_the_turn(
+        self, mock_generate_chat_completion
+    ):
+        mock_generate_chat_completion.return_value = get_conversation(
+            json.dumps(REPLY)
+        )
+        job = ChatCompletionJob.objects.create(
+            chat=self.chat, message="Не могу уснуть"
+        )
+
+        output = self.run_worker()
+
+        self.assertIn("Answered 1", output)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ChatCompletionJob.SUCCEEDED)
+        self.assertEqual(job.result, REPLY)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(
+            list(ChatMessage.objects.values_list("role", flat=True)),
+            ["user", "assistant"],
+        )
+
+    @patch(
+        "thoughts_core.views.generate_chat_completion", new_callable=AsyncMock
+    )
+    def test_invalid_reply_fails_the_job(self, mock_generate_chat_completion):
+        mock_generate_chat_completion.return_value = get_conversation(
+            json.dumps({"message": "Нет списка медитаций"})
+        )
+        job = ChatCompletionJob.objects.create(
+            chat=self.chat, message="Привет"
+        )
+
+        self.run_worker()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ChatCompletionJob.FAILED)
+        self.assertIn("suggested_meditations", job.error)
+
+    @patch(
+        "thoughts_core.views.generate_chat_completion",
+        new_callable=AsyncMock,
+        side_effect=OpenAiOverloadedError("OpenAI request queue is full"),
+    )
+    def test_overload_requeues_the_job(self, mock_generate_chat_completion):
+        job = ChatCompletionJob.objects.create(
+            chat=self.chat, message="Привет"
+        )
+
+        self.run_worker()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ChatCompletionJob.QUEUED)
+        self.assertGreater(job.available_at, timezone.now())
+        self.assertEqual(job.error, "OpenAI request queue is full")
+
+    @patch(
+        "thoughts_core.views.generate_chat_completion", new_callable=AsyncMock
+    )
+    def test_reclaimed_job_does_not_store_the_turn_twice(
+        self, mock_generate_chat_completion
+    ):
+        job = ChatCompletionJob.objects.create(
+            chat=self.chat, message="Не могу уснуть"
+        )
+
+        async def reclaim_while_answering(*args, **kwargs):
+            # The lease ran out and another worker claimed the job
+            await ChatCompletionJob.objects.filter(pk=job.pk).aupdate(
+                attempts=F("attempts") + 1
+            )
+            return get_conversation(json.dumps(REPLY))
+
+        mock_generate_chat_completion.side_effect = reclaim_while_answering
+        succeeded = self.get_job_count("succeeded")
+        dropped = self.get_job_count("dropped")
+
+        self.run_worker()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ChatCompletionJob.RUNNING)
+        self.assertIsNone(job.finished_at)
+        self.assertFalse(ChatMessage.objects.exists())
+        self.assertEqual(self.get_job_count("succeeded"), succeeded)
+        self.assertEqual(self.get_job_count("dropped"), dropped + 1)
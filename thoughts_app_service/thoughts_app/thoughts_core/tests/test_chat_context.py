@@ -0,0 +1,114 @@
+from unittest.mock import AsyncMock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from ..models import Chat
+from ..repositories.ChatRepository import ChatRepository
+from ..services.ChatService import SUMMARY_MESSAGE_PREFIX, ChatService
+from ..value_objects.TokenCounter import TokenCounter
+
+
+class TokenCounterTest(TestCase):
+    def setUp(self):
+        self.token_counter = TokenCounter("gpt-3.5-turbo")
+        self.token_counter.encoding = None
+
+    def test_heuristic_counts_utf8_bytes(self):
+        self.assertEqual(self.token_counter.count_text("abcdefgh"), 2)
+        self.assertEqual(self.token_counter.count_text("тревога"), 4)
+
+    def test_messages_include_framing(self):
+        message = {"role": "user", "content": "abcd"}
+
+        self.assertEqual(self.token_counter.count_message(message), 6)
+        self.assertEqual(
+            self.token_counter.count_messages([message, message]), 15
+        )
+
+
+class ChatConversationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser")
+        self.chat = Chat.objects.create(user=self.user)
+        self.messages = [
+            {"role": "user", "content": f"message {index} " + "x" * 200}
+            for index in range(1, 7)
+        ]
+        ChatRepository.append_messages(self.chat.id, self.messages)
+        token_counter = ChatService.get_token_counter(
+            settings.CHAT_COMPLETION_MODEL
+        )
+        self.message_tokens = token_counter.count_message(self.messages[0])
+
+    def get_conversation(self, summarize=None):
+        return async_to_sync(ChatService.aget_conversation)(
+            self.chat, summarize=summarize
+        )
+
+    def test_history_within_budget_is_sent_whole(self):
+        summarize = AsyncMock()
+
+        with override_settings(
+            CHAT_HISTORY_TOKEN_BUDGET=self.message_tokens * 10
+        ):
+            conversation = self.get_conversation(summarize)
+
+        self.assertEqual(conversation, self.messages)
+        summarize.assert_not_called()
+
+    def test_older_messages_are_folded_into_summary(self):
+        summarize = AsyncMock(return_value="Пользователь тревожится")
+
+        with override_settings(
+            CHAT_HISTORY_TOKEN_BUDGET=self.message_tokens * 4
+        ):
+            conversation = self.get_conversation(summarize)
+
+        # Folding leaves half of the budget, two messages
+        summarize.assert_awaited_once_with("", self.messages[:4])
+        self.assertEqual(
+            conversation,
+            [
+                {
+                    "role": "system",
+                    "content": SUMMARY_MESSAGE_PREFIX
+                    + "Пользователь тревожится",
+                },
+                *self.messages[4:],
+            ],
+        )
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.summary, "Пользователь тревожится")
+        self.assertEqual(self.chat.summarized_until, 4)
+
+    def test_summary_is_not_rebuilt_while_window_fits(self):
+        summarize = AsyncMock(return_value="Пользователь тревожится")
+
+        with override_settings(
+            CHAT_HISTORY_TOKEN_BUDGET=self.message_tokens * 4
+        ):
+            self.get_conversation(summarize)
+            ChatRepository.append_messages(
+                self.chat.id, [{"role": "user", "content": "ещё"}]
+            )
+            self.chat.refresh_from_db()
+            conversation = self.get_conversation(summarize)
+
+        summarize.assert_awaited_once()
+        self.assertEqual(len(conversation), 4)
+
+    def test_failed_summary_only_trims_the_window(self):
+        summarize = AsyncMock(side_effect=RuntimeError("upstream down"))
+
+        with override_settings(
+            CHAT_HISTORY_TOKEN_BUDGET=self.message_tokens * 4
+        ):
+            conversation = self.get_conversation(summarize)
+
+        self.assertEqual(conversation, self.messages[2:])
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.summary, "")
+        self.assertEqual(self.chat.summarized_until, 0)
@@ -0,0 +1,206 @@
+import threading
+
+from django.contrib.auth.models import User
+from django.db import connection, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from ..models import Chat, ChatMessage
+from ..repositories.ChatRepository import ChatRepository
+
+
+class ChatRepositoryTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser")
+        self.chat = Chat.objects.create(user=self.user)
+
+    def test_appends_continue_the_sequence(self):
+        ChatRepository.append_messages(
+            self.chat.id,
+            [
+                {"role": "user", "content": "Привет"},
+                {"role": "assistant", "content": "Здравствуйте"},
+            ],
+        )
+        ChatRepository.append_messages(
+            self.chat.id, [{"role": "user", "content": "Мне тревожно"}]
+        )
+
+        self.assertEqual(
+            list(
+                ChatMessage.objects.filter(chat=self.chat)
+                .order_by("sequence")
+                .values_list("sequence", "content")
+            ),
+            [(1, "Привет"), (2, "Здравствуйте"), (3, "Мне тревожно")],
+        )
+
+    def test_append_does_not_rewrite_history(self):
+        ChatRepository.append_messages(
+            self.chat.id, [{"role": "user", "content": "Привет"}]
+        )
+
+        with self.assertNumQueries(5):
+            ChatRepository.append_messages(
+                self.chat.id, [{"role": "user", "content": "Ещё"}]
+            )
+
+
+class ConcurrentAppendTest(TransactionTestCase):
+    def test_concurrent_appends_get_distinct_sequences(self):
+        user = User.objects.create_user(username="testuser")
+        chat = Chat.objects.create(user=user)
+        barrier = threading.Barrier(4)
+        errors = []
+
+        def append(index):
+            try:
+                barrier.wait()
+                ChatRepository.append_messages(
+                    chat.id,
+                    [
+                        {"role": "user", "content": f"question {index}"},
+                        {"role": "assistant", "content": f"answer {index}"},
+                    ],
+                )
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=append, args=(index,))
+            for index in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            sorted(
+                ChatMessage.objects.filter(chat=chat).values_list(
+                    "sequence", flat=True
+                )
+            ),
+            list(range(1, 9)),
+        )
+
+
+class ChatMessagesViewTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser")
+        self.chat = Chat.objects.create(user=self.user)
+        ChatRepository.append_messages(
+            self.chat.id,
+            [
+                {"role": "user", "content": f"message {index}"}
+                for index in range(1, 6)
+            ],
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_pages_from_newest_to_oldest(self):
+        url = f"/api/chat/{self.chat.id}/messages/"
+
+        first_page = self.client.get(url, {"page_size": 3})
+        second_page = self.client.get(first_page.data["next"])
+
+        self.assertEqual(first_page.status_code, 200)
+        self.assertEqual(
+            [message["sequence"] for message in first_page.data["results"]],
+            [5, 4, 3],
+        )
+        self.assertEqual(
+            [message["sequence"] for message in second_page.data["results"]],
+            [2, 1],
+        )
+        self.assertIsNone(second_page.data["next"])
+
+    def test_other_users_chat_is_not_found(self):
+        other_user = User.objects.create_user(username="otheruser")
+        self.client.force_authenticate(user=other_user)
+
+        response = self.client.get(f"/api/chat/{self.chat.id}/messages/")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_chat_payload_no_longer_embeds_history(self):
+        response = self.client.get(f"/api/chat/{self.chat.id}/")
+
+        self.assertNotIn("chat_messages", response.data)
+
+
+class CopyChatMessagesMigrationTest(TransactionTestCase):
+    migrate_from = [("thoughts_core", "0007_chat_message")]
+    migrate_to = [("thoughts_core", "0009_remove_chat_chat_messages")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_blob_messages_become_rows(self):
+        old_apps = self.migrate(self.migrate_from)
+        user = old_apps.get_model("auth", "User").objects.create(
+            username="testuser"
+        )
+        chat = old_apps.get_model("thoughts_core", "Chat").objects.create(
+            user_id=user.id,
+            chat_messages=[
+                {"role": "user", "content": "Привет"},
+                {"role": "assistant", "content": {"message": "Здравствуйте"}},
+                "legacy",
+            ],
+        )
+
+        new_apps = self.migrate(self.migrate_to)
+
+        self.assertEqual(
+            list(
+                new_apps.get_model("thoughts_core", "ChatMessage")
+                .objects.filter(chat_id=chat.id)
+                .order_by("sequence")
+                .values_list("sequence", "role", "content")
+            ),
+            [
+                (1, "user", "Привет"),
+                (2, "assistant", '{"message": "Здравствуйте"}'),
+                (3, "user", "legacy"),
+            ],
+        )
+
+    def test_seed_messages_become_user_rows(self):
+        old_apps = self.migrate(self.migrate_from)
+        user = old_apps.get_model("auth", "User").objects.create(
+            username="john_doe"
+        )
+        chat = old_apps.get_model("thoughts_core", "Chat").objects.create(
+            user_id=user.id,
+            chat_messages=[
+                {"text": "Hello", "timestamp": "2023-05-09 09:15:00"},
+                {"text": "", "timestamp": "2023-05-09 09:16:00"},
+                {"timestamp": "2023-05-09 09:17:00"},
+                {"role": "assistant", "content": "  "},
+                {"text": "Are you there?", "timestamp": "2023-05-09 09:18:00"},
+            ],
+        )
+
+        new_apps = self.migrate(self.migrate_to)
+
+        self.assertEqual(
+            list(
+                new_apps.get_model("thoughts_core", "ChatMessage")
+                .objects.filter(chat_id=chat.id)
+                .order_by("sequence")
+                .values_list("sequence", "role", "content")
+            ),
+            [(1, "user", "Hello"), (2, "user", "Are you there?")],
+        )
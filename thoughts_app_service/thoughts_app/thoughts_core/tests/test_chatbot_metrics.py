@@ -0,0 +1,182 @@
+import json
+
+import openai
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from prometheus_client import REGISTRY
+
+from ..models import Meditation
+from ..services.ChatCompletionCacheService import get_chat_completion_cache
+from ..services.OpenAiClientPool import OpenAiClientPool
+from ..views import (
+    MeditationSearchIndexCache,
+    OpenAiClientSingleton,
+    generate_chat_completion,
+)
+from .fake_openai import FakeOpenAIServer
+
+REPLY = json.dumps({"message": "Привет", "suggested_meditations": []})
+MESSAGES = [{"role": "user", "content": "Привет"}]
+
+
+def get_sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class OpenAiCallMetricsTest(SimpleTestCase):
+    def get_pool(self, fake, **kwargs):
+        options = {
+            "max_concurrency": 1,
+            "max_queued": 1,
+            "deadline": 5.0,
+            "max_retries": 0,
+            "retry_backoff": 0.01,
+            **kwargs,
+        }
+        return OpenAiClientPool(
+            api_key="test", base_url=fake.base_url, **options
+        )
+
+    async def test_call_duration_and_tokens(self):
+        labels = {"model": "metrics-success", "outcome": "success"}
+        with FakeOpenAIServer(content=REPLY, delay=0.1) as fake:
+            await self.get_pool(fake).chat.completions.create(
+                model="metrics-success", messages=MESSAGES
+            )
+
+        self.assertEqual(
+            get_sample(
+                "thoughts_openai_request_duration_seconds_count", **labels
+            ),
+            1,
+        )
+        self.assertGreaterEqual(
+            get_sample(
+                "thoughts_openai_request_duration_seconds_sum", **labels
+            ),
+            0.1,
+        )
+        for token_type in ["prompt", "completion"]:
+            with self.subTest(token_type=token_type):
+                self.assertEqual(
+                    get_sample(
+                        "thoughts_openai_tokens_sum",
+                        type=token_type,
+                        **labels,
+                    ),
+                    1,
+                )
+
+    async def test_failed_calls_are_labelled_by_outcome(self):
+        with FakeOpenAIServer(content=REPLY, delay=2) as fake:
+            with self.assertRaises(openai.APITimeoutError):
+                await self.get_pool(
+                    fake, deadline=0.3
+                ).chat.completions.create(
+                    model="metrics-timeout", messages=MESSAGES
+                )
+
+        self.assertEqual(
+            get_sample(
+                "thoughts_openai_request_duration_seconds_count",
+                model="metrics-timeout",
+                outcome="timeout",
+            ),
+            1,
+        )
+
+    async def test_stream_is_timed_until_consumed(self):
+        labels = {"model": "metrics-stream", "outcome": "success"}
+        with FakeOpenAIServer(content=REPLY, chunks=3) as fake:
+            stream = await self.get_pool(fake).chat.completions.create(
+                model="metrics-stream", messages=MESSAGES, stream=True
+            )
+            self.assertEqual(
+                get_sample(
+                    "thoughts_openai_request_duration_seconds_count", **labels
+                ),
+                0,
+            )
+            [chunk async for chunk in stream]
+
+        self.assertEqual(
+            get_sample(
+                "thoughts_openai_request_duration_seconds_count", **labels
+            ),
+            1,
+        )
+
+
+class ChatReplyMetricsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_chat_completion_cache().clear()
+        OpenAiClientSingleton._instance = None
+        MeditationSearchIndexCache.search_index = None
+        for index in range(3):
+            Meditation.objects.create(name=f"Вечерняя практика {index}")
+
+    def tearDown(self):
+        OpenAiClientSingleton._instance = None
+
+    def generate(self, fake, model):
+        with override_settings(
+            OPENAI_API_KEY="test",
+            OPENAI_BASE_URL=fake.base_url,
+            CHAT_COMPLETION_MODEL=model,
+        ):
+            conversation = [
+                {"role": "user", "content": "Не могу уснуть"},
+                {"role": "assistant", "content": REPLY},
+            ]
+            return async_to_sync(generate_chat_completion)(
+                conversation, "Что послушать?", use_cache=False
+            )
+
+    def test_reply_records_prompt_size(self):
+        labels = {"model": "metrics-reply", "outcome": "success"}
+        with FakeOpenAIServer(content=REPLY) as fake:
+            self.generate(fake, "metrics-reply")
+
+        self.assertEqual(
+            get_sample("thoughts_chatbot_replies_total", **labels), 1
+        )
+        self.assertEqual(
+            get_sample("thoughts_chatbot_prompt_meditations_sum", **labels),
+            3,
+        )
+        self.assertEqual(
+            get_sample("thoughts_chatbot_conversation_messages_sum", **labels),
+            3,
+        )
+
+    def test_json_parse_failures_are_counted(self):
+        with FakeOpenAIServer(content="not json") as fake:
+            updated_conversation = self.generate(fake, "metrics-invalid")
+
+        self.assertIsNone(updated_conversation)
+        self.assertEqual(
+            get_sample(
+                "thoughts_chatbot_replies_total",
+                model="metrics-invalid",
+                outcome="invalid_json",
+            ),
+            1,
+        )
+
+    def test_invalid_replies_are_not_counted_as_success(self):
+        invalid_reply = json.dumps({"message": "Нет списка медитаций"})
+        with FakeOpenAIServer(content=invalid_reply) as fake:
+            self.generate(fake, "metrics-invalid-reply")
+
+        for outcome, count in [("success", 0), ("invalid_reply", 1)]:
+            with self.subTest(outcome=outcome):
+                self.assertEqual(
+                    get_sample(
+                        "thoughts_chatbot_replies_total",
+                        model="metrics-invalid-reply",
+                        outcome=outcome,
+                    ),
+                    count,
+                )
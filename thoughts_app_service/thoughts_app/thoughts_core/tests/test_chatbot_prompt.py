@@ -0,0 +1,95 @@
+from unittest.mock import AsyncMock, patch
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from ..models import Meditation, MeditationTheme
+from ..views import (
+    MeditationSearchIndexCache,
+    get_meditation_search_index,
+    get_search_query,
+    get_system_message,
+    warm_meditation_search_index,
+)
+
+
+class MeditationSearchIndexCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        MeditationSearchIndexCache.search_index = None
+        self.meditation = Meditation.objects.create(name="Zen Meditation")
+
+    def get_search_index(self):
+        return async_to_sync(get_meditation_search_index)()
+
+    def test_built_once_per_catalogue_version(self):
+        with patch(
+            "thoughts_core.views.get_all_meditations",
+            new_callable=AsyncMock,
+            return_value=[{"id": self.meditation.id}],
+        ) as mock_get_all_meditations:
+            first = self.get_search_index()
+            second = self.get_search_index()
+
+        self.assertIs(first, second)
+        mock_get_all_meditations.assert_called_once()
+
+    def test_catalogue_writes_rebuild(self):
+        first = self.get_search_index()
+        self.assertEqual(len(first), 1)
+
+        MeditationTheme.objects.create(name="Sleep")
+        Meditation.objects.create(name="Night Meditation")
+
+        second = self.get_search_index()
+        self.assertEqual(len(second), 2)
+
+
+class SystemMessageTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        MeditationSearchIndexCache.search_index = None
+        sleep = MeditationTheme.objects.create(name="Сон")
+        anxiety = MeditationTheme.objects.create(name="Тревога")
+        for index in range(5):
+            Meditation.objects.create(
+                name=f"Вечерняя практика {index}", meditation_theme=sleep
+            )
+        Meditation.objects.create(
+            name="Спокойное дыхание", meditation_theme=anxiety
+        )
+
+    @override_settings(CHATBOT_MEDITATION_CANDIDATES=2)
+    def test_offers_only_matching_meditations(self):
+        system_message = async_to_sync(get_system_message)(
+            "Мне очень тревожно"
+        )
+
+        self.assertIn("Спокойное дыхание", system_message["content"])
+        self.assertEqual(system_message["content"].count('"name"'), 2)
+
+    def test_search_query_keeps_previous_user_messages(self):
+        conversation = [
+            {"role": "user", "content": "Не могу уснуть"},
+            {"role": "assistant", "content": "{}"},
+            {"role": "user", "content": "Уже неделю"},
+        ]
+
+        self.assertEqual(
+            get_search_query(conversation, "Что послушать?"),
+            "Не могу уснуть Уже неделю Что послушать?",
+        )
+
+
+class WarmMeditationSearchIndexTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        MeditationSearchIndexCache.search_index = None
+
+    def test_warm_builds_in_background(self):
+        Meditation.objects.create(name="Zen Meditation")
+
+        warm_meditation_search_index().join(timeout=10)
+
+        self.assertEqual(len(MeditationSearchIndexCache.search_index), 1)
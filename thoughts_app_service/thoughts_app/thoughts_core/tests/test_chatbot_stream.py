@@ -0,0 +1,162 @@
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..models import Chat, ChatMessage
+from ..services.ChatCompletionCacheService import get_chat_completion_cache
+from ..views import MeditationSearchIndexCache, OpenAiClientSingleton
+from .fake_openai import FakeOpenAIServer
+
+REPLY = {
+    "message": "Попробуйте эту медитацию",
+    "suggested_meditations": [{"id": 1, "name": "Meditation 1"}],
+}
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n", 1)
+        events.append(
+            (event.removeprefix("event: "), json.loads(data[len("data: ") :]))
+        )
+    return events
+
+
+class ChatBotStreamTestMixin:
+    url = "/api/chatbot/stream/"
+
+    def setUp(self):
+        cache.clear()
+        get_chat_completion_cache().clear()
+        OpenAiClientSingleton._instance = None
+        MeditationSearchIndexCache.search_index = None
+        self.user = User.objects.create_user(
+            username="testuser", password="password"
+        )
+        self.chat = Chat.objects.create(user=self.user)
+
+    def tearDown(self):
+        OpenAiClientSingleton._instance = None
+
+    def fake_openai(self, **kwargs):
+        fake = FakeOpenAIServer(**kwargs)
+        settings_override = override_settings(
+            OPENAI_API_KEY="test", OPENAI_BASE_URL=fake.base_url
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        return fake
+
+
+class ChatBotStreamWSGITest(ChatBotStreamTestMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def post(self, message="Мне тревожно"):
+        return self.client.post(
+            self.url,
+            {"message": message, "chat_id": self.chat.id},
+            format="json",
+        )
+
+    def read_events(self, response):
+        return parse_events(
+            b"".join(response.streaming_content).decode("utf-8")
+        )
+
+    def test_streams_deltas_then_saves_validated_reply(self):
+        content = json.dumps(REPLY, ensure_ascii=False)
+        with self.fake_openai(content=content, chunks=5) as fake:
+            response = self.post()
+            events = self.read_events(response)
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        deltas = [data["content"] for event, data in events[:-1]]
+        self.assertEqual(len(deltas), 5)
+        self.assertEqual("".join(deltas), content)
+        self.assertEqual(events[-1], ("done", REPLY))
+        self.assertTrue(fake.requests[0]["stream"])
+        self.assertEqual(fake.requests[0]["messages"][0]["role"], "system")
+
+        self.assertEqual(
+            list(
+                ChatMessage.objects.filter(chat=self.chat)
+                .order_by("sequence")
+                .values_list("sequence", "role", "content")
+            ),
+            [
+                (1, "user", "Мне тревожно"),
+                (2, "assistant", content),
+            ],
+        )
+
+    def test_first_event_arrives_before_the_reply_is_complete(self):
+        content = json.dumps(REPLY, ensure_ascii=False)
+        with self.fake_openai(content=content, chunks=4, chunk_delay=0.3):
+            started = time.perf_counter()
+            stream = iter(self.post().streaming_content)
+            next(stream)
+            time_to_first_event = time.perf_counter() - started
+            list(stream)
+            total_time = time.perf_counter() - started
+
+        self.assertLess(time_to_first_event, 0.3)
+        self.assertGreaterEqual(total_time, 0.9)
+
+    def test_invalid_reply_is_reported_and_not_saved(self):
+        with self.fake_openai(content="not json"):
+            events = self.read_events(self.post())
+
+        self.assertEqual(
+            events[-1], ("error", {"detail": "Invalid response from GPT"})
+        )
+        self.assertFalse(ChatMessage.objects.filter(chat=self.chat).exists())
+
+    def test_upstream_error_ends_stream_with_error_event(self):
+        with self.fake_openai(status=400):
+            events = self.read_events(self.post())
+
+        self.assertEqual(
+            events, [("error", {"detail": "Chat completion failed"})]
+        )
+
+    def test_chat_not_found(self):
+        response = self.client.post(
+            self.url,
+            {
+                "message": "Hello",
+                "chat_id": "00000000-0000-0000-0000-000000000000",
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+
+class ChatBotStreamASGITest(ChatBotStreamTestMixin, TestCase):
+    async def test_streams_under_asgi(self):
+        await self.async_client.aforce_login(self.user)
+        content = json.dumps(REPLY, ensure_ascii=False)
+
+        with self.fake_openai(content=content, chunks=3):
+            response = await self.async_client.post(
+                self.url,
+                {"message": "Привет", "chat_id": str(self.chat.id)},
+                content_type="application/json",
+            )
+            body = b"".join(
+                [chunk async for chunk in response.streaming_content]
+            )
+
+        events = parse_events(body.decode("utf-8"))
+        self.assertEqual(events[-1], ("done", REPLY))
+        self.assertEqual(
+            await ChatMessage.objects.filter(chat=self.chat).acount(), 2
+        )
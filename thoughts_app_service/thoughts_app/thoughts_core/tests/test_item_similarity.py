@@ -0,0 +1,146 @@
+import os
+import tempfile
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..models import Meditation, MeditationGrade, MeditationSession
+from ..services.CollaborativeFilteringService import (
+    CollaborativeFilteringService,
+)
+from ..services.RecommendationCacheService import get_recommendation_cache
+from ..services.RecommendationService import RecommendationService
+from ..value_objects.ItemSimilarityModel import ItemSimilarityModel
+
+
+class ItemSimilarityModelTest(SimpleTestCase):
+    def build(self, user_interactions):
+        model = ItemSimilarityModel.empty()
+        model.update_users(user_interactions)
+        return model
+
+    def test_recommends_co_occurring_meditations(self):
+        model = self.build(
+            {
+                1: ([10, 20], [1.0, 1.0]),
+                2: ([10, 20, 30], [1.0, 1.0, 0.2]),
+                3: ([10], [1.0]),
+            }
+        )
+
+        self.assertEqual(model.recommend(user_id=3, amount=2), [20, 30])
+        self.assertEqual(model.recommend(user_id=3, amount=1), [20])
+        self.assertIsNone(model.recommend(user_id=4, amount=2))
+
+    def test_incremental_update_matches_full_build(self):
+        model = self.build({1: ([10, 20], [1.0, 0.6]), 2: ([20], [0.8])})
+        model.update_users({2: ([20, 30], [0.8, 1.0]), 3: ([30], [0.4])})
+
+        full = self.build(
+            {
+                1: ([10, 20], [1.0, 0.6]),
+                2: ([20, 30], [0.8, 1.0]),
+                3: ([30], [0.4]),
+            }
+        )
+        np.testing.assert_allclose(
+            model.cooccurrence.toarray(), full.cooccurrence.toarray()
+        )
+        self.assertEqual(
+            model.recommend(user_id=3, amount=5),
+            full.recommend(user_id=3, amount=5),
+        )
+
+    def test_save_and_load_round_trip(self):
+        model = self.build({1: ([10, 20], [1.0, 1.0]), 2: ([10], [1.0])})
+        model.last_grade_id = 7
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.npz")
+            model.save(path)
+            loaded = ItemSimilarityModel.load(path)
+
+        self.assertEqual(loaded.last_grade_id, 7)
+        self.assertEqual(loaded.recommend(user_id=2, amount=1), [20])
+
+
+class ItemCfStrategyTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_recommendation_cache().clear()
+        CollaborativeFilteringService._model_mtime = None
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(
+            ITEM_CF_MODEL_PATH=os.path.join(self.directory.name, "cf.npz")
+        )
+        self.settings_override.enable()
+
+        self.users = [
+            User.objects.create_user(username=f"user{i}", password="x")
+            for i in range(3)
+        ]
+        self.meditations = [
+            Meditation.objects.create(name=f"Meditation {i}") for i in range(3)
+        ]
+        for user in self.users[:2]:
+            for meditation in self.meditations[:2]:
+                MeditationGrade.objects.create(
+                    user=user, meditation=meditation, grade=5
+                )
+        MeditationSession.objects.create(
+            user=self.users[2], meditation=self.meditations[0]
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.directory.cleanup()
+
+    def test_recommends_meditations_liked_by_similar_users(self):
+        CollaborativeFilteringService.build_model()
+
+        recommended = RecommendationService.recommend_meditations_for_user(
+            user=self.users[2], strategy="item_cf"
+        )
+
+        self.assertEqual(recommended, [self.meditations[1]])
+
+    def test_incremental_build_picks_up_new_interactions(self):
+        CollaborativeFilteringService.build_model()
+        MeditationGrade.objects.create(
+            user=self.users[0], meditation=self.meditations[2], grade=5
+        )
+
+        model = CollaborativeFilteringService.build_model()
+
+        self.assertIn(self.meditations[2].id, model.meditation_ids)
+        self.assertEqual(
+            model.recommend(user_id=self.users[2].id, amount=5)[0],
+            self.meditations[1].id,
+        )
+
+    def test_falls_back_to_theme_strategy_without_model(self):
+        recommended = RecommendationService.recommend_meditations_for_user(
+            user=self.users[2], strategy="item_cf"
+        )
+
+        self.assertCountEqual(recommended, self.meditations)
+
+    def test_view_selects_strategy_per_request(self):
+        CollaborativeFilteringService.build_model()
+        client = APIClient()
+        client.force_authenticate(user=self.users[2])
+
+        response = client.get(
+            "/api/meditation/recommend_meditations/", {"strategy": "item_cf"}
+        )
+        self.assertEqual(
+            [meditation["id"] for meditation in response.data],
+            [self.meditations[1].id],
+        )
+
+        response = client.get(
+            "/api/meditation/recommend_meditations/", {"strategy": "unknown"}
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,206 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..models import (
+    Meditation,
+    MeditationGrade,
+    MeditationPopularityBucket,
+    MeditationTheme,
+    RecommendationSnapshot,
+    UserThemeAffinity,
+)
+
+
+class MeditationGradeUpsertTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser")
+        self.theme = MeditationTheme.objects.create(name="Сон")
+        self.meditations = [
+            Meditation.objects.create(
+                name=f"Вечерняя практика {i}", meditation_theme=self.theme
+            )
+            for i in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def get_affinity(self):
+        return UserThemeAffinity.objects.get(
+            user=self.user, meditation_theme=self.theme
+        )
+
+    def get_popularity(self, meditation):
+        return MeditationPopularityBucket.objects.get(
+            meditation=meditation, day=timezone.localdate()
+        )
+
+    def post_bulk(self, grades):
+        return self.client.post(
+            "/api/meditation_grade/bulk/", {"grades": grades}, format="json"
+        )
+
+    def test_grading_again_overwrites(self):
+        for grade in (2, 5):
+            response = self.client.post(
+                "/api/meditation_grade/",
+                {
+                    "user": self.user.id,
+                    "meditation": self.meditations[0].id,
+                    "grade": grade,
+                },
+                format="json",
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        grade = MeditationGrade.objects.get()
+        self.assertEqual(grade.grade, 5)
+        self.assertEqual(response.data["id"], grade.id)
+        affinity = self.get_affinity()
+        self.assertEqual((affinity.grade_sum, affinity.grade_count), (5, 1))
+        popularity = self.get_popularity(self.meditations[0])
+        self.assertEqual(
+            (popularity.grade_sum, popularity.grade_count), (5, 1)
+        )
+
+    def test_cannot_grade_for_another_user(self):
+        other_user = User.objects.create_user(username="otheruser")
+        grade = MeditationGrade.objects.create(
+            user=other_user, meditation=self.meditations[0], grade=5
+        )
+
+        response = self.client.post(
+            "/api/meditation_grade/",
+            {
+                "user": other_user.id,
+                "meditation": self.meditations[0].id,
+                "grade": 1,
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["user"], self.user.id)
+        grade.refresh_from_db()
+        self.assertEqual(grade.grade, 5)
+        self.assertEqual(MeditationGrade.objects.get(user=self.user).grade, 1)
+
+    def test_bulk_inserts_and_overwrites(self):
+        MeditationGrade.objects.create(
+            user=self.user, meditation=self.meditations[0], grade=1
+        )
+        RecommendationSnapshot.objects.create(
+            user=self.user,
+            meditation_ids=[],
+            catalogue_version=1,
+            computed_at=timezone.now(),
+        )
+
+        response = self.post_bulk(
+            [
+                {"meditation": self.meditations[0].id, "grade": 4},
+                {"meditation": self.meditations[1].id, "grade": 3},
+                {"meditation": self.meditations[1].id, "grade": 5},
+            ]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCountEqual(
+            [(grade["meditation"], grade["grade"]) for grade in response.data],
+            [(self.meditations[0].id, 4), (self.meditations[1].id, 5)],
+        )
+        self.assertCountEqual(
+            MeditationGrade.objects.values_list("meditation_id", "grade"),
+            [(self.meditations[0].id, 4), (self.meditations[1].id, 5)],
+        )
+        affinity = self.get_affinity()
+        self.assertEqual((affinity.grade_sum, affinity.grade_count), (9, 2))
+        self.assertFalse(RecommendationSnapshot.objects.exists())
+
+    def test_bulk_rejects_unknown_meditations(self):
+        response = self.post_bulk(
+            [
+                {"meditation": self.meditations[0].id, "grade": 4},
+                {"meditation": 999999, "grade": 3},
+            ]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("999999", str(response.data["grades"]))
+        self.assertFalse(MeditationGrade.objects.exists())
+
+    def test_bulk_rejects_empty_requests(self):
+        response = self.post_bulk([])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_update_cannot_duplicate_a_grade(self):
+        MeditationGrade.objects.create(
+            user=self.user, meditation=self.meditations[0], grade=1
+        )
+        grade = MeditationGrade.objects.create(
+            user=self.user, meditation=self.meditations[1], grade=2
+        )
+
+        response = self.client.patch(
+            f"/api/meditation_grade/{grade.id}/",
+            {"meditation": self.meditations[0].id},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RemoveDuplicateGradesMigrationTest(TransactionTestCase):
+    migrate_from = [("thoughts_core", "0012_session_and_grade_indexes")]
+    migrate_to = [("thoughts_core", "0013_unique_meditation_grade")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_keeps_latest_grade_and_recounts_affinity(self):
+        apps = self.migrate(self.migrate_from)
+        MeditationGrade = apps.get_model("thoughts_core", "MeditationGrade")
+        UserThemeAffinity = apps.get_model(
+            "thoughts_core", "UserThemeAffinity"
+        )
+        user = apps.get_model("auth", "User").objects.create(username="a")
+        theme = apps.get_model("thoughts_core", "MeditationTheme").objects
+        theme = theme.create(name="Сон")
+        meditations = [
+            apps.get_model("thoughts_core", "Meditation").objects.create(
+                name=f"Вечерняя практика {i}", meditation_theme=theme
+            )
+            for i in range(2)
+        ]
+        for meditation, grade in [
+            (meditations[0], 1),
+            (meditations[0], 2),
+            (meditations[0], 4),
+            (meditations[1], 3),
+        ]:
+            MeditationGrade.objects.create(
+                user=user, meditation=meditation, grade=grade
+            )
+        UserThemeAffinity.objects.create(
+            user=user, meditation_theme=theme, grade_sum=10, grade_count=4
+        )
+
+        self.migrate(self.migrate_to)
+
+        self.assertCountEqual(
+            MeditationGrade.objects.values_list("meditation_id", "grade"),
+            [(meditations[0].id, 4), (meditations[1].id, 3)],
+        )
+        affinity = UserThemeAffinity.objects.get(user_id=user.id)
+        self.assertEqual((affinity.grade_sum, affinity.grade_count), (7, 2))
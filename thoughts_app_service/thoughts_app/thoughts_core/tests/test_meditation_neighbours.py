@@ -0,0 +1,132 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..models import (
+    Meditation,
+    MeditationGrade,
+    MeditationNarrator,
+    MeditationNeighbour,
+    MeditationSession,
+    MeditationTheme,
+)
+
+
+class MeditationNeighbourTest(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                username=f"testuser{i}", password="testpassword123"
+            )
+            for i in range(3)
+        ]
+        self.sleep = MeditationTheme.objects.create(name="Sleep")
+        self.focus = MeditationTheme.objects.create(name="Focus")
+        self.narrator = MeditationNarrator.objects.create(name="Anna")
+        self.evening, self.night, self.nap = [
+            Meditation.objects.create(name=name, meditation_theme=self.sleep)
+            for name in ("Evening", "Night", "Nap")
+        ]
+        self.morning = Meditation.objects.create(
+            name="Morning",
+            meditation_theme=self.focus,
+            meditation_narrator=self.narrator,
+        )
+        self.work = Meditation.objects.create(
+            name="Work",
+            meditation_theme=self.focus,
+            meditation_narrator=self.narrator,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.users[0])
+
+    def listen(self, user, *meditations):
+        for meditation in meditations:
+            MeditationSession.objects.create(user=user, meditation=meditation)
+
+    def build(self, **options):
+        call_command(
+            "build_meditation_neighbours", stdout=StringIO(), **options
+        )
+
+    def get_neighbours(self, meditation):
+        return list(
+            MeditationNeighbour.objects.filter(meditation=meditation)
+            .order_by("rank")
+            .values_list("neighbour", flat=True)
+        )
+
+    def test_co_listened_meditations_rank_first(self):
+        self.listen(self.users[0], self.evening, self.morning)
+        self.listen(self.users[1], self.evening, self.morning)
+        self.listen(self.users[2], self.night)
+
+        self.build()
+
+        # Listened together beats sharing the theme, the theme beats nothing
+        self.assertEqual(
+            self.get_neighbours(self.evening),
+            [self.morning.id, self.night.id, self.nap.id],
+        )
+        self.assertNotIn(self.evening.id, self.get_neighbours(self.evening))
+
+    def test_grade_correlation_separates_meditations(self):
+        for user in self.users[:2]:
+            MeditationGrade.objects.create(
+                user=user, meditation=self.evening, grade=5
+            )
+            MeditationGrade.objects.create(
+                user=user, meditation=self.night, grade=1
+            )
+            MeditationGrade.objects.create(
+                user=user, meditation=self.nap, grade=5
+            )
+
+        self.build()
+
+        self.assertEqual(self.get_neighbours(self.evening), [self.nap.id])
+
+    def test_theme_and_narrator_overlap_without_activity(self):
+        self.build(top_k=1)
+
+        self.assertEqual(self.get_neighbours(self.morning), [self.work.id])
+        self.assertEqual(
+            MeditationNeighbour.objects.filter(
+                meditation=self.evening
+            ).count(),
+            1,
+        )
+
+    def test_similar_endpoint_is_a_single_query(self):
+        self.listen(self.users[1], self.morning, self.nap)
+        self.build()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                f"/api/meditation/{self.morning.id}/similar/", {"limit": 2}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [meditation["name"] for meditation in response.data],
+            ["Nap", "Work"],
+        )
+        # Authentication does not hit the database with force_authenticate
+        self.assertEqual(len(queries), 1)
+
+    def test_similar_endpoint_for_unknown_meditation(self):
+        response = self.client.get("/api/meditation/999999/similar/")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_similar_endpoint_rejects_bad_limit(self):
+        response = self.client.get(
+            f"/api/meditation/{self.morning.id}/similar/", {"limit": "many"}
+        )
+
+        self.assertEqual(response.status_code, 400)
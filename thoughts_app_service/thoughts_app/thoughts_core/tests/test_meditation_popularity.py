@@ -0,0 +1,163 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..models import (
+    Meditation,
+    MeditationGrade,
+    MeditationPopularityBucket,
+    MeditationSession,
+    MeditationTheme,
+)
+from ..services.MeditationPopularityService import (
+    MeditationPopularityService,
+)
+from ..services.MeditationService import MeditationService
+from ..services.RecommendationService import RecommendationService
+
+
+class MeditationPopularityTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        MeditationService._meditation_id_index = None
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword123"
+        )
+        self.relaxation = MeditationTheme.objects.create(name="Relaxation")
+        self.focus = MeditationTheme.objects.create(name="Focus")
+        self.relaxation_meditations = [
+            Meditation.objects.create(
+                name=f"Relaxation {i}", meditation_theme=self.relaxation
+            )
+            for i in range(3)
+        ]
+        self.focus_meditations = [
+            Meditation.objects.create(
+                name=f"Focus {i}", meditation_theme=self.focus
+            )
+            for i in range(3)
+        ]
+
+    def get_bucket(self, meditation):
+        return MeditationPopularityBucket.objects.get(
+            meditation=meditation, day=timezone.localdate()
+        )
+
+    def listen(self, meditation, times=1):
+        for _ in range(times):
+            MeditationSession.objects.create(
+                user=self.user, meditation=meditation
+            )
+
+    def test_session_and_grade_writes_update_todays_bucket(self):
+        meditation = self.relaxation_meditations[0]
+        self.listen(meditation, times=2)
+        grade = MeditationGrade.objects.create(
+            user=self.user, meditation=meditation, grade=4
+        )
+
+        bucket = self.get_bucket(meditation)
+        self.assertEqual(bucket.session_count, 2)
+        self.assertEqual((bucket.grade_sum, bucket.grade_count), (4, 1))
+
+        grade.grade = 2
+        grade.save()
+        bucket.refresh_from_db()
+        self.assertEqual((bucket.grade_sum, bucket.grade_count), (2, 1))
+
+        grade.delete()
+        MeditationSession.objects.filter(
+            meditation=meditation
+        ).first().delete()
+        bucket.refresh_from_db()
+        self.assertEqual(bucket.session_count, 1)
+        self.assertEqual((bucket.grade_sum, bucket.grade_count), (0, 0))
+
+    def test_popular_ids_are_interleaved_across_themes(self):
+        self.listen(self.relaxation_meditations[1], times=5)
+        self.listen(self.relaxation_meditations[0], times=3)
+        self.listen(self.focus_meditations[2], times=4)
+
+        self.assertEqual(
+            MeditationPopularityService.get_popular_meditation_ids(),
+            [
+                (self.relaxation.id, self.relaxation_meditations[1].id),
+                (self.focus.id, self.focus_meditations[2].id),
+                (self.relaxation.id, self.relaxation_meditations[0].id),
+            ],
+        )
+
+    def test_old_buckets_fall_out_of_the_window(self):
+        MeditationPopularityBucket.objects.create(
+            meditation=self.focus_meditations[0],
+            day=timezone.localdate() - timedelta(days=60),
+            session_count=100,
+        )
+        self.listen(self.relaxation_meditations[0])
+
+        self.assertEqual(
+            MeditationPopularityService.get_popular_meditation_ids(),
+            [(self.relaxation.id, self.relaxation_meditations[0].id)],
+        )
+
+    def test_popular_meditations_are_topped_up_with_random_ones(self):
+        self.listen(self.focus_meditations[0], times=2)
+
+        meditations = MeditationPopularityService.get_popular_meditations(
+            amount=4
+        )
+
+        self.assertEqual(len(meditations), 4)
+        self.assertEqual(meditations[0], self.focus_meditations[0])
+        self.assertEqual(len(set(meditations)), 4)
+
+    def test_cold_start_recommendations_come_from_cached_lists(self):
+        self.listen(self.focus_meditations[1], times=3)
+        RecommendationService.recommend_meditations_for_user(user=self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            recommended = RecommendationService.recommend_meditations_for_user(
+                user=self.user
+            )
+
+        self.assertEqual(recommended[0], self.focus_meditations[1])
+        # Session threshold check and fetching the meditations by id
+        self.assertEqual(len(queries), 2)
+
+    @override_settings(MEDITATION_POPULARITY_WINDOW_DAYS=7)
+    def test_refresh_rebuilds_window_and_prunes_old_buckets(self):
+        self.listen(self.relaxation_meditations[2], times=2)
+        MeditationGrade.objects.create(
+            user=self.user, meditation=self.focus_meditations[0], grade=5
+        )
+        MeditationPopularityBucket.objects.filter(
+            meditation=self.relaxation_meditations[2]
+        ).update(session_count=0)
+        MeditationPopularityBucket.objects.create(
+            meditation=self.focus_meditations[1],
+            day=timezone.localdate() - timedelta(days=30),
+            session_count=9,
+        )
+
+        call_command(
+            "refresh_meditation_popularity", rebuild=True, stdout=StringIO()
+        )
+
+        self.assertEqual(
+            self.get_bucket(self.relaxation_meditations[2]).session_count, 2
+        )
+        self.assertEqual(
+            self.get_bucket(self.focus_meditations[0]).grade_sum, 5
+        )
+        self.assertFalse(
+            MeditationPopularityBucket.objects.filter(
+                meditation=self.focus_meditations[1]
+            ).exists()
+        )
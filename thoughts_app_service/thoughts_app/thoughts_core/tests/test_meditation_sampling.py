@@ -0,0 +1,52 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..models import Meditation, MeditationTheme
+from ..services.CatalogueService import CatalogueService
+from ..services.MeditationService import MeditationService
+
+
+class RandomMeditationSamplingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        MeditationService._meditation_id_index = None
+        self.theme = MeditationTheme.objects.create(
+            name="Relaxation", cover_file_url="http://example.com/r.jpg"
+        )
+        self.meditations = [
+            Meditation.objects.create(
+                name=f"Meditation {i}", meditation_theme=self.theme
+            )
+            for i in range(20)
+        ]
+
+    def test_samples_exact_amount_of_distinct_meditations(self):
+        meditations = MeditationService.get_random_meditations(amount=5)
+
+        self.assertEqual(len(meditations), 5)
+        self.assertEqual(len({meditation.id for meditation in meditations}), 5)
+
+    def test_returns_whole_catalogue_when_amount_exceeds_it(self):
+        meditations = MeditationService.get_random_meditations(amount=50)
+
+        self.assertCountEqual(meditations, self.meditations)
+
+    def test_warm_index_fetches_by_primary_key_only(self):
+        MeditationService.get_random_meditations(amount=5)
+
+        with self.assertNumQueries(1):
+            MeditationService.get_random_meditations(amount=5)
+
+    def test_index_refreshes_after_catalogue_change(self):
+        version = CatalogueService.get_version()
+        MeditationService.get_random_meditations(amount=5)
+
+        for meditation in self.meditations:
+            meditation.delete()
+        new_meditation = Meditation.objects.create(name="New meditation")
+
+        self.assertGreater(CatalogueService.get_version(), version)
+        self.assertEqual(
+            MeditationService.get_random_meditations(amount=5),
+            [new_meditation],
+        )
@@ -0,0 +1,76 @@
+from django.test import SimpleTestCase
+
+from ..value_objects.MeditationSearchIndex import (
+    MeditationSearchIndex,
+    get_terms,
+)
+
+
+class MeditationSearchIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.meditations = [
+            {
+                "id": 1,
+                "name": "Утреннее пробуждение",
+                "meditation_theme": 1,
+                "meditation_narrator": 1,
+            },
+            {
+                "id": 2,
+                "name": "Глубокий сон",
+                "meditation_theme": 2,
+                "meditation_narrator": 2,
+            },
+            {
+                "id": 3,
+                "name": "Спокойное дыхание",
+                "meditation_theme": 3,
+                "meditation_narrator": 1,
+            },
+            {
+                "id": 4,
+                "name": "Перед сном",
+                "meditation_theme": 2,
+                "meditation_narrator": 1,
+            },
+        ]
+        self.search_index = MeditationSearchIndex(
+            meditations=self.meditations,
+            theme_names={1: "Энергия", 2: "Сон", 3: "Тревога"},
+            narrator_names={1: "Анна", 2: "Ёлка Иванова"},
+            catalogue_version=1,
+        )
+
+    def search(self, query, amount=2):
+        return [
+            meditation["id"]
+            for meditation in self.search_index.search(query, amount)
+        ]
+
+    def test_terms_include_words_and_trigrams(self):
+        terms = get_terms("Сон сон")
+
+        self.assertEqual(terms["w:сон"], 2)
+        self.assertEqual(terms["сон"], 2)
+        self.assertEqual(terms[" со"], 2)
+        self.assertEqual(terms["он "], 2)
+
+    def test_matches_theme_by_inflected_form(self):
+        self.assertEqual(self.search("Мне тревожно", amount=1), [3])
+
+    def test_matches_name_and_theme(self):
+        self.assertEqual(
+            self.search("Хочу крепко уснуть, помогите со сном"), [4, 2]
+        )
+
+    def test_matches_narrator(self):
+        self.assertEqual(self.search("Медитации, которые читает Елка", 1), [2])
+
+    def test_unmatched_slots_are_topped_up_in_catalogue_order(self):
+        self.assertEqual(self.search("тревога", amount=3), [3, 1, 2])
+        self.assertEqual(self.search("qwerty", amount=2), [1, 2])
+
+    def test_small_catalogue_is_returned_whole(self):
+        self.assertEqual(
+            self.search_index.search("тревога", 10), self.meditations
+        )
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, patch
+
+import openai
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+from ..models import Chat
+from ..services.OpenAiClientPool import (
+    OpenAiClientPool,
+    OpenAiOverloadedError,
+)
+from ..views import CHATBOT_BUSY_MESSAGE, OpenAiClientSingleton
+from .fake_openai import FakeOpenAIServer
+
+REPLY = json.dumps({"message": "Привет", "suggested_meditations": []})
+MESSAGES = [{"role": "user", "content": "Привет"}]
+
+
+class OpenAiClientPoolTest(SimpleTestCase):
+    def get_pool(self, fake, **kwargs):
+        options = {
+            "max_concurrency": 2,
+            "max_queued": 2,
+            "deadline": 5.0,
+            "max_retries": 2,
+            "retry_backoff": 0.01,
+            **kwargs,
+        }
+        return OpenAiClientPool(
+            api_key="test", base_url=fake.base_url, **options
+        )
+
+    async def create(self, pool, **kwargs):
+        response = await pool.chat.completions.create(
+            model="gpt-3.5-turbo", messages=MESSAGES, **kwargs
+        )
+        return response.choices[0].message.content
+
+    async def test_retries_rate_limits_and_server_errors(self):
+        with FakeOpenAIServer(content=REPLY, statuses=[429, 503]) as fake:
+            content = await self.create(self.get_pool(fake))
+
+        self.assertEqual(content, REPLY)
+        self.assertEqual(len(fake.requests), 3)
+
+    async def test_gives_up_after_max_retries(self):
+        with FakeOpenAIServer(status=500) as fake:
+            with self.assertRaises(openai.InternalServerError):
+                await self.create(self.get_pool(fake, max_retries=1))
+
+        self.assertEqual(len(fake.requests), 2)
+
+    async def test_client_errors_are_not_retried(self):
+        with FakeOpenAIServer(status=400) as fake:
+            with self.assertRaises(openai.BadRequestError):
+                await self.create(self.get_pool(fake))
+
+        self.assertEqual(len(fake.requests), 1)
+
+    async def test_limits_concurrent_calls(self):
+        with FakeOpenAIServer(content=REPLY, delay=0.3) as fake:
+            pool = self.get_pool(fake)
+            started = time.perf_counter()
+            calls = [asyncio.create_task(self.create(pool)) for _ in range(4)]
+            await asyncio.sleep(0.1)
+            queue_depth = REGISTRY.get_sample_value(
+                "thoughts_openai_queue_depth"
+            )
+            contents = await asyncio.gather(*calls)
+            elapsed = time.perf_counter() - started
+
+        self.assertEqual(contents, [REPLY] * 4)
+        self.assertEqual(queue_depth, 2)
+        self.assertGreaterEqual(elapsed, 0.6)
+        self.assertEqual(pool.limiter.active, 0)
+
+    async def test_full_queue_fails_fast(self):
+        with FakeOpenAIServer(content=REPLY, delay=0.3) as fake:
+            pool = self.get_pool(fake, max_concurrency=1, max_queued=1)
+            calls = [asyncio.create_task(self.create(pool)) for _ in range(2)]
+            await asyncio.sleep(0.1)
+
+            self.assertTrue(pool.is_saturated())
+            started = time.perf_counter()
+            with self.assertRaises(OpenAiOverloadedError):
+                await self.create(pool)
+            self.assertLess(time.perf_counter() - started, 0.1)
+            await asyncio.gather(*calls)
+
+        self.assertEqual(len(fake.requests), 2)
+
+    async def test_deadline_covers_the_call(self):
+        with FakeOpenAIServer(content=REPLY, delay=2) as fake:
+            pool = self.get_pool(fake, deadline=0.3)
+            started = time.perf_counter()
+            with self.assertRaises(openai.APITimeoutError):
+                await self.create(pool)
+
+        self.assertLess(time.perf_counter() - started, 1.5)
+        self.assertEqual(pool.limiter.active, 0)
+
+    async def test_deadline_covers_waiting_for_a_slot(self):
+        with FakeOpenAIServer(content=REPLY, chunks=3) as fake:
+            pool = self.get_pool(fake, max_concurrency=1, deadline=0.2)
+            # An unconsumed stream keeps the only slot taken
+            stream = await pool.chat.completions.create(
+                model="gpt-3.5-turbo", messages=MESSAGES, stream=True
+            )
+            with self.assertRaises(OpenAiOverloadedError):
+                await self.create(pool)
+            [chunk async for chunk in stream]
+
+        self.assertEqual(len(fake.requests), 1)
+        self.assertEqual(pool.limiter.active, 0)
+        self.assertEqual(len(pool.limiter.waiting), 0)
+
+    async def test_stream_holds_its_slot_until_consumed(self):
+        with FakeOpenAIServer(content=REPLY, chunks=3) as fake:
+            pool = self.get_pool(fake, max_concurrency=1)
+            stream = await pool.chat.completions.create(
+                model="gpt-3.5-turbo", messages=MESSAGES, stream=True
+            )
+            self.assertEqual(pool.limiter.active, 1)
+            content = "".join(
+                [chunk.choices[0].delta.content async for chunk in stream]
+            )
+
+        self.assertEqual(content, REPLY)
+        self.assertEqual(pool.limiter.active, 0)
+
+
+class OpenAiClientPoolEventLoopTest(SimpleTestCase):
+    def test_each_event_loop_gets_its_own_connections(self):
+        with FakeOpenAIServer(content=REPLY) as fake:
+            pool = OpenAiClientPool(
+                api_key="test",
+                base_url=fake.base_url,
+                max_concurrency=1,
+                max_queued=1,
+                deadline=5.0,
+                max_retries=2,
+                retry_backoff=0.01,
+            )
+
+            async def create():
+                return await pool.chat.completions.create(
+                    model="gpt-3.5-turbo", messages=MESSAGES
+                )
+
+            # Each call runs in a new event loop, as requests do under WSGI
+            async_to_sync(create)()
+            async_to_sync(create)()
+
+        self.assertEqual(len(fake.requests), 2)
+
+
+class ChatBotBusyTest(TestCase):
+    def setUp(self):
+        OpenAiClientSingleton._instance = None
+        self.user = User.objects.create_user(username="testuser")
+        self.chat = Chat.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def tearDown(self):
+        OpenAiClientSingleton._instance = None
+
+    @patch(
+        "thoughts_core.views.generate_chat_completion",
+        new_callable=AsyncMock,
+        side_effect=OpenAiOverloadedError("OpenAI request queue is full"),
+    )
+    def test_overload_returns_503(self, mock_generate_chat_completion):
+        response = self.client.post(
+            "/api/chatbot/",
+            {"message": "Привет", "chat_id": self.chat.id},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.data, CHATBOT_BUSY_MESSAGE)
+        self.assertIn("Retry-After", response)
+
+    def test_stream_is_refused_before_it_starts(self):
+        with patch.object(OpenAiClientPool, "is_saturated", return_value=True):
+            response = self.client.post(
+                "/api/chatbot/stream/",
+                {"message": "Привет", "chat_id": self.chat.id},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 503)
@@ -0,0 +1,76 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from ..models import ProgressLevel
+from ..services.ProgressLevelService import ProgressLevelService
+from ..services.UserService import UserService
+from ..value_objects.ProgressLevelLadder import ProgressLevelLadder
+
+
+class ProgressLevelLadderTest(TestCase):
+    def test_bisects_to_the_next_level(self):
+        ladder = ProgressLevelLadder(
+            [
+                ProgressLevel(level=level, name=str(level))
+                for level in (10, 2, 5)
+            ]
+        )
+
+        self.assertEqual(list(ladder.levels), [2, 5, 10])
+        for sessions_count, level in [
+            (0, 2),
+            (1, 2),
+            (2, 5),
+            (4, 5),
+            (5, 10),
+            (9, 10),
+            (10, 10),
+            (100, 10),
+        ]:
+            with self.subTest(sessions_count=sessions_count):
+                self.assertEqual(ladder.get_level(sessions_count).level, level)
+
+    def test_empty_ladder_has_no_level(self):
+        self.assertIsNone(ProgressLevelLadder([]).get_level(3))
+
+
+class ProgressLevelServiceTest(TestCase):
+    def setUp(self):
+        ProgressLevelService.clear()
+        self.user = User.objects.create_user(username="testuser")
+        ProgressLevel.objects.create(level=2, name="Новичок")
+        ProgressLevel.objects.create(level=5, name="Практик")
+
+    def test_ladder_is_loaded_once(self):
+        with self.assertNumQueries(1):
+            ProgressLevelService.get_ladder()
+        with self.assertNumQueries(0):
+            ladder = ProgressLevelService.get_ladder()
+
+        self.assertEqual(list(ladder.levels), [2, 5])
+
+    def test_level_changes_invalidate_the_ladder(self):
+        self.assertEqual(UserService.get_level(self.user).name, "Новичок")
+
+        level = ProgressLevel.objects.get(level=2)
+        level.name = "Ученик"
+        level.save()
+        self.assertEqual(UserService.get_level(self.user).name, "Ученик")
+
+        level.delete()
+        self.assertEqual(UserService.get_level(self.user).name, "Практик")
+
+    @override_settings(PROGRESS_LEVEL_LADDER_MAX_AGE=60)
+    def test_ladder_is_reloaded_once_stale(self):
+        with patch("time.monotonic", return_value=1000.0):
+            ladder = ProgressLevelService.get_ladder()
+        # Written by another worker, so no signal reaches this one
+        ProgressLevel.objects.filter(level=2).update(name="Ученик")
+
+        with patch("time.monotonic", return_value=1059.0):
+            self.assertIs(ProgressLevelService.get_ladder(), ladder)
+        with patch("time.monotonic", return_value=1060.0):
+            ladder = ProgressLevelService.get_ladder()
+        self.assertEqual(ladder.get_level(0).name, "Ученик")
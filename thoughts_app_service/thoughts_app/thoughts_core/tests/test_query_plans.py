@@ -0,0 +1,92 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from ..benchmarks.workload import SyntheticWorkload
+from ..models import MeditationGrade, MeditationSession
+from ..repositories.MeditationRepository import MeditationRepository
+from ..views import MeditationGradeViewSet, MeditationSessionViewSet
+
+USERS = 200
+SESSIONS_PER_USER = 50
+GRADES_PER_USER = 20
+PLANNED_TABLES = [
+    MeditationSession._meta.db_table,
+    MeditationGrade._meta.db_table,
+]
+
+
+class QueryPlanTest(TestCase):
+    """Hot session and grade queries must not scan the whole table.
+
+    The planner prefers sequential scans on small tables, so the tables are
+    seeded and analyzed first.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        workload = SyntheticWorkload(themes=10, meditations=200, seed=1)
+        cls.meditations = workload.seed_catalogue()
+        cls.users = workload.seed_users(USERS, "query_plan")
+        workload.seed_activity(
+            cls.users, sessions=SESSIONS_PER_USER, grades=GRADES_PER_USER
+        )
+        with connection.cursor() as cursor:
+            for table in PLANNED_TABLES:
+                cursor.execute(f'ANALYZE "{table}"')
+        cls.user = cls.users[USERS // 2]
+        cls.meditation = cls.meditations[0]
+
+    def assertNoSeqScan(self, queryset):
+        plan = queryset.explain()
+        for table in PLANNED_TABLES:
+            self.assertNotIn(f"Seq Scan on {table}", plan)
+
+    def get_view_queryset(self, view_class):
+        request = SimpleNamespace(user=self.user)
+        return view_class(request=request).get_queryset()
+
+    def test_sessions_of_user(self):
+        self.assertNoSeqScan(self.get_view_queryset(MeditationSessionViewSet))
+        self.assertNoSeqScan(
+            MeditationRepository.get_meditation_sessions_of_user(self.user)
+        )
+
+    def test_recent_sessions_of_user(self):
+        self.assertNoSeqScan(
+            MeditationSession.objects.filter(
+                user=self.user,
+                session_start_time__gte=timezone.now() - timedelta(days=7),
+            ).order_by("-session_start_time")
+        )
+
+    def test_sessions_of_user_and_meditation(self):
+        self.assertNoSeqScan(
+            MeditationSession.objects.filter(
+                user=self.user, meditation=self.meditation
+            )
+        )
+
+    def test_grades_of_user(self):
+        self.assertNoSeqScan(self.get_view_queryset(MeditationGradeViewSet))
+        self.assertNoSeqScan(
+            MeditationRepository.get_meditation_grades_of_user(self.user)
+        )
+
+    def test_grade_of_user_and_meditation(self):
+        self.assertNoSeqScan(
+            MeditationGrade.objects.filter(
+                user=self.user, meditation=self.meditation
+            )
+        )
+
+    def test_grades_of_some_users(self):
+        self.assertNoSeqScan(
+            MeditationGrade.objects.filter(
+                user_id__in=[user.id for user in self.users[:3]],
+                meditation__meditation_theme__isnull=False,
+            )
+        )
@@ -0,0 +1,106 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+from ..models import Meditation, MeditationGrade, MeditationSession
+from ..services.RecommendationCacheService import (
+    RecommendationCacheService,
+    get_recommendation_cache,
+)
+
+
+def get_cache_requests(result):
+    return (
+        REGISTRY.get_sample_value(
+            "thoughts_recommendation_cache_requests_total",
+            {"result": result},
+        )
+        or 0
+    )
+
+
+@patch(
+    "thoughts_core.services.RecommendationService.RecommendationService.recommend_meditations_for_user"
+)
+class RecommendationCacheServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_recommendation_cache().clear()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword123"
+        )
+        self.meditation = Meditation.objects.create(name="Zen Meditation")
+
+    def test_second_lookup_is_a_hit(self, mock_recommend):
+        mock_recommend.return_value = [self.meditation]
+        hits, misses = get_cache_requests("hit"), get_cache_requests("miss")
+
+        first = RecommendationCacheService.get_recommendations(self.user)
+        second = RecommendationCacheService.get_recommendations(self.user)
+
+        self.assertEqual(first, [self.meditation])
+        self.assertEqual(second, [self.meditation])
+        mock_recommend.assert_called_once()
+        self.assertEqual(get_cache_requests("hit"), hits + 1)
+        self.assertEqual(get_cache_requests("miss"), misses + 1)
+
+    def test_session_invalidates_user(self, mock_recommend):
+        mock_recommend.return_value = [self.meditation]
+        RecommendationCacheService.get_recommendations(self.user)
+
+        MeditationSession.objects.create(
+            user=self.user, meditation=self.meditation
+        )
+        RecommendationCacheService.get_recommendations(self.user)
+
+        self.assertEqual(mock_recommend.call_count, 2)
+
+    def test_grade_invalidates_user(self, mock_recommend):
+        mock_recommend.return_value = [self.meditation]
+        RecommendationCacheService.get_recommendations(self.user)
+
+        MeditationGrade.objects.create(
+            user=self.user, meditation=self.meditation, grade=5
+        )
+        RecommendationCacheService.get_recommendations(self.user)
+
+        self.assertEqual(mock_recommend.call_count, 2)
+
+    def test_catalogue_change_invalidates_everyone(self, mock_recommend):
+        mock_recommend.return_value = [self.meditation]
+        RecommendationCacheService.get_recommendations(self.user)
+
+        Meditation.objects.create(name="Mindfulness")
+        RecommendationCacheService.get_recommendations(self.user)
+
+        self.assertEqual(mock_recommend.call_count, 2)
+
+    def test_other_users_stay_cached(self, mock_recommend):
+        mock_recommend.return_value = [self.meditation]
+        another_user = User.objects.create_user(
+            username="anotheruser", password="testpassword123"
+        )
+        RecommendationCacheService.get_recommendations(self.user)
+        RecommendationCacheService.get_recommendations(another_user)
+
+        MeditationSession.objects.create(
+            user=another_user, meditation=self.meditation
+        )
+        RecommendationCacheService.get_recommendations(self.user)
+
+        self.assertEqual(mock_recommend.call_count, 2)
+
+    def test_view_serves_cached_recommendations(self, mock_recommend):
+        mock_recommend.return_value = [self.meditation]
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        for _ in range(2):
+            response = client.get("/api/meditation/recommend_meditations/")
+            self.assertIn("Zen Meditation", response.content.decode())
+
+        mock_recommend.assert_called_once()
@@ -0,0 +1,142 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from ..models import (
+    Meditation,
+    MeditationGrade,
+    MeditationSession,
+    MeditationTheme,
+)
+from ..repositories.MeditationRepository import MeditationRepository
+from ..services.RecommendationService import RecommendationService
+
+
+class ThemeQuotaRecommendationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword123"
+        )
+        self.themes = [
+            MeditationTheme.objects.create(name=name)
+            for name in ("Relaxation", "Focus", "Sleep")
+        ]
+        self.meditations = {
+            theme.id: [
+                Meditation.objects.create(
+                    name=f"{theme.name} {i}", meditation_theme=theme
+                )
+                for i in range(20)
+            ]
+            for theme in self.themes
+        }
+
+    def grade_theme(self, theme, grade, times):
+        for meditation in self.meditations[theme.id][:times]:
+            MeditationGrade.objects.create(
+                user=self.user, meditation=meditation, grade=grade
+            )
+            MeditationSession.objects.create(
+                user=self.user, meditation=meditation
+            )
+
+    def test_quotas_are_enforced_in_one_query(self):
+        relaxation, focus, sleep = self.themes
+        with self.assertNumQueries(1):
+            meditations = MeditationRepository.get_meditations_by_theme_quotas(
+                [(relaxation.id, 5), (focus.id, 3), (sleep.id, 0)]
+            )
+
+        themes = [meditation.meditation_theme_id for meditation in meditations]
+        self.assertEqual(themes, [relaxation.id] * 5 + [focus.id] * 3)
+
+    def test_quota_larger_than_theme_returns_whole_theme(self):
+        relaxation = self.themes[0]
+        meditations = MeditationRepository.get_meditations_by_theme_quotas(
+            [(relaxation.id, 50)]
+        )
+
+        self.assertCountEqual(meditations, self.meditations[relaxation.id])
+
+    def test_recommendations_follow_theme_quotas(self):
+        relaxation, focus, sleep = self.themes
+        self.grade_theme(relaxation, grade=5, times=3)
+        self.grade_theme(focus, grade=4, times=3)
+        self.grade_theme(sleep, grade=1, times=3)
+
+        meditations = RecommendationService.recommend_meditations_for_user(
+            user=self.user, strategy="theme"
+        )
+
+        themes = [meditation.meditation_theme_id for meditation in meditations]
+        self.assertEqual(len(themes), 10)
+        self.assertEqual(themes.count(relaxation.id), 6)
+        self.assertEqual(themes.count(focus.id), 4)
+        self.assertNotIn(sleep.id, themes)
+
+    def test_theme_quotas_fill_the_recommended_set(self):
+        self.assertEqual(
+            RecommendationService.get_theme_quotas([5.0] * 11),
+            [1] * 10 + [0],
+        )
+        self.assertEqual(
+            RecommendationService.get_theme_quotas([4.0] + [5.0] * 10),
+            [0] + [1] * 10,
+        )
+        self.assertEqual(
+            RecommendationService.get_theme_quotas([5.0, 4.0, 4.0]),
+            [4, 3, 3],
+        )
+        self.assertEqual(
+            RecommendationService.get_theme_quotas([5.0] + [4.0] * 9),
+            [1] * 10,
+        )
+
+    def test_many_equally_liked_themes(self):
+        liked_themes = [
+            MeditationTheme.objects.create(name=f"Theme {i}")
+            for i in range(11)
+        ]
+        for theme in liked_themes:
+            meditation = Meditation.objects.create(
+                name=f"{theme.name} 0", meditation_theme=theme
+            )
+            MeditationGrade.objects.create(
+                user=self.user, meditation=meditation, grade=5
+            )
+            MeditationSession.objects.create(
+                user=self.user, meditation=meditation
+            )
+
+        meditations = RecommendationService.recommend_meditations_for_user(
+            user=self.user, strategy="theme"
+        )
+
+        # One from each of ten themes, never more than the recommended set
+        themes = {meditation.meditation_theme_id for meditation in meditations}
+        self.assertEqual(len(meditations), 10)
+        self.assertEqual(len(themes), 10)
+        self.assertLessEqual(themes, {theme.id for theme in liked_themes})
+
+    @override_settings(RECOMMENDATION_EXCLUDE_SEEN=True)
+    def test_seen_meditations_can_be_excluded(self):
+        relaxation = self.themes[0]
+        self.grade_theme(relaxation, grade=5, times=18)
+
+        meditations = RecommendationService.recommend_meditations_for_user(
+            user=self.user, strategy="theme"
+        )
+
+        # The unseen ones come first, unseen popular ones fill the rest
+        self.assertEqual(len(meditations), 10)
+        self.assertCountEqual(
+            meditations[:2], self.meditations[relaxation.id][18:]
+        )
+        self.assertEqual(len(set(meditations)), 10)
+        seen_ids = set(
+            MeditationSession.objects.filter(user=self.user).values_list(
+                "meditation_id", flat=True
+            )
+        )
+        self.assertFalse(
+            seen_ids & {meditation.id for meditation in meditations}
+        )
@@ -0,0 +1,125 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from ..models import Meditation, MeditationSession, RecommendationSnapshot
+from ..services.MeditationService import MeditationService
+from ..services.RecommendationCacheService import (
+    RecommendationCacheService,
+    get_recommendation_cache,
+)
+
+
+class RecommendationSnapshotTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_recommendation_cache().clear()
+        MeditationService._meditation_id_index = None
+        self.users = [
+            User.objects.create_user(
+                username=f"testuser{i}", password="testpassword123"
+            )
+            for i in range(3)
+        ]
+        self.meditations = [
+            Meditation.objects.create(name=f"Meditation {i}") for i in range(3)
+        ]
+
+    def precompute(self):
+        call_command(
+            "precompute_recommendations",
+            workers=0,
+            chunk_size=2,
+            stdout=StringIO(),
+        )
+
+    def test_precompute_stores_snapshot_for_every_user(self):
+        self.precompute()
+
+        self.assertEqual(RecommendationSnapshot.objects.count(), 3)
+        snapshot = RecommendationSnapshot.objects.get(user=self.users[0])
+        self.assertCountEqual(
+            snapshot.meditation_ids,
+            [meditation.id for meditation in self.meditations],
+        )
+
+    @patch(
+        "thoughts_core.services.RecommendationService.RecommendationService.recommend_meditations_for_user"
+    )
+    def test_fresh_snapshot_skips_live_computation(self, mock_recommend):
+        RecommendationSnapshot.objects.create(
+            user=self.users[0],
+            meditation_ids=[self.meditations[1].id],
+            catalogue_version=0,
+            computed_at=timezone.now(),
+        )
+        with patch(
+            "thoughts_core.services.CatalogueService.CatalogueService.get_version",
+            return_value=0,
+        ):
+            recommended = RecommendationCacheService.get_recommendations(
+                self.users[0]
+            )
+
+        self.assertEqual(recommended, [self.meditations[1]])
+        mock_recommend.assert_not_called()
+
+    @patch(
+        "thoughts_core.services.RecommendationService.RecommendationService.recommend_meditations_for_user"
+    )
+    def test_stale_snapshot_falls_back_to_live(self, mock_recommend):
+        mock_recommend.return_value = [self.meditations[2]]
+        self.precompute()
+        RecommendationSnapshot.objects.update(
+            computed_at=timezone.now() - timedelta(days=30)
+        )
+
+        recommended = RecommendationCacheService.get_recommendations(
+            self.users[0]
+        )
+
+        self.assertEqual(recommended, [self.meditations[2]])
+
+    def test_catalogue_change_outdates_snapshots(self):
+        self.precompute()
+        new_meditation = Meditation.objects.create(name="New meditation")
+
+        recommended = RecommendationCacheService.get_recommendations(
+            self.users[0]
+        )
+
+        self.assertIn(new_meditation, recommended)
+
+    def test_session_deletes_user_snapshot(self):
+        self.precompute()
+
+        MeditationSession.objects.create(
+            user=self.users[0], meditation=self.meditations[0]
+        )
+
+        self.assertFalse(
+            RecommendationSnapshot.objects.filter(user=self.users[0]).exists()
+        )
+        self.assertEqual(RecommendationSnapshot.objects.count(), 2)
+
+
+class RecommendationPrecomputePoolTest(TransactionTestCase):
+    def test_worker_processes_precompute_all_users(self):
+        for i in range(5):
+            User.objects.create_user(username=f"pooluser{i}", password="x")
+        Meditation.objects.create(name="Zen Meditation")
+
+        call_command(
+            "precompute_recommendations",
+            workers=2,
+            chunk_size=2,
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(RecommendationSnapshot.objects.count(), 5)
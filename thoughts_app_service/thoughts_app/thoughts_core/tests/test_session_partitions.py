@@ -0,0 +1,185 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..models import (
+    Meditation,
+    MeditationSession,
+    MeditationSessionRollup,
+    UserSessionStats,
+)
+from ..repositories.MeditationRepository import MeditationRepository
+from ..repositories.MeditationSessionPartitionRepository import (
+    DEFAULT_PARTITION,
+    MeditationSessionPartitionRepository,
+)
+from ..repositories.UserSessionStatsRepository import (
+    UserSessionStatsRepository,
+)
+from ..services.MeditationSessionPartitionService import (
+    MeditationSessionPartitionService,
+    add_months,
+)
+
+
+@override_settings(
+    MEDITATION_SESSION_PARTITIONS_AHEAD=2,
+    MEDITATION_SESSION_RETENTION_MONTHS=12,
+)
+class SessionPartitionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser")
+        self.meditations = [
+            Meditation.objects.create(name=f"Вечерняя практика {i}")
+            for i in range(2)
+        ]
+        self.current_month = (
+            MeditationSessionPartitionService.get_current_month()
+        )
+
+    def create_session(self, months_ago, meditation=None):
+        session = MeditationSession.objects.create(
+            user=self.user, meditation=meditation or self.meditations[0]
+        )
+        month = add_months(self.current_month, -months_ago)
+        session_start_time = MeditationSessionPartitionService.get_month_start(
+            month
+        ) + timedelta(days=3)
+        MeditationSession.objects.filter(pk=session.pk).update(
+            session_start_time=session_start_time
+        )
+        return session
+
+    def get_partition_names(self):
+        return MeditationSessionPartitionRepository.get_partition_names()
+
+    def test_maintain_does_nothing_without_partitions(self):
+        self.assertEqual(
+            MeditationSessionPartitionService.maintain(), (0, 0, 0)
+        )
+        self.assertFalse(MeditationSessionPartitionRepository.is_partitioned())
+
+    def test_partitioned_table_keeps_working(self):
+        sessions = [self.create_session(months_ago) for months_ago in (0, 3)]
+
+        self.assertEqual(MeditationSessionPartitionService.partition(), 6)
+        self.assertEqual(MeditationSessionPartitionService.partition(), 0)
+
+        self.assertTrue(MeditationSessionPartitionRepository.is_partitioned())
+        self.assertEqual(
+            self.get_partition_names(),
+            [DEFAULT_PARTITION]
+            + [
+                MeditationSessionPartitionService.get_partition_name(
+                    add_months(self.current_month, months)
+                )
+                for months in range(-3, 3)
+            ],
+        )
+        self.assertCountEqual(
+            MeditationRepository.get_meditation_sessions_of_user(self.user),
+            sessions,
+        )
+        session = MeditationSession.objects.create(
+            user=self.user, meditation=self.meditations[1]
+        )
+        self.assertGreater(session.id, sessions[-1].id)
+        self.assertEqual(
+            UserSessionStatsRepository.get_session_count(self.user.id), 3
+        )
+        sessions[0].delete()
+        self.assertEqual(MeditationSession.objects.count(), 2)
+
+        month_start = MeditationSessionPartitionService.get_month_start(
+            self.current_month
+        )
+        plan = MeditationSession.objects.filter(
+            user=self.user, session_start_time__gte=month_start
+        ).explain()
+        self.assertNotIn(
+            MeditationSessionPartitionService.get_partition_name(
+                add_months(self.current_month, -3)
+            ),
+            plan,
+        )
+
+    def test_maintain_rolls_up_expired_partitions(self):
+        for months_ago, meditation in [
+            (14, self.meditations[0]),
+            (14, self.meditations[0]),
+            (14, self.meditations[1]),
+            (13, self.meditations[0]),
+            (1, self.meditations[0]),
+        ]:
+            self.create_session(months_ago, meditation)
+        UserSessionStatsRepository.get_session_count(self.user.id)
+        MeditationSessionPartitionService.partition()
+
+        stdout = StringIO()
+        call_command("maintain_session_partitions", stdout=stdout)
+
+        self.assertIn(
+            "dropped 2 partitions, rolled up 4 sessions", stdout.getvalue()
+        )
+        self.assertEqual(MeditationSession.objects.count(), 1)
+        self.assertCountEqual(
+            MeditationSessionRollup.objects.values_list(
+                "meditation_id", "month", "session_count"
+            ),
+            [
+                (
+                    self.meditations[0].id,
+                    add_months(self.current_month, -14),
+                    2,
+                ),
+                (
+                    self.meditations[1].id,
+                    add_months(self.current_month, -14),
+                    1,
+                ),
+                (
+                    self.meditations[0].id,
+                    add_months(self.current_month, -13),
+                    1,
+                ),
+            ],
+        )
+        self.assertNotIn(
+            MeditationSessionPartitionService.get_partition_name(
+                add_months(self.current_month, -13)
+            ),
+            self.get_partition_names(),
+        )
+        # Rolled up sessions still count towards the progress level
+        self.assertEqual(UserSessionStatsRepository.reconcile(), 0)
+        self.assertEqual(
+            UserSessionStats.objects.get(user=self.user).session_count, 5
+        )
+
+    def test_new_partitions_take_over_default_rows(self):
+        MeditationSessionPartitionService.partition()
+        session = self.create_session(months_ago=-4)
+        self.create_session(months_ago=15)
+
+        with override_settings(MEDITATION_SESSION_PARTITIONS_AHEAD=4):
+            created, dropped, session_count = (
+                MeditationSessionPartitionService.maintain()
+            )
+
+        self.assertEqual((created, dropped, session_count), (2, 0, 1))
+        self.assertEqual(
+            MeditationSessionRollup.objects.get().session_count, 1
+        )
+        self.assertEqual(
+            list(MeditationSession.objects.all()),
+            [session],
+        )
+        self.assertIn(
+            MeditationSessionPartitionService.get_partition_name(
+                add_months(self.current_month, 4)
+            ),
+            self.get_partition_names(),
+        )
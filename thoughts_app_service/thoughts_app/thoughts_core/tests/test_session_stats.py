@@ -0,0 +1,80 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import Meditation, MeditationSession, UserSessionStats
+from ..repositories.UserSessionStatsRepository import (
+    UserSessionStatsRepository,
+)
+
+
+class UserSessionStatsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser")
+        self.meditation = Meditation.objects.create(name="Глубокий сон")
+
+    def create_sessions(self, amount, user=None):
+        return [
+            MeditationSession.objects.create(
+                user=user or self.user, meditation=self.meditation
+            )
+            for _ in range(amount)
+        ]
+
+    def get_session_count(self):
+        return UserSessionStats.objects.get(user=self.user).session_count
+
+    def test_session_writes_update_the_counter(self):
+        sessions = self.create_sessions(3)
+        self.assertEqual(self.get_session_count(), 3)
+
+        sessions[0].delete()
+        self.assertEqual(self.get_session_count(), 2)
+
+    def test_missing_counter_is_counted_on_first_read(self):
+        MeditationSession.objects.bulk_create(
+            [
+                MeditationSession(user=self.user, meditation=self.meditation)
+                for _ in range(4)
+            ]
+        )
+        self.assertFalse(UserSessionStats.objects.exists())
+
+        self.assertEqual(
+            UserSessionStatsRepository.get_session_count(self.user.id), 4
+        )
+        self.create_sessions(1)
+        self.assertEqual(self.get_session_count(), 5)
+
+    def test_counter_read_is_one_query(self):
+        self.create_sessions(2)
+
+        with self.assertNumQueries(1):
+            session_count = UserSessionStatsRepository.get_session_count(
+                self.user.id
+            )
+
+        self.assertEqual(session_count, 2)
+
+    def test_reconcile_command_repairs_drift(self):
+        other_user = User.objects.create_user(username="otheruser")
+        self.create_sessions(3)
+        self.create_sessions(1, user=other_user)
+        UserSessionStats.objects.filter(user=self.user).update(
+            session_count=10
+        )
+        MeditationSession.objects.filter(user=other_user).delete()
+        UserSessionStats.objects.filter(user=other_user).update(
+            session_count=1
+        )
+
+        stdout = StringIO()
+        call_command("reconcile_session_counts", stdout=stdout)
+
+        self.assertIn("Repaired 2 session counters", stdout.getvalue())
+        self.assertEqual(self.get_session_count(), 3)
+        self.assertEqual(
+            UserSessionStats.objects.get(user=other_user).session_count, 0
+        )
@@ -0,0 +1,244 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+
+from ..models import (
+    Meditation,
+    MeditationGrade,
+    MeditationTheme,
+    UserThemeAffinity,
+)
+from ..services.MeditationService import MeditationService
+from ..services.RecommendationService import RecommendationService
+
+
+class UserThemeAffinityTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword123"
+        )
+        self.relaxation = MeditationTheme.objects.create(
+            name="Relaxation", cover_file_url="http://example.com/r.jpg"
+        )
+        self.focus = MeditationTheme.objects.create(
+            name="Focus", cover_file_url="http://example.com/f.jpg"
+        )
+        self.relaxation_meditation = Meditation.objects.create(
+            name="Deep Relaxation", meditation_theme=self.relaxation
+        )
+        self.focus_meditation = Meditation.objects.create(
+            name="Daily Focus", meditation_theme=self.focus
+        )
+        # A user grades each meditation once
+        self.relaxation_meditations = [self.relaxation_meditation] + [
+            Meditation.objects.create(
+                name=f"Deep Relaxation {i}", meditation_theme=self.relaxation
+            )
+            for i in (2, 3)
+        ]
+        self.focus_meditations = [
+            self.focus_meditation,
+            Meditation.objects.create(
+                name="Daily Focus 2", meditation_theme=self.focus
+            ),
+        ]
+
+    def get_affinity(self, theme):
+        return UserThemeAffinity.objects.get(
+            user=self.user, meditation_theme=theme
+        )
+
+    def test_grade_create_updates_affinity(self):
+        MeditationGrade.objects.create(
+            user=self.user, meditation=self.relaxation_meditation, grade=5
+        )
+        MeditationGrade.objects.create(
+            user=self.user, meditation=self.relaxation_meditations[1], grade=3
+        )
+
+        affinity = self.get_affinity(self.relaxation)
+        self.assertEqual(affinity.grade_sum, 8)
+        self.assertEqual(affinity.grade_count, 2)
+
+    def test_grade_update_moves_affinity(self):
+        grade = MeditationGrade.objects.create(
+            user=self.user, meditation=self.relaxation_meditation, grade=5
+        )
+        grade.meditation = self.focus_meditation
+        grade.grade = 2
+        grade.save()
+
+        self.assertEqual(self.get_affinity(self.relaxation).grade_count, 0)
+        focus_affinity = self.get_affinity(self.focus)
+        self.assertEqual(focus_affinity.grade_sum, 2)
+        self.assertEqual(focus_affinity.grade_count, 1)
+
+    def test_grade_delete_retracts_affinity(self):
+        grade = MeditationGrade.objects.create(
+            user=self.user, meditation=self.relaxation_meditation, grade=4
+        )
+        MeditationGrade.objects.create(
+            user=self.user, meditation=self.relaxation_meditations[1], grade=2
+        )
+        grade.delete()
+
+        affinity = self.get_affinity(self.relaxation)
+        self.assertEqual(affinity.grade_sum, 2)
+        self.assertEqual(affinity.grade_count, 1)
+
+    def test_user_delete_cascades(self):
+        MeditationGrade.objects.create(
+            user=self.user, meditation=self.relaxation_meditation, grade=4
+        )
+        self.user.delete()
+        self.assertFalse(UserThemeAffinity.objects.exists())
+
+    def test_moving_a_meditation_moves_its_grades(self):
+        other_user = User.objects.create_user(username="otheruser")
+        for user, meditation, grade in [
+            (self.user, self.relaxation_meditations[0], 5),
+            (self.user, self.relaxation_meditations[1], 3),
+            (self.user, self.focus_meditation, 2),
+            (other_user, self.relaxation_meditations[0], 4),
+        ]:
+            MeditationGrade.objects.create(
+                user=user, meditation=meditation, grade=grade
+            )
+
+        self.relaxation_meditations[0].meditation_theme = self.focus
+        self.relaxation_meditations[0].save()
+
+        self.assertCountEqual(
+            UserThemeAffinity.objects.values_list(
+                "user_id", "meditation_theme_id", "grade_sum", "grade_count"
+            ),
+            [
+                (self.user.id, self.relaxation.id, 3, 1),
+                (self.user.id, self.focus.id, 7, 2),
+                (other_user.id, self.relaxation.id, 0, 0),
+                (other_user.id, self.focus.id, 4, 1),
+            ],
+        )
+
+        self.relaxation_meditations[0].meditation_theme = None
+        self.relaxation_meditations[0].save()
+
+        self.assertEqual(self.get_affinity(self.focus).grade_sum, 2)
+        self.assertEqual(self.get_affinity(self.focus).grade_count, 1)
+
+    def test_rebuild_command_repairs_drift(self):
+        MeditationGrade.objects.bulk_create(
+            [
+                MeditationGrade(
+                    user=self.user, meditation=meditation, grade=grade
+                )
+                for meditation, grade in zip(
+                    self.relaxation_meditations, (5, 4)
+                )
+            ]
+            + [
+                MeditationGrade(
+                    user=self.user, meditation=self.focus_meditation, grade=1
+                )
+            ]
+        )
+        self.assertFalse(UserThemeAffinity.objects.exists())
+
+        call_command("rebuild_theme_affinity", stdout=StringIO())
+
+        self.assertEqual(self.get_affinity(self.relaxation).grade_sum, 9)
+        self.assertEqual(self.get_affinity(self.relaxation).grade_count, 2)
+        self.assertEqual(self.get_affinity(self.focus).grade_sum, 1)
+
+    def test_analyze_user_grades_reads_affinity_rows(self):
+        for meditation, grade in zip(self.relaxation_meditations, (5, 5, 4)):
+            MeditationGrade.objects.create(
+                user=self.user, meditation=meditation, grade=grade
+            )
+        for meditation, grade in zip(self.focus_meditations, (2, 3)):
+            MeditationGrade.objects.create(
+                user=self.user, meditation=meditation, grade=grade
+            )
+
+        with self.assertNumQueries(1):
+            result = RecommendationService.analyze_user_grades(user=self.user)
+
+        self.assertEqual(result, [(self.relaxation.id, 10)])
+
+    def test_theme_grade_stats_are_read_in_one_query(self):
+        for meditation, grade in (
+            (self.relaxation_meditations[0], 5),
+            (self.relaxation_meditations[1], 4),
+            (self.focus_meditation, 2),
+        ):
+            MeditationGrade.objects.create(
+                user=self.user, meditation=meditation, grade=grade
+            )
+
+        with self.assertNumQueries(1):
+            stats = MeditationService.get_user_theme_grade_stats(
+                user=self.user
+            )
+
+        self.assertCountEqual(
+            stats, [(self.relaxation.id, 4.5, 2), (self.focus.id, 2.0, 1)]
+        )
+
+
+class FillThemeAffinitiesMigrationTest(TransactionTestCase):
+    migrate_from = [("thoughts_core", "0001_initial")]
+    migrate_to = [("thoughts_core", "0002_user_theme_affinity")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_grades_given_before_are_summed_up(self):
+        apps = self.migrate(self.migrate_from)
+        MeditationTheme = apps.get_model("thoughts_core", "MeditationTheme")
+        Meditation = apps.get_model("thoughts_core", "Meditation")
+        MeditationGrade = apps.get_model("thoughts_core", "MeditationGrade")
+        users = [
+            apps.get_model("auth", "User").objects.create(username=name)
+            for name in ("a", "b")
+        ]
+        sleep = MeditationTheme.objects.create(name="Сон")
+        focus = MeditationTheme.objects.create(name="Фокус")
+        meditations = [
+            Meditation.objects.create(name="Ночь", meditation_theme=sleep),
+            Meditation.objects.create(name="Утро", meditation_theme=sleep),
+            Meditation.objects.create(name="День", meditation_theme=focus),
+            Meditation.objects.create(name="Без темы"),
+        ]
+        for user, meditation, grade in [
+            (users[0], meditations[0], 5),
+            (users[0], meditations[1], 4),
+            (users[0], meditations[2], 2),
+            (users[0], meditations[3], 1),
+            (users[1], meditations[1], 3),
+        ]:
+            MeditationGrade.objects.create(
+                user=user, meditation=meditation, grade=grade
+            )
+
+        self.migrate(self.migrate_to)
+
+        self.assertCountEqual(
+            UserThemeAffinity.objects.values_list(
+                "user_id", "meditation_theme_id", "grade_sum", "grade_count"
+            ),
+            [
+                (users[0].id, sleep.id, 9, 2),
+                (users[0].id, focus.id, 2, 1),
+                (users[1].id, sleep.id, 3, 1),
+            ],
+        )
@@ -3,14 +3,21 @@ import logging
 import unittest
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connections
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 from thoughts_core.models import Chat
+from thoughts_core.services.ChatCompletionCacheService import (
+    get_chat_completion_cache,
+)
 from thoughts_core.views import (
+    MeditationSearchIndexCache,
     generate_chat_completion,
     get_all_meditations,
     prepare_system_message,
@@ -98,7 +105,7 @@ class ChatViewSetTest(TestCase):
         self.user = User.objects.create_user(
             username="testuser", password="testpassword123"
         )
-        self.chat_data = {"chat_messages": []}
+        self.chat_data = {}
         self.client.force_authenticate(user=self.user)
         self.another_user = User.objects.create_user(
             username="anotheruser", password="testpassword123"
@@ -117,28 +124,8 @@ class ChatViewSetTest(TestCase):
         self.assertEqual(Chat.objects.get().user, self.user)
 
     def test_retrieve_chats(self):
-        Chat.objects.create(
-            user=self.user,
-            chat_messages=[
-                {
-                    "id": "id_user",
-                    "created_at": "2024-05-11T00:26:37.021Z",
-                    "updated_at": "2024-05-11T00:26:37.021Z",
-                    "chat_messages": {},
-                }
-            ],
-        )
-        Chat.objects.create(
-            user=self.another_user,
-            chat_messages=[
-                {
-                    "id": "id_another_user",
-                    "created_at": "2024-05-11T00:26:37.021Z",
-                    "updated_at": "2024-05-11T00:26:37.021Z",
-                    "chat_messages": {},
-                }
-            ],
-        )
+        Chat.objects.create(user=self.user)
+        Chat.objects.create(user=self.another_user)
         response = self.client.get("/api/chat/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(
@@ -184,8 +171,9 @@ class MeditationProgressViewTest(TestCase):
             session.delete()
 
     @patch(
-        "thoughts_core.services.UserService.UserService.get_level"
-    )  # Correct the path as necessary
+        "thoughts_core.services.UserService.UserService.aget_level",
+        new_callable=AsyncMock,
+    )
     def test_get_meditation_progress_success(self, mock_get_level):
         mock_get_level.return_value = self.level
         response = self.client.get(self.url)
@@ -197,7 +185,10 @@ class MeditationProgressViewTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, expected_data)
 
-    @patch("thoughts_core.services.UserService.UserService.get_level")
+    @patch(
+        "thoughts_core.services.UserService.UserService.aget_level",
+        new_callable=AsyncMock,
+    )
     def test_get_meditation_progress_no_level_found(self, mock_get_level):
         mock_get_level.return_value = None
         response = self.client.get(self.url)
@@ -323,6 +314,17 @@ class UtilityFunctionTests(unittest.IsolatedAsyncioTestCase):
 
 
 class GenerateChatCompletionTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        get_chat_completion_cache().clear()
+        # A search index built by an earlier test would skip the patched
+        # get_all_meditations
+        cache.clear()
+        MeditationSearchIndexCache.search_index = None
+
+    async def asyncTearDown(self):
+        # The catalogue version is read in the ORM's worker thread, its
+        # connection would outlive the test database
+        await sync_to_async(connections.close_all)()
 
     @patch("thoughts_core.views.OpenAiClientSingleton")
     @patch("thoughts_core.views.get_all_meditations", new_callable=AsyncMock)
@@ -431,7 +433,7 @@ class ChatBotAPIViewTests(TestCase):
         )
         self.client = APIClient()
         self.client.force_authenticate(user=self.user)
-        self.chat = Chat.objects.create(user=self.user, chat_messages=[])
+        self.chat = Chat.objects.create(user=self.user)
         self.url = "/api/chatbot/"  # Update this to match your actual URL pattern name
 
     @patch(
@@ -4,6 +4,8 @@ from rest_framework import routers
 from .views import (
     AchievementViewSet,
     ChatBotAPIView,
+    ChatBotJobAPIView,
+    ChatBotStreamAPIView,
     ChatViewSet,
     ManageUserAchievements,
     MeditationGradeViewSet,
@@ -60,6 +62,16 @@ urlpatterns = [
     ),
     path("", include(router.urls)),
     path("chatbot/", ChatBotAPIView.as_view(), name="chatbot"),
+    path(
+        "chatbot/stream/",
+        ChatBotStreamAPIView.as_view(),
+        name="chatbot_stream",
+    ),
+    path(
+        "chatbot/jobs/<uuid:job_id>/",
+        ChatBotJobAPIView.as_view(),
+        name="chatbot_job",
+    ),
     path(
         "auth/register/",
         UserRegistrationView.as_view(),
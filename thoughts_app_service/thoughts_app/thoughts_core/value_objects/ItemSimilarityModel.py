@@ -0,0 +1,188 @@
+import os
+import tempfile
+from typing import Dict, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# user id -> (meditation ids, interaction weights)
+UserInteractions = Dict[int, Tuple[List[int], List[float]]]
+
+
+class ItemSimilarityModel:
+    """Item-item cosine model over a sparse user x meditation matrix.
+
+    Only the co-occurrence matrix C = X^T X is stored, similarities are
+    C[i, j] / (|i| |j|) and are applied lazily when a user is scored.
+    """
+
+    def __init__(
+        self,
+        user_ids: np.ndarray,
+        meditation_ids: np.ndarray,
+        interactions: sparse.csr_matrix,
+        cooccurrence: sparse.csr_matrix,
+        last_grade_id: int = 0,
+        last_session_id: int = 0,
+    ):
+        self.user_ids = user_ids
+        self.meditation_ids = meditation_ids
+        self.interactions = interactions
+        self.cooccurrence = cooccurrence
+        self.last_grade_id = last_grade_id
+        self.last_session_id = last_session_id
+        self._index()
+
+    def _index(self):
+        self.user_index = {
+            int(user_id): row for row, user_id in enumerate(self.user_ids)
+        }
+        self.meditation_index = {
+            int(meditation_id): column
+            for column, meditation_id in enumerate(self.meditation_ids)
+        }
+        norms = np.sqrt(self.cooccurrence.diagonal())
+        self.inverse_norms = np.divide(
+            1.0, norms, out=np.zeros_like(norms), where=norms > 0
+        )
+
+    @staticmethod
+    def empty() -> "ItemSimilarityModel":
+        return ItemSimilarityModel(
+            user_ids=np.zeros(0, dtype=np.int64),
+            meditation_ids=np.zeros(0, dtype=np.int64),
+            interactions=sparse.csr_matrix((0, 0)),
+            cooccurrence=sparse.csr_matrix((0, 0)),
+        )
+
+    def update_users(self, user_interactions: UserInteractions) -> None:
+        """Replace the rows of the given users and patch C accordingly."""
+        new_meditation_ids = sorted(
+            {
+                meditation_id
+                for meditation_ids, _ in user_interactions.values()
+                for meditation_id in meditation_ids
+            }
+            - self.meditation_index.keys()
+        )
+        new_user_ids = sorted(
+            user_interactions.keys() - self.user_index.keys()
+        )
+        self.meditation_ids = np.concatenate(
+            [self.meditation_ids, np.array(new_meditation_ids, dtype=np.int64)]
+        )
+        self.user_ids = np.concatenate(
+            [self.user_ids, np.array(new_user_ids, dtype=np.int64)]
+        )
+        self._index()
+
+        shape = (len(self.user_ids), len(self.meditation_ids))
+        self.interactions.resize(shape)
+        self.cooccurrence.resize((shape[1], shape[1]))
+
+        rows, columns, weights = [], [], []
+        for user_id, interactions in user_interactions.items():
+            meditation_ids, user_weights = interactions
+            row = self.user_index[user_id]
+            rows += [row] * len(meditation_ids)
+            columns += [
+                self.meditation_index[meditation_id]
+                for meditation_id in meditation_ids
+            ]
+            weights += user_weights
+        updated = sparse.csr_matrix(
+            (weights, (rows, columns)), shape=shape, dtype=np.float64
+        )
+
+        changed_rows = np.array(
+            [self.user_index[user_id] for user_id in user_interactions],
+            dtype=np.int64,
+        )
+        previous = self.interactions[changed_rows]
+        current = updated[changed_rows]
+
+        keep = np.ones(shape[0])
+        keep[changed_rows] = 0
+        self.interactions = (
+            sparse.diags(keep) @ self.interactions + updated
+        ).tocsr()
+        self.cooccurrence = (
+            self.cooccurrence + current.T @ current - previous.T @ previous
+        ).tocsr()
+        self.interactions.eliminate_zeros()
+        self.cooccurrence.eliminate_zeros()
+        self._index()
+
+    def recommend(self, user_id: int, amount: int) -> List[int] | None:
+        row = self.user_index.get(user_id)
+        if row is None:
+            return None
+
+        user_row = self.interactions[row]
+        if user_row.nnz == 0:
+            return None
+
+        weighted = user_row.multiply(self.inverse_norms).tocsr()
+        scores = (weighted @ self.cooccurrence).toarray().ravel()
+        scores *= self.inverse_norms
+        scores[user_row.indices] = 0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > amount:
+            candidates = candidates[
+                np.argpartition(-scores[candidates], amount)[:amount]
+            ]
+        candidates = candidates[np.argsort(-scores[candidates])]
+        return [int(self.meditation_ids[column]) for column in candidates]
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=directory, suffix=".npz", delete=False
+        ) as artifact:
+            np.savez_compressed(
+                artifact,
+                user_ids=self.user_ids,
+                meditation_ids=self.meditation_ids,
+                interactions_data=self.interactions.data,
+                interactions_indices=self.interactions.indices,
+                interactions_indptr=self.interactions.indptr,
+                cooccurrence_data=self.cooccurrence.data,
+                cooccurrence_indices=self.cooccurrence.indices,
+                cooccurrence_indptr=self.cooccurrence.indptr,
+                watermarks=np.array(
+                    [self.last_grade_id, self.last_session_id], dtype=np.int64
+                ),
+            )
+        os.replace(artifact.name, path)
+
+    @staticmethod
+    def load(path: str) -> "ItemSimilarityModel":
+        with np.load(path) as artifact:
+            users, meditations = (
+                len(artifact["user_ids"]),
+                len(artifact["meditation_ids"]),
+            )
+            return ItemSimilarityModel(
+                user_ids=artifact["user_ids"],
+                meditation_ids=artifact["meditation_ids"],
+                interactions=sparse.csr_matrix(
+                    (
+                        artifact["interactions_data"],
+                        artifact["interactions_indices"],
+                        artifact["interactions_indptr"],
+                    ),
+                    shape=(users, meditations),
+                ),
+                cooccurrence=sparse.csr_matrix(
+                    (
+                        artifact["cooccurrence_data"],
+                        artifact["cooccurrence_indices"],
+                        artifact["cooccurrence_indptr"],
+                    ),
+                    shape=(meditations, meditations),
+                ),
+                last_grade_id=int(artifact["watermarks"][0]),
+                last_session_id=int(artifact["watermarks"][1]),
+            )
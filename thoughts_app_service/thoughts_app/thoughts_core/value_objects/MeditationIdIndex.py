@@ -0,0 +1,17 @@
+import random
+from array import array
+from typing import Iterable, List
+
+
+class MeditationIdIndex:
+    def __init__(self, meditation_ids: Iterable[int], catalogue_version: int):
+        self.meditation_ids = array("q", meditation_ids)
+        self.catalogue_version = catalogue_version
+
+    def __len__(self) -> int:
+        return len(self.meditation_ids)
+
+    def sample(self, amount: int) -> List[int]:
+        if amount >= len(self.meditation_ids):
+            return list(self.meditation_ids)
+        return random.sample(self.meditation_ids, amount)
@@ -0,0 +1,121 @@
+import math
+import re
+from collections import Counter
+from itertools import islice
+from typing import Dict, List
+
+import numpy as np
+from scipy import sparse
+
+WORD_PATTERN = re.compile(r"\w+")
+# Character trigrams match inflected forms of the same stem, e.g.
+# "тревожно" and "тревога", which whole words would not
+NGRAM_SIZE = 3
+
+
+def get_terms(text: str) -> Counter:
+    terms = Counter()
+    for word in WORD_PATTERN.findall(text.lower().replace("ё", "е")):
+        # The prefix keeps whole words apart from trigrams of the same text
+        terms[f"w:{word}"] += 1
+        padded = f" {word} "
+        for start in range(len(padded) - NGRAM_SIZE + 1):
+            terms[padded[start : start + NGRAM_SIZE]] += 1
+    return terms
+
+
+class MeditationSearchIndex:
+    """TF-IDF index over meditation name, theme and narrator.
+
+    `meditations` are the serialized meditations returned by search(),
+    `theme_names` and `narrator_names` map ids to names.
+    """
+
+    def __init__(
+        self,
+        meditations: List[dict],
+        theme_names: Dict[int, str],
+        narrator_names: Dict[int, str],
+        catalogue_version: int,
+    ):
+        self.meditations = meditations
+        self.catalogue_version = catalogue_version
+        self.vocabulary: Dict[str, int] = {}
+
+        rows, columns, counts = [], [], []
+        for row, meditation in enumerate(meditations):
+            document = " ".join(
+                [
+                    meditation.get("name") or "",
+                    theme_names.get(meditation.get("meditation_theme"), ""),
+                    narrator_names.get(
+                        meditation.get("meditation_narrator"), ""
+                    ),
+                ]
+            )
+            for term, count in get_terms(document).items():
+                rows.append(row)
+                columns.append(
+                    self.vocabulary.setdefault(term, len(self.vocabulary))
+                )
+                counts.append(count)
+
+        term_counts = sparse.csr_matrix(
+            (np.array(counts, dtype=np.float32), (rows, columns)),
+            shape=(len(meditations), len(self.vocabulary)),
+        )
+        document_frequency = np.bincount(
+            term_counts.indices, minlength=len(self.vocabulary)
+        )
+        self.idf = (
+            np.log((1 + len(meditations)) / (1 + document_frequency)) + 1
+        ).astype(np.float32)
+
+        term_counts.data = 1 + np.log(term_counts.data)
+        weights = term_counts.multiply(self.idf).tocsr()
+        norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)))
+        norms[norms == 0] = 1
+        self.weights = sparse.csr_matrix(weights.multiply(1 / norms))
+
+    def __len__(self) -> int:
+        return len(self.meditations)
+
+    def get_scores(self, query: str) -> np.ndarray:
+        query_vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for term, count in get_terms(query).items():
+            column = self.vocabulary.get(term)
+            if column is not None:
+                query_vector[column] = (1 + math.log(count)) * self.idf[column]
+        return self.weights @ query_vector
+
+    def search(self, query: str, amount: int) -> List[dict]:
+        """Best matching `amount` meditations, best first.
+
+        Slots the query does not fill are topped up in catalogue order, so
+        the result size only depends on `amount`.
+        """
+        if amount >= len(self.meditations):
+            return list(self.meditations)
+
+        scores = self.get_scores(query)
+        matches = np.flatnonzero(scores)
+        if len(matches) > amount:
+            matches = np.sort(
+                matches[np.argpartition(-scores[matches], amount - 1)[:amount]]
+            )
+        # Stable sort keeps catalogue order between equal scores
+        matches = matches[np.argsort(-scores[matches], kind="stable")]
+        selected = matches.tolist()
+        if len(selected) < amount:
+            matched = set(selected)
+            selected.extend(
+                islice(
+                    (
+                        index
+                        for index in range(len(self.meditations))
+                        if index not in matched
+                    ),
+                    amount - len(selected),
+                )
+            )
+        return [self.meditations[index] for index in selected]
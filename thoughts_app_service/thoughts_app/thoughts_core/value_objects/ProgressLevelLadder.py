@@ -0,0 +1,29 @@
+import time
+from array import array
+from bisect import bisect_right
+from typing import Iterable
+
+from ..models import ProgressLevel
+
+
+class ProgressLevelLadder:
+    def __init__(self, progress_levels: Iterable[ProgressLevel]):
+        self.progress_levels = sorted(
+            progress_levels, key=lambda progress_level: progress_level.level
+        )
+        self.levels = array(
+            "q",
+            [progress_level.level for progress_level in self.progress_levels],
+        )
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def get_level(self, sessions_count: int) -> ProgressLevel | None:
+        """First level above `sessions_count`, the last one once all are
+        reached."""
+        if not self.progress_levels:
+            return None
+        index = bisect_right(self.levels, sessions_count)
+        return self.progress_levels[min(index, len(self.levels) - 1)]
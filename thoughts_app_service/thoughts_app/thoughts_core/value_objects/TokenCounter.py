@@ -0,0 +1,53 @@
+import math
+from typing import Iterable
+
+from ..services.logger import logger
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Framing tokens the chat format adds around every message and before the
+# reply, as documented for the gpt-3.5/gpt-4 family
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+# Without tiktoken one token is assumed per 4 bytes of UTF-8. This is close
+# for English and overestimates Cyrillic, which is the safe side for a budget
+BYTES_PER_TOKEN = 4
+
+
+class TokenCounter:
+    def __init__(self, model: str):
+        self.model = model
+        self.encoding = self.get_encoding(model)
+
+    @staticmethod
+    def get_encoding(model: str):
+        if tiktoken is None:
+            return None
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            # The encoding files are downloaded on first use
+            logger.warning(f"Could not load the tiktoken encoding: {e}")
+            return None
+
+    def count_text(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return math.ceil(len(text.encode("utf-8")) / BYTES_PER_TOKEN)
+
+    def count_message(self, message: dict) -> int:
+        return (
+            TOKENS_PER_MESSAGE
+            + self.count_text(message["role"])
+            + self.count_text(message["content"])
+        )
+
+    def count_messages(self, messages: Iterable[dict]) -> int:
+        return TOKENS_PER_REPLY + sum(
+            self.count_message(message) for message in messages
+        )
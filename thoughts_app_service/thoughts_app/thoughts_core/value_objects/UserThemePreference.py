@@ -4,12 +4,31 @@ from ..models import MeditationTheme, UserInfo
 class UserThemePreference:
     def __init__(self, user: UserInfo):
         self.user = user
-        self.theme_to_grades = dict()
+        self.theme_to_average_grade = dict()
+        self.theme_to_grade_count = dict()
         self.total_grades = 0
 
     def add_grade(self, meditation_theme: MeditationTheme, grade: int):
-        self.total_grades += 1
-        if meditation_theme in self.theme_to_grades:
-            self.theme_to_grades[meditation_theme].append(grade)
-        else:
-            self.theme_to_grades[meditation_theme] = [grade]
+        self.add_theme_grades(
+            meditation_theme=meditation_theme,
+            average_grade=grade,
+            grade_count=1,
+        )
+
+    def add_theme_grades(
+        self,
+        meditation_theme: MeditationTheme,
+        average_grade: float,
+        grade_count: int,
+    ):
+        self.total_grades += grade_count
+        previous_count = self.theme_to_grade_count.get(meditation_theme, 0)
+        previous_average = self.theme_to_average_grade.get(meditation_theme, 0)
+        total_count = previous_count + grade_count
+        self.theme_to_grade_count[meditation_theme] = total_count
+        self.theme_to_average_grade[meditation_theme] = (
+            previous_average * previous_count + average_grade * grade_count
+        ) / total_count
+
+    def get_average_grade(self, meditation_theme: MeditationTheme) -> float:
+        return self.theme_to_average_grade[meditation_theme]
@@ -1,15 +1,27 @@
+import asyncio
 import json
-import os
+import queue
+import threading
+import time
 
-import openai
 from adrf.views import APIView as AsyncAPIView
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
-from django.http import Http404, HttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
 from drf_spectacular.types import OpenApiTypes
-from drf_spectacular.utils import OpenApiExample, extend_schema
+from drf_spectacular.utils import (
+    OpenApiExample,
+    OpenApiParameter,
+    extend_schema,
+)
 from rest_framework import mixins, status, viewsets
 from rest_framework.authentication import SessionAuthentication
-from rest_framework.generics import RetrieveUpdateAPIView
+from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -19,18 +31,22 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from .models import (
     Achievement,
     Chat,
+    ChatCompletionJob,
+    ChatMessage,
     Meditation,
     MeditationGrade,
     MeditationNarrator,
     MeditationSession,
     MeditationTheme,
-    UserInfo,
 )
 from .serializers import (
     AchievementSerializer,
+    ChatCompletionJobSerializer,
+    ChatMessageSerializer,
     ChatSerializer,
     GetGPTAnswerRequestSerializer,
     GetGPTAnswerResponseSerializer,
+    MeditationGradeBulkSerializer,
     MeditationGradeSerializer,
     MeditationNarratorSerializer,
     MeditationProgressSerializer,
@@ -41,10 +57,46 @@ from .serializers import (
     UserInfoSerializer,
     UserRegistrationSerializer,
 )
+from .services.CatalogueService import CatalogueService
+from .services.ChatCompletionCacheService import ChatCompletionCacheService
+from .services.ChatCompletionJobService import ChatCompletionJobService
+from .services.ChatService import ChatService
 from .services.logger import logger
-from .services.RecommendationService import RecommendationService
+from .services.MeditationGradeService import MeditationGradeService
+from .services.MeditationNeighbourService import (
+    NEIGHBOURS_PER_MEDITATION,
+    MeditationNeighbourService,
+)
+from .services.metrics import (
+    CHATBOT_CONVERSATION_MESSAGES,
+    CHATBOT_PROMPT_MEDITATIONS,
+    CHATBOT_REPLIES,
+)
+from .services.OpenAiClientPool import OpenAiClientPool, OpenAiOverloadedError
+from .services.RecommendationCacheService import RecommendationCacheService
+from .services.RecommendationService import RECOMMENDATION_STRATEGIES
 from .services.S3Service import S3Service
 from .services.UserService import UserService
+from .value_objects.MeditationSearchIndex import MeditationSearchIndex
+from .viewsets import (
+    AsyncCreateModelMixin,
+    AsyncDestroyModelMixin,
+    AsyncGenericAPIView,
+    AsyncGenericViewSet,
+    AsyncListModelMixin,
+    AsyncRetrieveModelMixin,
+    AsyncUpdateModelMixin,
+)
+
+# Previous user messages added to the meditation search query
+SEARCH_QUERY_PREVIOUS_MESSAGES = 2
+
+CHATBOT_JOB_MODE = "job"
+UNFINISHED_JOB_STATUSES = (ChatCompletionJob.QUEUED, ChatCompletionJob.RUNNING)
+
+CHATBOT_BUSY_MESSAGE = "Chatbot is busy, try again later"
+# Seconds clients are asked to wait after a 503
+CHATBOT_BUSY_RETRY_AFTER = 5
 
 
 class OpenAiClientSingleton:
@@ -53,8 +105,14 @@ class OpenAiClientSingleton:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(OpenAiClientSingleton, cls).__new__(cls)
-            cls._instance.client = openai.AsyncOpenAI(
-                api_key=os.getenv("OPENAI_API_KEY")
+            cls._instance.client = OpenAiClientPool(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=settings.OPENAI_BASE_URL,
+                max_concurrency=settings.OPENAI_MAX_CONCURRENT_REQUESTS,
+                max_queued=settings.OPENAI_MAX_QUEUED_REQUESTS,
+                deadline=settings.OPENAI_REQUEST_DEADLINE,
+                max_retries=settings.OPENAI_MAX_RETRIES,
+                retry_backoff=settings.OPENAI_RETRY_BACKOFF,
             )
         return cls._instance
 
@@ -62,20 +120,25 @@ class OpenAiClientSingleton:
         return self.client
 
 
-class UserInfoView(RetrieveUpdateAPIView):
+class UserInfoView(
+    AsyncRetrieveModelMixin, AsyncUpdateModelMixin, AsyncGenericAPIView
+):
     authentication_classes = [SessionAuthentication, JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     serializer_class = UserInfoSerializer
 
-    def get_object(self):
-        try:
-            return UserInfo.objects.filter(
-                user=self.request.user
-            ).first()  # Adjust this depending on your related name
-        except UserInfo.DoesNotExist:
-            # Properly handle the case where the UserInfo does not exist
-            raise Http404("No UserInfo found for this user.")
+    async def aget_object(self):
+        return await UserService.aget_user_info(user=self.request.user)
+
+    async def get(self, request, *args, **kwargs):
+        return await self.retrieve(request, *args, **kwargs)
+
+    async def put(self, request, *args, **kwargs):
+        return await self.update(request, *args, **kwargs)
+
+    async def patch(self, request, *args, **kwargs):
+        return await self.partial_update(request, *args, **kwargs)
 
 
 class AchievementViewSet(viewsets.ModelViewSet):
@@ -87,7 +150,7 @@ class AchievementViewSet(viewsets.ModelViewSet):
 
 
 class MeditationViewSet(
-    mixins.RetrieveModelMixin, mixins.ListModelMixin, GenericViewSet
+    AsyncRetrieveModelMixin, AsyncListModelMixin, AsyncGenericViewSet
 ):
     authentication_classes = [SessionAuthentication, JWTAuthentication]
     permission_classes = [IsAuthenticated]
@@ -95,8 +158,8 @@ class MeditationViewSet(
     serializer_class = MeditationSerializer
     queryset = Meditation.objects.all()
 
-    def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
+    async def retrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
 
         response_data = {
             "name": instance.name,
@@ -108,6 +171,45 @@ class MeditationViewSet(
 
         return Response(response_data)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "limit",
+                OpenApiTypes.INT,
+                description=(
+                    f"At most {NEIGHBOURS_PER_MEDITATION} meditations, "
+                    "the default"
+                ),
+            )
+        ],
+        responses={200: MeditationSerializer(many=True), 400: "Bad request"},
+    )
+    @action(detail=True, methods=["get"])
+    async def similar(self, request, pk=None):
+        try:
+            meditation_id = int(pk)
+            limit = int(
+                request.query_params.get("limit", NEIGHBOURS_PER_MEDITATION)
+            )
+        except ValueError:
+            return Response(
+                {"detail": "Meditation id and limit must be integers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        similar_meditations = (
+            await MeditationNeighbourService.aget_similar_meditations(
+                meditation_id=meditation_id, amount=max(limit, 0)
+            )
+        )
+        if not similar_meditations:
+            # Unknown meditation or neighbours not built yet
+            await self.aget_object()
+
+        return Response(
+            MeditationSerializer(similar_meditations, many=True).data
+        )
+
 
 class MeditationThemeViewSet(viewsets.ModelViewSet):
     authentication_classes = [SessionAuthentication, JWTAuthentication]
@@ -117,7 +219,14 @@ class MeditationThemeViewSet(viewsets.ModelViewSet):
     queryset = MeditationTheme.objects.all()
 
 
-class MeditationGradeViewSet(viewsets.ModelViewSet):
+class MeditationGradeViewSet(
+    AsyncCreateModelMixin,
+    AsyncRetrieveModelMixin,
+    AsyncUpdateModelMixin,
+    AsyncDestroyModelMixin,
+    AsyncListModelMixin,
+    AsyncGenericViewSet,
+):
     authentication_classes = [SessionAuthentication, JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
@@ -126,12 +235,37 @@ class MeditationGradeViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return MeditationGrade.objects.filter(user_id=self.request.user)
 
+    @extend_schema(
+        request=MeditationGradeBulkSerializer,
+        responses={
+            200: MeditationGradeSerializer(many=True),
+            400: "Bad request",
+        },
+    )
+    @action(detail=False, methods=["post"])
+    async def bulk(self, request):
+        """Grade many meditations at once, overwriting earlier grades."""
+        serializer = MeditationGradeBulkSerializer(data=request.data)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+
+        # The last grade of a meditation given twice wins
+        grades = {
+            grade["meditation"]: grade["grade"]
+            for grade in serializer.validated_data["grades"]
+        }
+        saved_grades = await MeditationGradeService.asave_grades(
+            user_id=request.user.id, grades=grades
+        )
+        return Response(
+            MeditationGradeSerializer(saved_grades, many=True).data
+        )
+
 
 class MeditationSessionViewSet(
-    mixins.CreateModelMixin,
-    mixins.RetrieveModelMixin,
-    mixins.ListModelMixin,
-    viewsets.GenericViewSet,
+    AsyncCreateModelMixin,
+    AsyncRetrieveModelMixin,
+    AsyncListModelMixin,
+    AsyncGenericViewSet,
 ):
     authentication_classes = [SessionAuthentication, JWTAuthentication]
     permission_classes = [IsAuthenticated]
@@ -139,7 +273,9 @@ class MeditationSessionViewSet(
     serializer_class = MeditationSessionSerializer
 
     def get_queryset(self):
-        return MeditationSession.objects.filter(user_id=self.request.user)
+        return MeditationSession.objects.filter(
+            user_id=self.request.user
+        ).order_by("-session_start_time")
 
 
 class MeditationNarratorViewSet(viewsets.ModelViewSet):
@@ -215,33 +351,288 @@ def prepare_system_message(meditations):
     }
 
 
-async def generate_chat_completion(conversation, new_message):
+class MeditationSearchIndexCache:
+    """Search index of the current catalogue version, per process."""
+
+    search_index = None
+
+
+async def get_meditation_search_index():
+    """Return the meditation search index, rebuilding it only when the
+    catalogue version changed."""
+    # The version is read before the catalogue, a write in between indexes
+    # newer data under the older version and is re-indexed next time
+    catalogue_version = await CatalogueService.aget_version()
+    search_index = MeditationSearchIndexCache.search_index
+    if (
+        search_index is None
+        or search_index.catalogue_version != catalogue_version
+    ):
+        meditations = await get_all_meditations()
+        theme_names = {
+            theme_id: name
+            async for theme_id, name in MeditationTheme.objects.values_list(
+                "id", "name"
+            )
+        }
+        narrator_names = {
+            narrator_id: name
+            async for narrator_id, name in (
+                MeditationNarrator.objects.values_list("id", "name")
+            )
+        }
+        search_index = MeditationSearchIndex(
+            meditations=meditations,
+            theme_names=theme_names,
+            narrator_names=narrator_names,
+            catalogue_version=catalogue_version,
+        )
+        MeditationSearchIndexCache.search_index = search_index
+    return search_index
+
+
+def get_search_query(conversation, new_message):
+    """The new message and the user's previous messages, so that
+    follow-up questions keep the topic."""
+    user_messages = [
+        message["content"]
+        for message in conversation
+        if message["role"] == "user"
+    ]
+    return " ".join(
+        [*user_messages[-SEARCH_QUERY_PREVIOUS_MESSAGES:], new_message]
+    )
+
+
+async def get_prompt_meditations(query):
+    """Return the meditations matching `query` to offer in the prompt."""
+    search_index = await get_meditation_search_index()
+    return search_index.search(query, settings.CHATBOT_MEDITATION_CANDIDATES)
+
+
+async def get_system_message(query):
+    """Prepare the system message with the meditations matching `query`."""
+    return prepare_system_message(await get_prompt_meditations(query))
+
+
+def warm_meditation_search_index():
+    """Build the meditation search index in the background at worker
+    start."""
+
+    def warm():
+        try:
+            async_to_sync(get_meditation_search_index)()
+        except Exception as e:
+            logger.warning(f"Could not warm the meditation search index: {e}")
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=warm, daemon=True)
+    thread.start()
+    return thread
+
+
+def prepare_summary_request(summary, messages):
+    """Prepare the messages asking to fold `messages` into `summary`."""
+    transcript = "\n".join(
+        f"{message['role']}: {message['content']}" for message in messages
+    )
+    return [
+        {
+            "role": "system",
+            "content": (
+                "Ты ведёшь краткое содержание разговора пользователя с "
+                "ассистентом по медитациям. Дополни текущее краткое "
+                "содержание новыми репликами. Сохрани чувства и проблемы "
+                "пользователя, его предпочтения и уже предложенные "
+                "медитации. Ответь только текстом краткого содержания."
+            ),
+        },
+        {
+            "role": "user",
+            "content": (
+                f"Текущее краткое содержание:\n{summary or '—'}\n\n"
+                f"Новые реплики:\n{transcript}"
+            ),
+        },
+    ]
+
+
+async def summarize_conversation(summary, messages):
+    """Return `summary` updated with `messages`."""
+    client = OpenAiClientSingleton().get_client()
+    response = await client.chat.completions.create(
+        model=settings.CHAT_COMPLETION_MODEL,
+        messages=prepare_summary_request(summary, messages),
+        max_tokens=settings.CHAT_SUMMARY_MAX_TOKENS,
+    )
+    return response.choices[0].message.content.strip()
+
+
+def is_valid_chat_reply(gpt_response):
+    """Check that the reply is JSON of the GetGPTAnswerResponse shape."""
+    try:
+        response_data = json.loads(gpt_response)
+    except json.JSONDecodeError:
+        return False
+    return GetGPTAnswerResponseSerializer(data=response_data).is_valid()
+
+
+async def get_cached_chat_reply(cache_key):
+    """Return a cached reply that still passes validation, or None."""
+    gpt_response = await ChatCompletionCacheService.aget_response(cache_key)
+    if gpt_response is not None and not is_valid_chat_reply(gpt_response):
+        return None
+    return gpt_response
+
+
+def observe_chat_reply(outcome, meditations=None, messages=None):
+    """Record a chatbot reply, with the size of its prompt once built."""
+    labels = {"model": settings.CHAT_COMPLETION_MODEL, "outcome": outcome}
+    CHATBOT_REPLIES.labels(**labels).inc()
+    if meditations is not None:
+        CHATBOT_PROMPT_MEDITATIONS.labels(**labels).observe(meditations)
+    if messages is not None:
+        CHATBOT_CONVERSATION_MESSAGES.labels(**labels).observe(messages)
+
+
+async def generate_chat_completion(conversation, new_message, use_cache=True):
     client = OpenAiClientSingleton().get_client()
 
-    meditations = await get_all_meditations()
-    system_message = prepare_system_message(meditations)
+    meditations = await get_prompt_meditations(
+        get_search_query(conversation, new_message)
+    )
 
-    conversation.insert(0, system_message)
+    conversation.insert(0, prepare_system_message(meditations))
     conversation.append({"role": "user", "content": new_message})
+    messages = len(conversation) - 1
 
+    outcome = "error"
     try:
-        response = await client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=conversation,
+        cache_key = (
+            await ChatCompletionCacheService.aget_cache_key(conversation)
+            if use_cache
+            else None
         )
-        gpt_response = response.choices[0].message.content
-        logger.debug(f"GPT Response: {gpt_response}")
-
-        json.loads(gpt_response)  # Validate JSON format
+        gpt_response = await get_cached_chat_reply(cache_key)
+        if gpt_response is None:
+            response = await client.chat.completions.create(
+                model=settings.CHAT_COMPLETION_MODEL,
+                messages=conversation,
+            )
+            gpt_response = response.choices[0].message.content
+            logger.debug(f"GPT Response: {gpt_response}")
+
+            response_data = json.loads(gpt_response)
+            # Counted like the stream endpoint does, once the reply passed
+            # the validation its caller applies
+            if GetGPTAnswerResponseSerializer(data=response_data).is_valid():
+                if cache_key is not None:
+                    await ChatCompletionCacheService.aset_response(
+                        cache_key, gpt_response
+                    )
+                outcome = "success"
+            else:
+                outcome = "invalid_reply"
+        else:
+            outcome = "cached"
 
         conversation.append({"role": "assistant", "content": gpt_response})
         return conversation[1:]
     except json.JSONDecodeError as e:
+        outcome = "invalid_json"
         logger.error(f"Failed to parse GPT response as JSON: {e}")
         return None
+    except OpenAiOverloadedError:
+        outcome = "overloaded"
+        raise
     except Exception as e:
         logger.error(f"Error during GPT chat completion: {e}")
         return None
+    finally:
+        observe_chat_reply(outcome, len(meditations), messages)
+
+
+def get_chat_turn(new_message, gpt_response):
+    return [
+        {"role": "user", "content": new_message},
+        {"role": "assistant", "content": gpt_response},
+    ]
+
+
+async def get_chat_reply(
+    requested_chat, new_message, use_cache=True
+) -> str | None:
+    """Chatbot reply to `new_message`, or None if the model did not give a
+    valid one."""
+    conversation = await ChatService.aget_conversation(
+        requested_chat, summarize=summarize_conversation
+    )
+    updated_conversation = await generate_chat_completion(
+        conversation, new_message, use_cache=use_cache
+    )
+    if not updated_conversation:
+        return None
+    return updated_conversation[-1].get("content")
+
+
+async def answer_chat_message(
+    requested_chat, new_message, use_cache=True
+) -> str | None:
+    """Chatbot reply to `new_message`, stored in the chat with it, or None
+    if the model did not give a valid one."""
+    gpt_response = await get_chat_reply(
+        requested_chat, new_message, use_cache=use_cache
+    )
+    if gpt_response is None:
+        return None
+    await ChatService.aappend_messages(
+        requested_chat, get_chat_turn(new_message, gpt_response)
+    )
+    return gpt_response
+
+
+async def run_chat_completion_job(job):
+    """Answer a claimed job, run by the run_chat_completion_worker command.
+    The turn is stored when the job is finished."""
+    try:
+        gpt_response = await get_chat_reply(
+            job.chat, job.message, use_cache=job.use_cache
+        )
+    except OpenAiOverloadedError as e:
+        await sync_to_async(ChatCompletionJobService.retry)(
+            job, delay=CHATBOT_BUSY_RETRY_AFTER, error=str(e)
+        )
+        return
+
+    if gpt_response is None:
+        await sync_to_async(ChatCompletionJobService.fail)(
+            job, "Invalid response from GPT"
+        )
+        return
+
+    chat_messages = get_chat_turn(job.message, gpt_response)
+    response_serializer = GetGPTAnswerResponseSerializer(
+        data=json.loads(gpt_response)
+    )
+    if response_serializer.is_valid():
+        await sync_to_async(ChatCompletionJobService.succeed)(
+            job, response_serializer.data, chat_messages=chat_messages
+        )
+    else:
+        await sync_to_async(ChatCompletionJobService.fail)(
+            job,
+            json.dumps(response_serializer.errors),
+            chat_messages=chat_messages,
+        )
+
+
+def get_chatbot_busy_response():
+    response = Response(
+        CHATBOT_BUSY_MESSAGE, status=status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+    response["Retry-After"] = str(CHATBOT_BUSY_RETRY_AFTER)
+    return response
 
 
 class ChatBotAPIView(AsyncAPIView):
@@ -253,8 +644,10 @@ class ChatBotAPIView(AsyncAPIView):
         request=GetGPTAnswerRequestSerializer,
         responses={
             200: GetGPTAnswerResponseSerializer,
+            202: ChatCompletionJobSerializer,
             400: OpenApiTypes.STR,
             404: OpenApiTypes.STR,
+            503: OpenApiTypes.STR,
         },
         examples=[
             OpenApiExample(
@@ -269,6 +662,12 @@ class ChatBotAPIView(AsyncAPIView):
                 response_only=True,
                 status_codes=["404"],
             ),
+            OpenApiExample(
+                "Example 503",
+                value=CHATBOT_BUSY_MESSAGE,
+                response_only=True,
+                status_codes=["503"],
+            ),
         ],
     )
     async def post(self, request):
@@ -280,6 +679,7 @@ class ChatBotAPIView(AsyncAPIView):
 
         new_message = serializer.validated_data.get("message")
         chat_id = serializer.validated_data.get("chat_id")
+        use_cache = serializer.validated_data.get("use_cache")
 
         try:
             requested_chat = await Chat.objects.aget(
@@ -288,22 +688,32 @@ class ChatBotAPIView(AsyncAPIView):
         except ObjectDoesNotExist:
             return Response("Chat not found", status=status.HTTP_404_NOT_FOUND)
 
-        conversation = requested_chat.chat_messages
-        updated_conversation = await generate_chat_completion(
-            conversation, new_message
-        )
+        if serializer.validated_data.get("mode") == CHATBOT_JOB_MODE:
+            job = await ChatCompletionJobService.aenqueue(
+                requested_chat, new_message, use_cache=use_cache
+            )
+            response = Response(
+                ChatCompletionJobSerializer(job).data,
+                status=status.HTTP_202_ACCEPTED,
+            )
+            response["Location"] = reverse("chatbot_job", args=[job.id])
+            return response
 
-        if not updated_conversation:
+        try:
+            gpt_response = await answer_chat_message(
+                requested_chat, new_message, use_cache=use_cache
+            )
+        except OpenAiOverloadedError as e:
+            logger.warning(f"Chatbot request refused: {e}")
+            return get_chatbot_busy_response()
+
+        if gpt_response is None:
             return Response(
                 "Invalid response from GPT", status=status.HTTP_400_BAD_REQUEST
             )
 
-        requested_chat.chat_messages = updated_conversation
-        await requested_chat.asave()
-
-        response_data = json.loads(updated_conversation[-1].get("content"))
         response_serializer = GetGPTAnswerResponseSerializer(
-            data=response_data
+            data=json.loads(gpt_response)
         )
 
         if response_serializer.is_valid():
@@ -316,6 +726,260 @@ class ChatBotAPIView(AsyncAPIView):
         )
 
 
+class ChatBotJobAPIView(AsyncAPIView):
+    authentication_classes = [SessionAuthentication, JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    serializer_class = ChatCompletionJobSerializer
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "wait",
+                OpenApiTypes.INT,
+                description=(
+                    "Seconds to wait for the job to finish before answering, "
+                    "at most CHAT_COMPLETION_JOB_MAX_WAIT"
+                ),
+            )
+        ],
+        responses={
+            200: ChatCompletionJobSerializer,
+            400: OpenApiTypes.STR,
+            404: OpenApiTypes.STR,
+        },
+    )
+    async def get(self, request, job_id):
+        try:
+            wait = min(
+                max(int(request.query_params.get("wait", 0)), 0),
+                settings.CHAT_COMPLETION_JOB_MAX_WAIT,
+            )
+        except ValueError:
+            return Response(
+                "wait must be an integer", status=status.HTTP_400_BAD_REQUEST
+            )
+
+        deadline = time.monotonic() + wait
+        job = await ChatCompletionJobService.aget_job(job_id, request.user)
+        while (
+            job is not None
+            and job.status in UNFINISHED_JOB_STATUSES
+            and time.monotonic() < deadline
+        ):
+            await asyncio.sleep(settings.CHAT_COMPLETION_JOB_POLL_INTERVAL)
+            job = await ChatCompletionJobService.aget_job(job_id, request.user)
+
+        if job is None:
+            return Response("Job not found", status=status.HTTP_404_NOT_FOUND)
+        return Response(ChatCompletionJobSerializer(job).data)
+
+
+def format_server_sent_event(event, data):
+    return (
+        f"event: {event}\n" f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    )
+
+
+async def stream_chat_completion(requested_chat, new_message, use_cache=True):
+    """Yield the reply as server-sent events while it is generated.
+
+    `delta` events carry content fragments, a cached reply comes as a single
+    one. The assembled reply is validated and saved to the chat, then sent
+    once more as a `done` event. Failures end the stream with an `error`
+    event.
+    """
+    client = OpenAiClientSingleton().get_client()
+    user_message = {"role": "user", "content": new_message}
+
+    content_parts = []
+    meditations = messages = None
+    # Left as is when the client goes away mid-stream
+    outcome = "cancelled"
+    try:
+        try:
+            conversation = await ChatService.aget_conversation(
+                requested_chat, summarize=summarize_conversation
+            )
+            meditations = await get_prompt_meditations(
+                get_search_query(conversation, new_message)
+            )
+            messages = [
+                prepare_system_message(meditations),
+                *conversation,
+                user_message,
+            ]
+            cache_key = (
+                await ChatCompletionCacheService.aget_cache_key(messages)
+                if use_cache
+                else None
+            )
+            cached_response = await get_cached_chat_reply(cache_key)
+            if cached_response is not None:
+                content_parts.append(cached_response)
+                yield format_server_sent_event(
+                    "delta", {"content": cached_response}
+                )
+            else:
+                stream = await client.chat.completions.create(
+                    model=settings.CHAT_COMPLETION_MODEL,
+                    messages=messages,
+                    stream=True,
+                )
+                async for chunk in stream:
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    content_parts.append(chunk.choices[0].delta.content)
+                    yield format_server_sent_event(
+                        "delta", {"content": chunk.choices[0].delta.content}
+                    )
+        except OpenAiOverloadedError as e:
+            outcome = "overloaded"
+            logger.warning(f"Chatbot request refused: {e}")
+            yield format_server_sent_event(
+                "error", {"detail": CHATBOT_BUSY_MESSAGE}
+            )
+            return
+        except Exception as e:
+            outcome = "error"
+            logger.error(f"Error during GPT chat completion stream: {e}")
+            yield format_server_sent_event(
+                "error", {"detail": "Chat completion failed"}
+            )
+            return
+
+        gpt_response = "".join(content_parts)
+        logger.debug(f"GPT Response: {gpt_response}")
+        try:
+            response_data = json.loads(gpt_response)
+        except json.JSONDecodeError as e:
+            outcome = "invalid_json"
+            logger.error(f"Failed to parse GPT response as JSON: {e}")
+            yield format_server_sent_event(
+                "error", {"detail": "Invalid response from GPT"}
+            )
+            return
+
+        response_serializer = GetGPTAnswerResponseSerializer(
+            data=response_data
+        )
+        if not response_serializer.is_valid():
+            outcome = "invalid_reply"
+            yield format_server_sent_event("error", response_serializer.errors)
+            return
+
+        if cache_key is not None and cached_response is None:
+            await ChatCompletionCacheService.aset_response(
+                cache_key, gpt_response
+            )
+        await ChatService.aappend_messages(
+            requested_chat,
+            [user_message, {"role": "assistant", "content": gpt_response}],
+        )
+        outcome = "success" if cached_response is None else "cached"
+        yield format_server_sent_event("done", response_serializer.data)
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        observe_chat_reply(
+            outcome,
+            meditations=None if meditations is None else len(meditations),
+            messages=None if messages is None else len(messages) - 1,
+        )
+
+
+def iterate_in_thread(async_iterator):
+    """Serve an async iterator to a WSGI server without buffering it.
+
+    Django consumes async streaming content completely before sending it
+    under WSGI. Instead, the iterator runs in its own thread and event loop
+    and hands chunks over through a queue.
+    """
+    chunks = queue.SimpleQueue()
+    finished = object()
+
+    async def pump():
+        async for chunk in async_iterator:
+            chunks.put(chunk)
+
+    def run():
+        try:
+            async_to_sync(pump)()
+        except Exception as e:
+            logger.error(f"Streaming response failed: {e}")
+        finally:
+            connections.close_all()
+            chunks.put(finished)
+
+    threading.Thread(target=run, daemon=True).start()
+    while (chunk := chunks.get()) is not finished:
+        yield chunk
+
+
+class ChatBotStreamAPIView(AsyncAPIView):
+    authentication_classes = [SessionAuthentication, JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    serializer_class = GetGPTAnswerResponseSerializer
+
+    @extend_schema(
+        request=GetGPTAnswerRequestSerializer,
+        responses={
+            (200, "text/event-stream"): OpenApiTypes.STR,
+            400: OpenApiTypes.STR,
+            404: OpenApiTypes.STR,
+            503: OpenApiTypes.STR,
+        },
+        description=(
+            "Streams the reply as server-sent events: `delta` events with "
+            "content fragments, then one `done` event with the validated "
+            "answer or an `error` event."
+        ),
+    )
+    async def post(self, request):
+        serializer = GetGPTAnswerRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        new_message = serializer.validated_data.get("message")
+        chat_id = serializer.validated_data.get("chat_id")
+        use_cache = serializer.validated_data.get("use_cache")
+
+        try:
+            requested_chat = await Chat.objects.aget(
+                user=request.user, id=chat_id
+            )
+        except ObjectDoesNotExist:
+            return Response("Chat not found", status=status.HTTP_404_NOT_FOUND)
+
+        # Refuse before the stream starts, later the status is already sent
+        if OpenAiClientSingleton().get_client().is_saturated():
+            return get_chatbot_busy_response()
+
+        events = stream_chat_completion(
+            requested_chat, new_message, use_cache=use_cache
+        )
+        if not isinstance(request._request, ASGIRequest):
+            events = iterate_in_thread(events)
+        response = StreamingHttpResponse(
+            events, content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        # Keep reverse proxies from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class ChatMessagePagination(CursorPagination):
+    """Newest messages first, keyset pages over (chat, sequence)."""
+
+    ordering = "-sequence"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
 class ChatViewSet(
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -329,20 +993,48 @@ class ChatViewSet(
     def get_queryset(self):
         return Chat.objects.filter(user=self.request.user)
 
+    @extend_schema(responses=ChatMessageSerializer(many=True))
+    @action(detail=True, methods=["get"])
+    def messages(self, request, pk=None):
+        chat = self.get_object()
+        paginator = ChatMessagePagination()
+        page = paginator.paginate_queryset(
+            ChatMessage.objects.filter(chat=chat), request, view=self
+        )
+        return paginator.get_paginated_response(
+            ChatMessageSerializer(page, many=True).data
+        )
 
-class RecommendMeditationsApiView(APIView):
+
+class RecommendMeditationsApiView(AsyncAPIView):
     authentication_classes = [SessionAuthentication, JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = MeditationSerializer(many=True)
 
     @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "strategy",
+                OpenApiTypes.STR,
+                enum=RECOMMENDATION_STRATEGIES,
+                description="Overrides the RECOMMENDATION_STRATEGY setting",
+            )
+        ],
         responses={200: MeditationSerializer(many=True), 400: "Bad request"},
     )
-    def get(self, request):
+    async def get(self, request):
         user = self.request.user
+        strategy = request.query_params.get("strategy")
+        if strategy and strategy not in RECOMMENDATION_STRATEGIES:
+            return Response(
+                {"detail": "Unknown recommendation strategy."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         recommended_meditations = (
-            RecommendationService.recommend_meditations_for_user(user=user)
+            await RecommendationCacheService.aget_recommendations(
+                user=user, strategy=strategy
+            )
         )
         serialized_meditations = MeditationSerializer(
             recommended_meditations, many=True
@@ -368,7 +1060,7 @@ class UserRegistrationView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class MeditationProgressView(APIView):
+class MeditationProgressView(AsyncAPIView):
     authentication_classes = [SessionAuthentication, JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = MeditationProgressSerializer
@@ -380,15 +1072,18 @@ class MeditationProgressView(APIView):
             500: "Internal server error",
         },
     )
-    def get(self, request):
-        level = UserService.get_level(user=request.user)
+    async def get(self, request):
+        sessions_count = await UserService.aget_sessions_count(
+            user=request.user
+        )
+        level = await UserService.aget_level(
+            user=request.user, sessions_count=sessions_count
+        )
         if level:
             data = {
                 "level_name": level.name,
                 "next_level_count": level.level,
-                "current_level_count": len(
-                    MeditationSession.objects.filter(user_id=request.user)
-                ),
+                "current_level_count": sessions_count,
             }
             serializer = MeditationProgressSerializer(data=data)
             if serializer.is_valid():
@@ -0,0 +1,100 @@
+from adrf.views import APIView as AsyncAPIView
+from adrf.viewsets import ViewSetMixin as AsyncViewSetMixin
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.http import Http404
+from django.utils.functional import classproperty
+from rest_framework import status
+from rest_framework.generics import GenericAPIView
+from rest_framework.response import Response
+
+
+@sync_to_async
+def validate_and_save(serializer, **kwargs) -> None:
+    """Related field lookups and model signals only run synchronously, so
+    a write costs one thread hop for validation and save together."""
+    serializer.is_valid(raise_exception=True)
+    serializer.save(**kwargs)
+
+
+class AsyncGenericAPIView(AsyncAPIView, GenericAPIView):
+    """GenericAPIView with coroutine handlers.
+
+    Serializers run in the event loop, so querysets must load every row
+    the serializer reads, e.g. with select_related or prefetch_related.
+    """
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            instance = await queryset.aget(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (ObjectDoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, instance)
+        return instance
+
+
+class AsyncGenericViewSet(AsyncViewSetMixin, AsyncGenericAPIView):
+    @classproperty
+    def view_is_async(cls):
+        # adrf only looks at methods defined on the class itself, not the
+        # ones inherited from the mixins below
+        return True
+
+
+class AsyncListModelMixin:
+    async def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        instances = [instance async for instance in queryset]
+        return Response(self.get_serializer(instances, many=True).data)
+
+
+class AsyncRetrieveModelMixin:
+    async def retrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
+
+
+class AsyncCreateModelMixin:
+    async def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        await validate_and_save(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class AsyncUpdateModelMixin:
+    async def update(self, request, *args, **kwargs):
+        partial = kwargs.pop("partial", False)
+        instance = await self.aget_object()
+        serializer = self.get_serializer(
+            instance, data=request.data, partial=partial
+        )
+        await validate_and_save(serializer)
+        return Response(serializer.data)
+
+    async def partial_update(self, request, *args, **kwargs):
+        kwargs["partial"] = True
+        return await self.update(request, *args, **kwargs)
+
+
+class AsyncDestroyModelMixin:
+    async def destroy(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        await instance.adelete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def get_lib_doc_excludes() -> list:
+    """Keeps the docstrings of the async base classes out of the schema."""
+    from drf_spectacular.plumbing import get_lib_doc_excludes
+
+    return [
+        *get_lib_doc_excludes(),
+        AsyncViewSetMixin,
+        AsyncAPIView,
+        AsyncGenericAPIView,
+        AsyncGenericViewSet,
+    ]